@@ -0,0 +1,205 @@
+""" Measures the throughput of the environments and compares it with a stored baseline. Run with:
+    python -m benchmarks.env_throughput --output baseline.json
+    python -m benchmarks.env_throughput --compare baseline.json """
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from envs.snake_env import SnakeEnv
+from envs.breakout_env import BreakoutEnv
+from envs.pong_env import PongEnv
+from envs.vec_snake_env import VecSnakeEnv
+from envs.vec_breakout_env import VecBreakoutEnv
+from envs.vec_pong_env import VecPongEnv
+from envs.tabular_pong import TabularPongEnv
+from envs.numba_envs import NUMBA_AVAILABLE, make_env
+
+SNAKE_CONFIGS = [(7, 2), (15, 2), (31, 4)]
+PADDLE_SIZES = [3, 15]
+N_ENVS = 256
+
+# metrics that are better when they are higher, all other metrics are times or sizes that are better when lower
+HIGHER_IS_BETTER = ["steps_per_sec", "resets_per_sec"]
+
+
+def make_cases():
+    """Returns the benchmarked environments as (name, create, batched) tuples, where create builds a new environment"""
+    backends = ["python", "numba"] if NUMBA_AVAILABLE else ["python"]
+
+    cases = []
+    for backend in backends:
+        for grid_size, vision in SNAKE_CONFIGS:
+            cases.append((f"SnakeEnv/{backend}/grid_size={grid_size}/vision={vision}",
+                          lambda g=grid_size, v=vision, b=backend: make_env(SnakeEnv, g, v, backend=b, seed=0), False))
+        for paddle_size in PADDLE_SIZES:
+            cases.append((f"BreakoutEnv/{backend}/paddle_size={paddle_size}",
+                          lambda p=paddle_size, b=backend: make_env(BreakoutEnv, p, backend=b, seed=0), False))
+        cases.append((f"PongEnv/{backend}", lambda b=backend: make_env(PongEnv, backend=b, seed=0), False))
+
+    for grid_size, vision in SNAKE_CONFIGS:
+        cases.append((f"VecSnakeEnv/n_envs={N_ENVS}/grid_size={grid_size}/vision={vision}",
+                      lambda g=grid_size, v=vision: VecSnakeEnv(N_ENVS, g, v, seed=0), True))
+    for paddle_size in PADDLE_SIZES:
+        cases.append((f"VecBreakoutEnv/n_envs={N_ENVS}/paddle_size={paddle_size}",
+                      lambda p=paddle_size: VecBreakoutEnv(N_ENVS, p, seed=0), True))
+    cases.append((f"VecPongEnv/n_envs={N_ENVS}", lambda: VecPongEnv(N_ENVS, seed=0), True))
+    cases.append((f"TabularPongEnv/n_envs={N_ENVS}", lambda: TabularPongEnv(N_ENVS, seed=0), True))
+
+    return cases
+
+
+def benchmark_env(create, batched: bool, n_steps: int):
+    """Returns the metrics of the environment that create builds: the steps and resets per second, the latencies of
+        get_state and screenshot in microseconds and the peak memory allocated during a step in bytes. Batched
+        environments count every game of a step or reset"""
+    env = create()
+    n_envs = env.n_envs if batched else 1
+    rng = np.random.default_rng(0)
+
+    if batched:
+        batches = rng.integers(env.output_dim, size=(n_steps, n_envs))
+        step = env.step
+        actions = list(batches)
+    else:
+        step = _scalar_step(env)
+        actions = rng.integers(len(env.action_pool), size=n_steps).tolist()
+
+    # warm up, which also compiles the Numba kernels
+    env.reset()
+    for action in actions[:100]:
+        step(action)
+
+    env.reset()
+    start = time.perf_counter()
+    for action in actions:
+        step(action)
+    steps_per_sec = n_steps * n_envs / (time.perf_counter() - start)
+
+    n_resets = max(n_steps // 10, 1)
+    start = time.perf_counter()
+    for _ in range(n_resets):
+        env.reset()
+    resets_per_sec = n_resets * n_envs / (time.perf_counter() - start)
+
+    metrics = {"steps_per_sec": steps_per_sec, "resets_per_sec": resets_per_sec,
+               "get_state_us": _latency(env.get_state, n_resets)}
+
+    if not batched:
+        # screenshots are taken after every step, so only the changed cells are repainted like in the GUI
+        screenshot_time = 0
+        for action in actions[:n_resets]:
+            step(action)
+            start = time.perf_counter()
+            env.screenshot()
+            screenshot_time += time.perf_counter() - start
+        metrics["screenshot_us"] = screenshot_time / n_resets * 1e6
+
+    metrics["step_alloc_bytes"] = _allocated_bytes(step, actions[:min(n_steps, 200)])
+
+    return metrics
+
+
+def _scalar_step(env):
+    """Returns a function that steps the environment and resets it when the episode ended"""
+    def step(action):
+        _, _, done, _ = env.step(action)
+        if done:
+            env.reset()
+
+    return step
+
+
+def _latency(function, n_calls: int):
+    """Returns the mean time of a call of function in microseconds"""
+    start = time.perf_counter()
+    for _ in range(n_calls):
+        function()
+
+    return (time.perf_counter() - start) / n_calls * 1e6
+
+
+def _allocated_bytes(step, actions):
+    """Returns the mean peak of the memory that is allocated during a step, including memory that is freed before the
+        step returns"""
+    tracemalloc.start()
+    total = 0
+    for action in actions:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        step(action)
+        _, peak = tracemalloc.get_traced_memory()
+        total += peak - before
+    tracemalloc.stop()
+
+    return total / len(actions)
+
+
+def run(cases, n_steps: int, pattern: str = None):
+    """Benchmarks the cases whose name contains pattern and returns the results with information about the machine"""
+    results = {}
+    for name, create, batched in cases:
+        if pattern is None or pattern in name:
+            results[name] = benchmark_env(create, batched, n_steps)
+            print(f"{name}: " + ", ".join(f"{metric} {value:,.1f}" for metric, value in results[name].items()))
+
+    return {"machine": {"python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform(),
+                        "processor": platform.processor()},
+            "n_steps": n_steps, "results": results}
+
+
+def compare(results: dict, baseline: dict, threshold: float):
+    """Returns the regressions of the results compared with the baseline as (name, metric, baseline value, value)
+        tuples. A metric regressed if it got worse by more than the threshold, a fraction of the baseline value"""
+    regressions = []
+    for name, metrics in results["results"].items():
+        for metric, value in metrics.items():
+            baseline_value = baseline["results"].get(name, {}).get(metric)
+            if baseline_value is None or baseline_value == 0:
+                continue
+
+            change = value / baseline_value - 1
+            if metric in HIGHER_IS_BETTER:
+                change = -change
+            if change > threshold:
+                regressions.append((name, metric, baseline_value, value))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=5_000, help="steps per environment and case")
+    parser.add_argument("--filter", help="only run the cases whose name contains this text")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of a previous run to compare the results with")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="fraction by which a metric may get worse before it counts as a regression")
+    args = parser.parse_args()
+
+    results = run(make_cases(), args.steps, args.filter)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+
+        regressions = compare(results, baseline, args.threshold)
+        for name, metric, baseline_value, value in regressions:
+            print(f"REGRESSION {name} {metric}: {baseline_value:,.1f} -> {value:,.1f}")
+        print(f"{len(regressions)} regressions with a threshold of {args.threshold:.0%}")
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
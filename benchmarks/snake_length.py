@@ -0,0 +1,85 @@
+""" Measures the cost of SnakeEnv.step for snakes of different lengths. Run with: python -m benchmarks.snake_length """
+
+import argparse
+import time
+
+from envs.action import Action
+from envs.snake_env import SNAKE_ACTION_INDICES, SNAKE_ACTION_POOL, SnakeEnv, Snake, FreeCellIndex
+
+
+def make_cycle(grid_size):
+    """Returns a closed path through the (grid_size - 1) x (grid_size - 1) top left part of the grid. Row 0 is walked
+        to the right, the rows below in a serpentine over the columns 1 and up, and column 0 leads back up to the
+        start"""
+    size = grid_size - 1
+    cycle = [(x, 0) for x in range(size)]
+    for y in range(1, size):
+        xs = range(size - 1, 0, -1) if y % 2 == 1 else range(1, size)
+        cycle += [(x, y) for x in xs]
+    cycle += [(0, y) for y in range(size - 1, 0, -1)]
+
+    return cycle
+
+
+def place_snake(env, cycle, length):
+    """Replaces the snake of a reset environment by one that covers the first cells of the cycle. Food is put outside
+        of the cycle so that the snake keeps its length while it follows the cycle"""
+    cells = cycle[:length][::-1]
+
+    env._occupancy = env._walls.copy()
+    for x, y in cells:
+        env._occupancy[y + env._pad, x + env._pad] = 1
+
+    env._snake = Snake(cells, env.grid_size, vel=SNAKE_ACTION_INDICES[Action.RIGHT],
+                       free_cells=FreeCellIndex(env.grid_size))
+    env._food_cell = (env.grid_size - 1, env.grid_size - 1)
+
+
+def cycle_actions(cycle):
+    """Returns the index of the action that leads from each cell of the cycle to the next one"""
+    deltas = {action.value: i for i, action in enumerate(SNAKE_ACTION_POOL)}
+    return [deltas[(x_ - x, y_ - y)] for (x, y), (x_, y_) in zip(cycle, cycle[1:] + cycle[:1])]
+
+
+def benchmark(grid_size, vision, lengths, n_steps):
+    """Returns the mean step time in microseconds for each snake length"""
+    cycle = make_cycle(grid_size)
+    actions = cycle_actions(cycle)
+
+    results = {}
+    for length in lengths:
+        env = SnakeEnv(grid_size, vision)
+        env.reset()
+        place_snake(env, cycle, length)
+
+        start = time.perf_counter()
+        for i in range(n_steps):
+            _, _, done, _ = env.step(actions[(length - 1 + i) % len(actions)])
+        elapsed = time.perf_counter() - start
+
+        assert not done and len(env._snake) == length
+        results[length] = elapsed / n_steps * 1e6
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--grid-size", type=int, default=101)
+    parser.add_argument("--vision", type=int, default=2)
+    parser.add_argument("--steps", type=int, default=20_000)
+    args = parser.parse_args()
+
+    max_length = (args.grid_size - 1) ** 2 - 1
+    lengths = sorted({2, 10, 100, 1_000, 5_000, max_length} & set(range(2, max_length + 1)))
+
+    results = benchmark(args.grid_size, args.vision, lengths, args.steps)
+
+    print(f"SnakeEnv.step, grid_size={args.grid_size}, vision={args.vision}")
+    for length, step_time in results.items():
+        print(f"  length {length:>6}: {step_time:6.2f} us/step")
+    print(f"  longest / shortest: {results[lengths[-1]] / results[lengths[0]]:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import json
+import os
+import tempfile
+import unittest
+from benchmarks.env_throughput import compare
+
+
+def write_results(directory, name, results):
+    """Writes results like env_throughput --output and returns the path of the file"""
+    path = os.path.join(directory, name)
+    with open(path, "w") as file:
+        json.dump({"machine": {}, "n_steps": 100, "results": results}, file)
+
+    return path
+
+
+class TestCompare(unittest.TestCase):
+    def test_compare(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline_path = write_results(directory, "baseline.json", {
+                "PongEnv/python": {"steps_per_sec": 1000.0, "get_state_us": 2.0, "step_bytes": 0.0},
+                "SnakeEnv/python": {"steps_per_sec": 500.0, "resets_per_sec": 100.0, "screenshot_us": 10.0},
+                "BreakoutEnv/python": {"steps_per_sec": 800.0}})
+            results_path = write_results(directory, "results.json", {
+                "PongEnv/python": {"steps_per_sec": 800.0, "get_state_us": 2.2, "step_bytes": 64.0},
+                "SnakeEnv/python": {"steps_per_sec": 700.0, "resets_per_sec": 90.0, "screenshot_us": 13.0},
+                "VecPongEnv/n_envs=256": {"steps_per_sec": 1.0}})
+
+            with open(baseline_path) as file:
+                baseline = json.load(file)
+            with open(results_path) as file:
+                results = json.load(file)
+
+        # fewer steps per second and longer latencies are regressions. Metrics without a baseline value or with a
+        # baseline value of 0, and metrics that got better or changed by less than the threshold are not
+        self.assertEqual(compare(results, baseline, 0.15), [("PongEnv/python", "steps_per_sec", 1000.0, 800.0),
+                                                            ("SnakeEnv/python", "screenshot_us", 10.0, 13.0)])
+        self.assertEqual(compare(results, baseline, 0.25), [("SnakeEnv/python", "screenshot_us", 10.0, 13.0)])
+        self.assertEqual(compare(results, baseline, 0.05), [("PongEnv/python", "steps_per_sec", 1000.0, 800.0),
+                                                            ("PongEnv/python", "get_state_us", 2.0, 2.2),
+                                                            ("SnakeEnv/python", "resets_per_sec", 100.0, 90.0),
+                                                            ("SnakeEnv/python", "screenshot_us", 10.0, 13.0)])
+        self.assertEqual(compare(baseline, baseline, 0), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
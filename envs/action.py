@@ -1,3 +1,4 @@
+import numpy as np
 from enum import Enum
 
 
@@ -6,3 +7,29 @@ class Action(Enum):
     RIGHT = (1, 0)
     DOWN = (0, 1)
     LEFT = (-1, 0)
+
+
+def action_indices(action_pool: list):
+    """Returns a dict that maps the actions of the pool as well as their integer indices to the indices. The
+        environments work with the indices and look up every action they receive in it, so that they accept both"""
+    indices = {action: i for i, action in enumerate(action_pool)}
+    indices.update({i: i for i in range(len(action_pool))})
+
+    return indices
+
+
+def action_index(indices: dict, action):
+    """Returns the index of the action from a dict of action_indices. Actions that can't be looked up because they are
+        not hashable, e.g. the paddle actions of Pong as a list or an array or an index as a 0-d array, are converted
+        to a tuple or a scalar first, so the common hashable actions are looked up without a conversion"""
+    try:
+        return indices[action]
+    except TypeError:
+        return indices[tuple(action) if np.ndim(action) > 0 else np.asarray(action).item()]
+
+
+def action_bin_edges(n_actions: int):
+    """Returns the inner edges of n_actions equally wide bins of the interval [-1, 1]. np.digitize(actions, edges,
+        right=True) maps continuous actions, single ones or whole arrays, to the index of their bin. Values outside of
+        the interval fall into the first or the last bin"""
+    return -1 + np.arange(1, n_actions) * (2 / n_actions)
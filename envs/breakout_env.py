@@ -1,8 +1,10 @@
 import numpy as np
-import random
 
 from .interface import EnvInterface
-from .action import Action
+from .action import Action, action_index, action_indices
+from .frame_buffer import FrameBuffer
+from .frame_skip import repeat_action
+from .random_stream import RANDOM_STREAM_STATE_DTYPE, RandomStream
 
 RED = (255, 51, 51)
 ORANGE = (255, 153, 51)
@@ -17,16 +19,59 @@ SPACE_TOP = 4
 
 N_LAYERS = 6
 COLORS = [RED, ORANGE, YELLOW, GREEN, LIGHT_BLUE, BLUE]
+N_BLOCKS = len(COLORS) * WIDTH
+
+# color of every block cell, used to paint the remaining blocks with a single masked assignment
+BLOCK_COLORS = np.repeat(np.array(COLORS, dtype=np.uint8)[:, np.newaxis], WIDTH, axis=1)
 
 BREAKOUT_ACTION_POOL = [Action.LEFT, Action.RIGHT]
+BREAKOUT_ACTION_INDICES = action_indices(BREAKOUT_ACTION_POOL)
+
+# the direction in which every action index moves the paddle
+BREAKOUT_PADDLE_MOVES = [action.value[0] for action in BREAKOUT_ACTION_POOL]
+
+# record that holds the state of a Breakout game, blocks[layer, x] = 1 if the block was destroyed and rng is the state
+# of the random stream of the game
+BREAKOUT_SNAPSHOT_DTYPE = np.dtype([("block_hit_counter", np.int32), ("steps_without_reward_counter", np.int32),
+                                    ("ball_pos", np.int8, (2,)), ("ball_vel", np.int8, (2,)),
+                                    ("paddle_x_start", np.int8), ("blocks", np.uint8, (N_LAYERS, WIDTH)),
+                                    ("rng", RANDOM_STREAM_STATE_DTYPE)])
+
+# compact record of the moving parts of a Breakout game, the blocks follow from the snapshot at the start of the episode
+BREAKOUT_ENCODING_DTYPE = np.dtype([("ball_pos", np.int8, (2,)), ("ball_vel", np.int8, (2,)),
+                                    ("paddle_x_start", np.int8)])
+
+
+def paint_breakout_region(region: np.ndarray, y_start: int, y_end: int, x_start: int, x_end: int, blocks: np.ndarray,
+                          ball_pos, paddle_x_start: int, paddle_x_end: int):
+    """Paints the cells of a Breakout board from y_start to y_end and x_start to x_end into the region"""
+    region[:] = (0, 0, 0)
+
+    layer_start, layer_end = max(y_start, SPACE_TOP) - SPACE_TOP, min(y_end, SPACE_TOP + N_LAYERS) - SPACE_TOP
+    if layer_start < layer_end:
+        remaining = blocks[layer_start:layer_end, x_start:x_end] == 0
+        blocks_region = region[layer_start + SPACE_TOP - y_start:layer_end + SPACE_TOP - y_start]
+        blocks_region[remaining] = BLOCK_COLORS[layer_start:layer_end, x_start:x_end][remaining]
+
+    if y_start <= ball_pos[1] < y_end and x_start <= ball_pos[0] < x_end:
+        region[ball_pos[1] - y_start, ball_pos[0] - x_start] = RED
+
+    # the paddle is in the last row of the board
+    paddle_start, paddle_end = max(paddle_x_start, x_start), min(paddle_x_end + 1, x_end)
+    if y_start <= HEIGHT - 1 < y_end and paddle_start < paddle_end:
+        region[HEIGHT - 1 - y_start, paddle_start - x_start:paddle_end - x_start] = RED
 
 
 class Ball:
-    """The Ball class is responsible for the ball movement"""
+    """The Ball class is responsible for the ball movement. Its start is drawn from the stream rng, without a stream
+        the position and the velocity are left for restore_snapshot"""
 
-    def __init__(self):
-        self.pos = [random.choice(range(0, WIDTH)), SPACE_TOP + N_LAYERS + 1]
-        self.vel = random.choice([[-1, 1], [1, 1]])
+    def __init__(self, rng: RandomStream = None):
+        if rng is None:
+            self.pos, self.vel = [0, 0], [0, 0]
+        else:
+            self.pos = [rng.integers(WIDTH), SPACE_TOP + N_LAYERS + 1]
+            self.vel = rng.choice([[-1, 1], [1, 1]])
 
     def move(self):
         """Moves the ball in the direction of the velocity"""
@@ -56,30 +101,57 @@ class Paddle:
 
 
 class BreakoutEnv(EnvInterface):
-    """The BreakoutEnv class provides the logic of the Breakout environment as well as all necessary methods to connect
-    with the reinforcement learning agents."""
+    """
+    The BreakoutEnv class provides the logic of the Breakout environment as well as all necessary methods to connect
+    with the reinforcement learning agents.
+
+    Args:
+        paddle_size (int): The width of the paddle in cells.
+        frame_skip (int): How many times every action is executed by step. The rewards of the repeated steps are summed
+            up and the repetition stops early when the episode ends.
+        seed: Optional seed of the RandomStream from which the start of the ball is drawn, an int or a
+            np.random.SeedSequence.
+    """
+
+    action_pool = BREAKOUT_ACTION_POOL
+    snapshot_dtype = BREAKOUT_SNAPSHOT_DTYPE
+    encoding_dtype = BREAKOUT_ENCODING_DTYPE
+
+    def __init__(self, paddle_size, frame_skip: int = 1, seed=None):
+        if frame_skip < 1:
+            raise ValueError("frame_skip must be greater than or equal to 1")
 
-    def __init__(self, paddle_size):
         self.paddle_size = paddle_size
+        self.frame_skip = frame_skip
+        self.rng = RandomStream(seed)
 
         self.output_dim = 2
 
         self.paddle = None
         self.ball = None
+        # blocks[layer, x] = 1 if the block was destroyed, 0 if it is still there
         self.blocks = None
 
         self.block_hit_counter = None
         self.steps_without_reward_counter = None
 
+        self._frame_buffer = FrameBuffer(HEIGHT, WIDTH, self._paint_region)
+
+    def seed(self, seed=None):
+        """Replaces the random stream of the environment by a new one that is seeded with seed"""
+        self.rng = RandomStream(seed)
+
     def reset(self):
         """Resets the environment"""
-        self.blocks = np.zeros(shape=(N_LAYERS, WIDTH))
-        self.ball = Ball()
+        self.blocks = np.zeros(shape=(N_LAYERS, WIDTH), dtype=np.uint8)
+        self.ball = Ball(self.rng)
         self.paddle = Paddle(self.paddle_size)
 
         self.block_hit_counter = 0
         self.steps_without_reward_counter = 0
 
+        self._frame_buffer.invalidate()
+
         return self.get_state()
 
     def get_state(self):
@@ -87,19 +159,42 @@ class BreakoutEnv(EnvInterface):
         return [self.paddle.x_start / (WIDTH - 1), self.paddle.x_end / (WIDTH - 1),
                 self.ball.pos[0] / (WIDTH - 1), self.ball.pos[1] / (HEIGHT - 1)]
 
-    def step(self, action: Action):
-        """Executes the action in the environment
+    def get_state_into(self, out: np.ndarray):
+        """Writes the state of the environment into out, a float32 array of length 4"""
+        out[:] = (self.paddle.x_start / (WIDTH - 1), self.paddle.x_end / (WIDTH - 1),
+                  self.ball.pos[0] / (WIDTH - 1), self.ball.pos[1] / (HEIGHT - 1))
+
+    def step(self, action: int):
+        """Executes the action frame_skip times in the environment, or until the episode ends. The action is an index
+            into BREAKOUT_ACTION_POOL or one of its actions
 
         Returns:
             state (list[float]): The new state of the environment after the action was executed.
-            reward (float): The reward for the executed action.
+            reward (float): The sum of the rewards for the executed actions.
             done (bool): done = True if game over, else done = False.
         """
+        reward, done, info = repeat_action(self._step, action_index(BREAKOUT_ACTION_INDICES, action), self.frame_skip)
+        return self.get_state(), reward, done, info
+
+    def step_into(self, action: int, obs_out: np.ndarray):
+        """Executes the action like step, but writes the new state into obs_out instead of allocating it. Returns
+            reward, done and info like step"""
+        reward, done, info = repeat_action(self._step, action_index(BREAKOUT_ACTION_INDICES, action), self.frame_skip)
+        self.get_state_into(obs_out)
+
+        return reward, done, info
+
+    def _step(self, action: int):
+        """Executes the action index once and returns the reward, done and the additional information"""
         reward = 0
 
-        if action == Action.RIGHT:
+        old_ball_pos = self.ball.pos[0], self.ball.pos[1]
+        old_x_start, old_x_end = self.paddle.x_start, self.paddle.x_end
+
+        paddle_move = BREAKOUT_PADDLE_MOVES[action]
+        if paddle_move == 1:
             self.paddle.right()
-        elif action == Action.LEFT:
+        elif paddle_move == -1:
             self.paddle.left()
 
         # left right walls
@@ -128,6 +223,7 @@ class BreakoutEnv(EnvInterface):
                 reward += 1
                 self.block_hit_counter += 1
                 self.blocks[ball_pos_[1] - SPACE_TOP, self.ball.pos[0]] = 1
+                self._frame_buffer.mark_cell(self.ball.pos[0], ball_pos_[1])
                 self.ball.vel[1] *= -1
 
             # diagonal
@@ -135,6 +231,7 @@ class BreakoutEnv(EnvInterface):
                 reward += 1
                 self.block_hit_counter += 1
                 self.blocks[ball_pos_[1] - SPACE_TOP, ball_pos_[0]] = 1
+                self._frame_buffer.mark_cell(ball_pos_[0], ball_pos_[1])
                 self.ball.vel[0] *= -1
                 self.ball.vel[1] *= -1
 
@@ -150,6 +247,16 @@ class BreakoutEnv(EnvInterface):
         else:
             self.ball.move()
 
+        self._frame_buffer.mark_cell(*old_ball_pos)
+        self._frame_buffer.mark_cell(*self.ball.pos)
+
+        # the paddle moves by at most one cell, so only the cells at its edges change
+        y = self.paddle.y_pos
+        if self.paddle.x_start != old_x_start:
+            self._frame_buffer.mark(y, y + 1, min(old_x_start, self.paddle.x_start),
+                                    max(old_x_start, self.paddle.x_start) + 1)
+            self._frame_buffer.mark(y, y + 1, min(old_x_end, self.paddle.x_end), max(old_x_end, self.paddle.x_end) + 1)
+
         if self.ball.pos[1] == HEIGHT - 1:
             done = True
             reward -= 10
@@ -161,24 +268,60 @@ class BreakoutEnv(EnvInterface):
         else:
             self.steps_without_reward_counter = 0
 
-        if self.block_hit_counter == len(COLORS) * WIDTH or self.steps_without_reward_counter > 1000:
+        if self.block_hit_counter == N_BLOCKS or self.steps_without_reward_counter > 1000:
             done = True
 
         # state, reward, done
-        return self.get_state(), reward, done, None
+        return reward, done, None
+
+    def get_snapshot(self):
+        """Returns the state of the game as a record of snapshot_dtype, which can be restored with restore_snapshot"""
+        snapshot = np.zeros((), dtype=BREAKOUT_SNAPSHOT_DTYPE)
+
+        snapshot["block_hit_counter"] = self.block_hit_counter
+        snapshot["steps_without_reward_counter"] = self.steps_without_reward_counter
+        snapshot["ball_pos"] = self.ball.pos
+        snapshot["ball_vel"] = self.ball.vel
+        snapshot["paddle_x_start"] = self.paddle.x_start
+        snapshot["blocks"] = self.blocks
+        self.rng.get_state(snapshot["rng"])
+
+        return snapshot
+
+    def get_encoding(self):
+        """Returns the position and the velocity of the ball and the start of the paddle as a tuple that fits
+            encoding_dtype"""
+        return tuple(self.ball.pos), tuple(self.ball.vel), self.paddle.x_start
+
+    def restore_snapshot(self, snapshot: np.ndarray):
+        """Restores the state of the game from a record of snapshot_dtype"""
+        # the game objects are built without a reset, so restoring draws no random numbers
+        if self.ball is None:
+            self.ball = Ball()
+            self.paddle = Paddle(self.paddle_size)
+            self.blocks = np.zeros(shape=(N_LAYERS, WIDTH), dtype=np.uint8)
+
+        self.block_hit_counter = int(snapshot["block_hit_counter"])
+        self.steps_without_reward_counter = int(snapshot["steps_without_reward_counter"])
+        self.ball.pos = snapshot["ball_pos"].tolist()
+        self.ball.vel = snapshot["ball_vel"].tolist()
+        self.paddle.x_start = int(snapshot["paddle_x_start"])
+        self.paddle.x_end = self.paddle.x_start + self.paddle_size - 1
+        self.blocks[:] = snapshot["blocks"]
+
+        self.rng.set_state(snapshot["rng"])
+        self._frame_buffer.invalidate()
 
     def screenshot(self):
-        """Returns a screenshot of the environment as a numpy array"""
-        arr = np.zeros([HEIGHT, WIDTH, 3], dtype=np.uint8)
-
-        for row_idx, row in enumerate(self.blocks):
-            for block_idx, block in enumerate(row):
-                if block == 0:
-                    arr[row_idx + SPACE_TOP][block_idx] = COLORS[row_idx]
-
-        arr[self.ball.pos[1], self.ball.pos[0]] = RED
-
-        for i in range(self.paddle.x_start, self.paddle.x_end + 1):
-            arr[self.paddle.y_pos][i] = RED
-
-        return arr
+        """Returns a screenshot of the environment as a numpy array. Only the cells that changed since the last
+            screenshot are repainted, the returned array is reused by the next screenshot"""
+        return self._frame_buffer.render()
+
+    def get_changed_regions(self):
+        """Returns the regions that were repainted by the last screenshot"""
+        return self._frame_buffer.changed_regions
+
+    def _paint_region(self, region: np.ndarray, y_start: int, y_end: int, x_start: int, x_end: int):
+        """Paints the cells of the board from y_start to y_end and x_start to x_end into the region"""
+        paint_breakout_region(region, y_start, y_end, x_start, x_end, self.blocks, self.ball.pos, self.paddle.x_start,
+                              self.paddle.x_end)
@@ -0,0 +1,67 @@
+import numpy as np
+from typing import Callable
+
+# above this many pending regions a full repaint is cheaper than repainting each region
+MAX_DIRTY_REGIONS = 32
+
+
+class FrameBuffer:
+    """
+    The FrameBuffer class keeps the last rendered RGB frame of an environment and only repaints the regions of it that
+    the environment marked as changed since the last render.
+
+    Regions are (y_start, y_end, x_start, x_end) tuples with exclusive ends, like the slices frame[y_start:y_end,
+    x_start:x_end].
+
+    The changed regions are not guarded by a lock, so an environment must be marked and rendered by the same thread.
+    E.g. the training thread of the GUI renders the environment it steps and sends copies of the frames to the GUI.
+
+    Args:
+        height (int): The height of the frame in cells.
+        width (int): The width of the frame in cells.
+        paint (Callable): Function paint(region, y_start, y_end, x_start, x_end) that paints the current state of the
+            environment into the region, which is the view frame[y_start:y_end, x_start:x_end].
+    """
+
+    def __init__(self, height: int, width: int, paint: Callable):
+        self.height = height
+        self.width = width
+        self.frame = np.zeros([height, width, 3], dtype=np.uint8)
+
+        # the regions that were repainted by the last call of render
+        self.changed_regions = []
+
+        self._paint = paint
+        self._dirty = []
+        self.invalidate()
+
+    def invalidate(self):
+        """Marks the whole frame as changed"""
+        self._dirty = [(0, self.height, 0, self.width)]
+
+    def mark(self, y_start: int, y_end: int, x_start: int, x_end: int):
+        """Marks a region of the frame as changed. The region is clipped to the frame"""
+        y_start, y_end = max(y_start, 0), min(y_end, self.height)
+        x_start, x_end = max(x_start, 0), min(x_end, self.width)
+
+        if y_start < y_end and x_start < x_end and self._dirty[:1] != [(0, self.height, 0, self.width)]:
+            if len(self._dirty) >= MAX_DIRTY_REGIONS:
+                self.invalidate()
+            else:
+                self._dirty.append((y_start, y_end, x_start, x_end))
+
+    def mark_cell(self, x: int, y: int):
+        """Marks a single cell of the frame as changed"""
+        self.mark(y, y + 1, x, x + 1)
+
+    def render(self):
+        """Repaints the changed regions and returns the frame. The frame is reused by the following renders, so it
+            must be copied if it is needed after the environment changed"""
+        dirty, self._dirty = self._dirty, []
+
+        for y_start, y_end, x_start, x_end in dirty:
+            self._paint(self.frame[y_start:y_end, x_start:x_end], y_start, y_end, x_start, x_end)
+
+        self.changed_regions = dirty
+
+        return self.frame
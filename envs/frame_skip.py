@@ -0,0 +1,107 @@
+from typing import Callable
+
+import numpy as np
+
+
+def repeat_action(step: Callable, action, frame_skip: int):
+    """Executes the action frame_skip times with the step function, which returns reward, done and info, or until the
+        episode ends
+
+    Returns:
+        reward (float): The sum of the rewards of the executed steps.
+        done (bool): done = True if the episode ended, else done = False.
+        info: The additional information returned by the last executed step.
+    """
+    reward, done, info = step(action)
+
+    for _ in range(frame_skip - 1):
+        if done:
+            break
+
+        next_reward, done, info = step(action)
+        reward += next_reward
+
+    return reward, done, info
+
+
+class FrameSkipWrapper:
+    """
+    The FrameSkipWrapper class repeats every action for several steps of the wrapped environment, so that the agent
+    chooses, stores and learns from one transition per frame_skip steps of game time. The rewards of the repeated steps
+    are summed up and the repetition stops early when the episode ends.
+
+    The environments accept a frame_skip argument themselves, this wrapper adds frame skipping to environments that were
+    created without it. To stack pixel observations of skipped frames, wrap an environment that skips frames in a
+    PixelObservationWrapper and not the other way round.
+
+    Args:
+        env: The environment to wrap. It must provide reset, step and get_state.
+        frame_skip (int): How many times every action is executed.
+    """
+
+    def __init__(self, env, frame_skip: int = 4):
+        if frame_skip < 1:
+            raise ValueError("frame_skip must be greater than or equal to 1")
+
+        self.env = env
+        self.frame_skip = frame_skip
+
+        self.output_dim = env.output_dim
+
+    def seed(self, seed=None):
+        """Seeds the random stream of the wrapped environment"""
+        self.env.seed(seed)
+
+    def reset(self):
+        """Resets the environment"""
+        return self.env.reset()
+
+    def step(self, action):
+        """Executes the action frame_skip times in the environment, or until the episode ends
+
+        Returns:
+            state: The state of the environment after the last executed step.
+            reward (float): The sum of the rewards of the executed steps.
+            done (bool): done = True if game over, else done = False.
+            info: The additional information returned by the last executed step.
+        """
+        reward, done, info = repeat_action(self._step, action, self.frame_skip)
+        return self.env.get_state(), reward, done, info
+
+    def step_into(self, action, obs_out: np.ndarray):
+        """Executes the action like step, but writes the new state into obs_out instead of allocating it. Returns
+            reward, done and info like step"""
+        reward, done, info = repeat_action(self._step, action, self.frame_skip)
+        self.env.get_state_into(obs_out)
+
+        return reward, done, info
+
+    def get_state(self):
+        """Returns the state of the wrapped environment"""
+        return self.env.get_state()
+
+    def get_state_into(self, out: np.ndarray):
+        """Writes the state of the wrapped environment into out"""
+        self.env.get_state_into(out)
+
+    def screenshot(self):
+        """Returns a screenshot of the wrapped environment"""
+        return self.env.screenshot()
+
+    def get_changed_regions(self):
+        """Returns the regions that were repainted by the last screenshot of the wrapped environment"""
+        return self.env.get_changed_regions()
+
+    def get_snapshot(self):
+        """Returns a snapshot of the wrapped environment"""
+        return self.env.get_snapshot()
+
+    def restore_snapshot(self, snapshot):
+        """Restores a snapshot of the wrapped environment"""
+        self.env.restore_snapshot(snapshot)
+
+    def _step(self, action):
+        """Executes the action once in the wrapped environment and returns the reward, done and the additional
+            information"""
+        _, reward, done, info = self.env.step(action)
+        return reward, done, info
@@ -0,0 +1,273 @@
+""" Records golden trajectories of the reference environments and replays them against other engines. Re-record the
+fixtures of the tests with: python -m envs.golden_trajectories envs/tests/golden """
+
+import argparse
+import os
+from functools import partial
+from typing import NamedTuple
+
+import numpy as np
+
+from .snake_env import SnakeEnv
+from .breakout_env import BreakoutEnv, N_LAYERS, SPACE_TOP, WIDTH
+from .pong_env import PongEnv
+
+# chance that the recording policies take a random action instead of the greedy one
+EPSILON = 0.25
+
+
+def snake_policy(state, rng: np.random.Generator):
+    """Heads for the food, which makes the snake grow, and turns randomly, which includes 180-degree turns"""
+    if rng.random() < EPSILON:
+        return int(rng.integers(4))
+
+    dx, dy = state[0], state[1]
+    if abs(dx) >= abs(dy):
+        return 3 if dx > 0 else 1
+
+    return 0 if dy > 0 else 2
+
+
+def breakout_policy(state, rng: np.random.Generator):
+    """Follows the ball with the paddle, which keeps the ball in play long enough to hit blocks diagonally"""
+    if rng.random() < EPSILON:
+        return int(rng.integers(2))
+
+    return 1 if state[2] > (state[0] + state[1]) / 2 else 0
+
+
+def pong_policy(state, rng: np.random.Generator):
+    """Follows the ball with both paddles"""
+    left_down, right_down = state[2] > state[0], state[2] > state[3]
+    if rng.random() < EPSILON:
+        left_down, right_down = rng.integers(2, size=2)
+
+    return 2 * int(left_down) + int(right_down)
+
+
+class WallBreakoutEnv(BreakoutEnv):
+    """A BreakoutEnv whose episodes start with the blocks of the outermost columns destroyed and the ball below the
+    blocks at a side wall, which the rng picks, moving up into it. Its first block hit is a diagonal one at the wall,
+    the only case in which the second wall check of BreakoutEnv._step turns the ball, and the open columns lead the
+    ball back to the walls later on"""
+
+    def reset(self):
+        super().reset()
+        self.blocks[:, [0, WIDTH - 1]] = 1
+
+        x = (WIDTH - 1) * int(self.rng.integers(2))
+        self.ball.pos = [x, SPACE_TOP + N_LAYERS]
+        self.ball.vel = [-1 if x == 0 else 1, -1]
+        self._frame_buffer.invalidate()
+
+        return self.get_state()
+
+
+# the reference environments of the fixtures, as factories that take a seed, and the policies that play them
+GOLDEN_ENVS = {
+    "snake_5_1": (partial(SnakeEnv, 5, 1), snake_policy),
+    "snake_7_2": (partial(SnakeEnv, 7, 2), snake_policy),
+    "snake_11_3": (partial(SnakeEnv, 11, 3), snake_policy),
+    "breakout_3": (partial(BreakoutEnv, 3), breakout_policy),
+    "breakout_15": (partial(BreakoutEnv, 15), breakout_policy),
+    "breakout_walls": (partial(WallBreakoutEnv, 3), breakout_policy),
+    "pong": (PongEnv, pong_policy),
+}
+
+
+class Divergence(NamedTuple):
+    """The first difference between a replay and a golden trajectory. field is "observation", "reward" or "done";
+        step is the index of the step after which it was found, -1 for the observation after a reset"""
+    episode: int
+    step: int
+    field: str
+    expected: object
+    actual: object
+
+    def __str__(self):
+        return f"{self.field} differs in episode {self.episode} at step {self.step}: expected {self.expected}, got " \
+               f"{self.actual}"
+
+
+def record(name: str, n_steps: int = 2000, seed: int = 0):
+    """Plays n_steps steps of the reference environment GOLDEN_ENVS[name] and returns them as a fixture, a dict of
+        arrays. Besides the actions, observations, rewards and dones of the steps, the fixture holds the snapshot at the
+        start of every episode and after every step in which the environment drew random numbers"""
+    make_env, policy = GOLDEN_ENVS[name]
+    env = make_env(seed=seed)
+    rng = np.random.default_rng(seed)
+
+    actions, observations, rewards, dones = [], [], [], []
+    start_snapshots, start_observations = [], []
+    random_steps, random_snapshots = [], []
+
+    done = True
+    for step in range(n_steps):
+        if done:
+            state = np.asarray(env.reset(), dtype=np.float32)
+            start_snapshots.append(env.get_snapshot())
+            start_observations.append(state)
+
+        action = policy(state, rng)
+
+        draws = _draws(env)
+        state, reward, done, _ = env.step(action)
+        state = np.asarray(state, dtype=np.float32)
+
+        if _draws(env) != draws:
+            random_steps.append(step)
+            random_snapshots.append(env.get_snapshot())
+
+        actions.append(action)
+        observations.append(state)
+        rewards.append(reward)
+        dones.append(done)
+
+    return {"actions": np.array(actions, dtype=np.int8), "observations": np.array(observations),
+            "rewards": np.array(rewards, dtype=np.float64), "dones": np.array(dones),
+            "start_snapshots": np.array(start_snapshots), "start_observations": np.array(start_observations),
+            "random_steps": np.array(random_steps, dtype=np.int64),
+            "random_snapshots": np.array(random_snapshots, dtype=start_snapshots[0].dtype)}
+
+
+def save(fixture: dict, path: str):
+    """Writes a fixture to a compressed .npz file"""
+    np.savez_compressed(path, **fixture)
+
+
+def load(path: str):
+    """Reads a fixture that was written by save"""
+    with np.load(path) as file:
+        return {key: file[key] for key in file.files}
+
+
+def replay(fixture: dict, env, resync: bool = True):
+    """Replays the actions of a fixture in env and returns the first Divergence from it, or None if env followed the
+        golden trajectory. env is either a scalar environment like SnakeEnv or a batched one like VecSnakeEnv with a
+        single game
+
+    Args:
+        fixture (dict): The golden trajectory, see record.
+        env: The environment under test. It must accept the snapshots of the reference environment.
+        resync (bool): If True the recorded snapshots are restored at the start of every episode and after every step
+            in which the reference environment drew random numbers, so that env does not need to draw the same
+            numbers. The rewards and dones of these steps are still compared. If False env must be seeded like the
+            reference environment.
+    """
+    engine = _BatchedEngine(env) if hasattr(env, "n_envs") else _ScalarEngine(env)
+    random_snapshots = dict(zip(fixture["random_steps"].tolist(), fixture["random_snapshots"]))
+
+    episode = 0
+    done = True
+    for step, action in enumerate(fixture["actions"].tolist()):
+        if done:
+            state = engine.reset(fixture["start_snapshots"][episode] if resync else None)
+            if not np.array_equal(state, fixture["start_observations"][episode]):
+                return Divergence(episode, -1, "observation", fixture["start_observations"][episode], state)
+
+        state, reward, done = engine.step(action)
+
+        if reward != fixture["rewards"][step]:
+            return Divergence(episode, step, "reward", fixture["rewards"][step], reward)
+        if done != fixture["dones"][step]:
+            return Divergence(episode, step, "done", fixture["dones"][step], done)
+
+        if resync and step in random_snapshots:
+            state = engine.restore(random_snapshots[step], done)
+        if not np.array_equal(state, fixture["observations"][step]):
+            return Divergence(episode, step, "observation", fixture["observations"][step], state)
+
+        if done:
+            episode += 1
+
+    return None
+
+
+class _ScalarEngine:
+    """Steps a scalar environment with action indices"""
+
+    def __init__(self, env):
+        self.env = env
+
+    def reset(self, snapshot):
+        """Starts a new episode, from the snapshot if it is given, and returns its first observation"""
+        self.env.reset()
+        if snapshot is not None:
+            self.env.restore_snapshot(snapshot)
+
+        return np.asarray(self.env.get_state(), dtype=np.float32)
+
+    def step(self, action: int):
+        """Returns the observation, reward and done of the action"""
+        state, reward, done, _ = self.env.step(action)
+        return np.asarray(state, dtype=np.float32), reward, done
+
+    def restore(self, snapshot, done: bool):
+        """Restores the state after a step from the snapshot and returns its observation"""
+        self.env.restore_snapshot(snapshot)
+        return np.asarray(self.env.get_state(), dtype=np.float32)
+
+
+class _BatchedEngine:
+    """Steps the only game of a batched environment with action indices. The game is reset automatically when it is
+    done, so the observation of the last step is taken from final_states"""
+
+    def __init__(self, env):
+        if env.n_envs != 1:
+            raise ValueError("batched environments must hold a single game")
+
+        self.env = env
+        self.env.reset()
+
+    def reset(self, snapshot):
+        """Starts a new episode, from the snapshot if it is given, and returns its first observation"""
+        if snapshot is not None:
+            self.env.restore_snapshots(snapshot, [0])
+
+        return self.env.get_state()[0]
+
+    def step(self, action: int):
+        """Returns the observation, reward and done of the action"""
+        states, rewards, dones, _ = self.env.step(np.array([action]))
+        state = self.env.final_states[0] if dones[0] else states[0]
+
+        return state, rewards[0], bool(dones[0])
+
+    def restore(self, snapshot, done: bool):
+        """Restores the state after a step from the snapshot and returns its observation. A game that is done was
+            already reset, so its observation is the one the snapshot describes and the game itself is left alone"""
+        if done:
+            return self._observe(snapshot)
+
+        self.env.restore_snapshots(snapshot, [0])
+        return self.env.get_state()[0]
+
+    def _observe(self, snapshot):
+        """Returns the observation of the snapshot without changing the game"""
+        current = self.env.get_snapshots([0])
+        self.env.restore_snapshots(snapshot, [0])
+        state = self.env.get_state()[0].copy()
+        self.env.restore_snapshots(current, [0])
+
+        return state
+
+
+def _draws(env):
+    """Returns a value that changes whenever the environment draws random numbers"""
+    state = env.rng.get_state()
+    return int(state["position"]), state["generator"].tobytes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("directory", help="directory the fixtures are written to")
+    parser.add_argument("--steps", type=int, default=2000)
+    args = parser.parse_args()
+
+    os.makedirs(args.directory, exist_ok=True)
+    for name in GOLDEN_ENVS:
+        save(record(name, args.steps), os.path.join(args.directory, f"{name}.npz"))
+
+
+if __name__ == "__main__":
+    main()
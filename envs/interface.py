@@ -1,6 +1,3 @@
-from .action import Action
-
-
 class EnvInterface:
     """The interface defines the methods which each environment class needs to implement"""
 
@@ -11,8 +8,14 @@ class EnvInterface:
             state (list[float]): The state of the environment"""
         pass
 
-    def step(self, action: Action) -> tuple:
-        """Executes an action in the environment
+    def seed(self, seed: object = None):
+        """Replaces the random stream of the environment by a new one that is seeded with seed, an int or a
+            np.random.SeedSequence"""
+        pass
+
+    def step(self, action: int) -> tuple:
+        """Executes an action in the environment, an integer index into the action_pool of the environment or one of
+            its actions
 
         Returns:
             state (list[float]): The new state of the environment after the action was executed.
@@ -22,12 +25,50 @@ class EnvInterface:
         """
         pass
 
+    def step_into(self, action: int, obs_out: object) -> tuple:
+        """Executes an action in the environment like step, but writes the new state into obs_out instead of allocating
+            it
+
+        Returns:
+            reward (float): The reward for the executed action.
+            done (bool): done = True if snake dies, else done = False.
+            score (int): How many pieces of food the snake ate so far.
+        """
+        pass
+
     def screenshot(self) -> object:
         """Returns:
             screenshot (numpy array): The image of the environment"""
         pass
 
+    def get_changed_regions(self) -> list:
+        """Returns:
+            regions (list[tuple]): The (y_start, y_end, x_start, x_end) regions of the image that changed with the last
+                screenshot"""
+        pass
+
     def get_state(self) -> object:
         """Returns
             state (list[float]): The state of the environment"""
         pass
+
+    def get_state_into(self, out: object):
+        """Writes the state of the environment into out, a float32 numpy array with the shape of the state"""
+        pass
+
+    def get_snapshot(self) -> object:
+        """Returns:
+            snapshot (numpy array): A fixed-size record of the state of the environment that restore_snapshot accepts"""
+        pass
+
+    def restore_snapshot(self, snapshot: object):
+        """Restores the state of the environment from a record returned by get_snapshot"""
+        pass
+
+    def get_encoding(self) -> tuple:
+        """Returns:
+            encoding (tuple): The moving parts of the state of the environment as a tuple that fits the record dtype
+                encoding_dtype. It is much smaller than a snapshot, the rest of the state follows from the snapshot at
+                the start of the episode and the encodings of the steps since then. The tuple holds copies, which
+                stay valid when the environment steps"""
+        pass
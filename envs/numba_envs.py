@@ -0,0 +1,738 @@
+import warnings
+
+import numpy as np
+
+from .action import action_index
+from .interface import EnvInterface
+from .frame_buffer import FrameBuffer, MAX_DIRTY_REGIONS
+from .frame_skip import repeat_action
+from .random_stream import RandomStream
+from .snake_env import (SNAKE_ACTION_INDICES, SNAKE_ACTION_POOL, SnakeEnv, paint_snake_region, snake_encoding_dtype,
+                        snake_snapshot_dtype)
+from .breakout_env import (BREAKOUT_ACTION_INDICES, BREAKOUT_ACTION_POOL, BREAKOUT_ENCODING_DTYPE,
+                           BREAKOUT_PADDLE_MOVES, BREAKOUT_SNAPSHOT_DTYPE, HEIGHT, N_BLOCKS, N_LAYERS, SPACE_TOP, WIDTH,
+                           BreakoutEnv, paint_breakout_region)
+from .pong_env import (PONG_ACTION_INDICES, PONG_ACTION_POOL, PONG_ENCODING_DTYPE, PONG_SNAPSHOT_DTYPE, PongEnv,
+                       paint_pong_region)
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+NUMBA_AVAILABLE = njit is not None
+
+BACKENDS = ["python", "numba"]
+
+# the (x, y) movement of every action of the snake and the vertical movement of the paddles for every Pong action
+SNAKE_MOVES = np.array([action.value for action in SNAKE_ACTION_POOL], dtype=np.int64)
+PONG_MOVES = np.array([[left.value[1], right.value[1]] for left, right in PONG_ACTION_POOL], dtype=np.int64)
+
+# positions of the counters of a snake game in its counter array
+HEAD_PTR, LENGTH, LAST_ACTION, N_FREE, FOOD, SCORE = range(6)
+
+# outcomes of a snake step
+MOVED, ATE, DIED = range(3)
+
+# positions of the values of a Breakout or Pong game in its state array
+BALL_X, BALL_Y, VEL_X, VEL_Y, PADDLE_X, BLOCK_HITS, STEPS_WITHOUT_REWARD = range(7)
+LEFT_PADDLE, RIGHT_PADDLE = 4, 5
+
+
+def _jit(function):
+    """Compiles the function with Numba if it is installed, else returns it unchanged"""
+    return njit(cache=True)(function) if NUMBA_AVAILABLE else function
+
+
+def make_env(env_class, *args, backend: str = "python", **kwargs):
+    """Creates an environment of the env class, e.g. make_env(SnakeEnv, 7, 2, backend="numba")
+
+    Args:
+        env_class: SnakeEnv, BreakoutEnv or PongEnv.
+        backend (str): "python" for the env class itself or "numba" for its counterpart with compiled kernels. Falls
+            back to the env class with a warning if Numba is not installed.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}")
+
+    if backend == "numba":
+        if NUMBA_AVAILABLE:
+            return NUMBA_ENVS[env_class](*args, **kwargs)
+        warnings.warn("Numba is not installed, falling back to the Python implementation of the environment")
+
+    return env_class(*args, **kwargs)
+
+
+@_jit
+def _mark(dirty, n_dirty, y_start, y_end, x_start, x_end):
+    """Records a changed region of the frame. More regions than the buffer holds mark the whole frame as changed"""
+    if n_dirty[0] < MAX_DIRTY_REGIONS:
+        dirty[n_dirty[0], 0] = y_start
+        dirty[n_dirty[0], 1] = y_end
+        dirty[n_dirty[0], 2] = x_start
+        dirty[n_dirty[0], 3] = x_end
+    n_dirty[0] = min(n_dirty[0] + 1, MAX_DIRTY_REGIONS + 1)
+
+
+@_jit
+def _swap_free_cells(free_cells, free_positions, flat_cell_a, flat_cell_b):
+    """Swaps the storage positions of two cells of the free cell index"""
+    position_a, position_b = free_positions[flat_cell_a], free_positions[flat_cell_b]
+    free_cells[position_a], free_cells[position_b] = flat_cell_b, flat_cell_a
+    free_positions[flat_cell_a], free_positions[flat_cell_b] = position_b, position_a
+
+
+@_jit
+def _snake_grow(body, free_cells, free_positions, counters, next_cell):
+    """Puts the head of the snake on the next cell without freeing the tail"""
+    counters[HEAD_PTR] = (counters[HEAD_PTR] + 1) % len(body)
+    body[counters[HEAD_PTR]] = next_cell
+    counters[LENGTH] += 1
+
+    counters[N_FREE] -= 1
+    _swap_free_cells(free_cells, free_positions, next_cell, free_cells[counters[N_FREE]])
+
+
+@_jit
+def _snake_reset(occupancy, walls, body, free_cells, free_positions, counters, grid_size, pad):
+    """Puts a fresh snake of two cells in the middle of the grid, heading up"""
+    occupancy[:] = walls
+    for flat_cell in range(grid_size * grid_size):
+        free_cells[flat_cell] = flat_cell
+        free_positions[flat_cell] = flat_cell
+
+    center = grid_size // 2
+    head = center * grid_size + center
+    tail = head + grid_size
+    body[0], body[1] = tail, head
+
+    counters[HEAD_PTR] = 1
+    counters[LENGTH] = 2
+    counters[N_FREE] = grid_size * grid_size
+    counters[LAST_ACTION] = 0
+    counters[SCORE] = 0
+
+    # the cells are removed from the free cell index in the same order as by a new Snake
+    for flat_cell in (head, tail):
+        counters[N_FREE] -= 1
+        _swap_free_cells(free_cells, free_positions, flat_cell, free_cells[counters[N_FREE]])
+
+    occupancy[center + pad, center + pad] = 1
+    occupancy[center + 1 + pad, center + pad] = 1
+
+
+@_jit
+def _snake_step(occupancy, body, free_cells, free_positions, counters, dirty, n_dirty, action, grid_size, vision,
+                pad):
+    """Moves the snake like SnakeEnv.step and returns MOVED, ATE or DIED. Food is not spawned"""
+    # SNAKE_ACTION_POOL is ordered clockwise, so the opposite of the last action is two indices away
+    if action == (counters[LAST_ACTION] + 2) % 4:
+        action = counters[LAST_ACTION]
+
+    head = body[counters[HEAD_PTR]]
+    head_x, head_y = head % grid_size, head // grid_size
+    x, y = head_x + SNAKE_MOVES[action, 0], head_y + SNAKE_MOVES[action, 1]
+
+    if occupancy[y + pad, x + pad]:
+        return DIED
+
+    _mark(dirty, n_dirty, head_y - vision, head_y + vision + 1, head_x - vision, head_x + vision + 1)
+    _mark(dirty, n_dirty, y - vision, y + vision + 1, x - vision, x + vision + 1)
+
+    occupancy[y + pad, x + pad] = 1
+    counters[LAST_ACTION] = action
+    next_cell = y * grid_size + x
+
+    if next_cell == counters[FOOD]:
+        _snake_grow(body, free_cells, free_positions, counters, next_cell)
+        counters[SCORE] += 1
+        return ATE
+
+    # the tail is read before growing, because a snake that fills the whole buffer grows into the tail's slot
+    tail = body[(counters[HEAD_PTR] - counters[LENGTH] + 1) % len(body)]
+    counters[LENGTH] -= 1
+    _snake_grow(body, free_cells, free_positions, counters, next_cell)
+
+    _swap_free_cells(free_cells, free_positions, tail, free_cells[counters[N_FREE]])
+    counters[N_FREE] += 1
+
+    tail_x, tail_y = tail % grid_size, tail // grid_size
+    occupancy[tail_y + pad, tail_x + pad] = 0
+    _mark(dirty, n_dirty, tail_y, tail_y + 1, tail_x, tail_x + 1)
+
+    return MOVED
+
+
+@_jit
+def _snake_observe(occupancy, body, counters, grid_size, vision, pad, state):
+    """Writes the state of a snake game like SnakeEnv.get_state into the state array"""
+    head, food = body[counters[HEAD_PTR]], counters[FOOD]
+    head_x, head_y = head % grid_size, head // grid_size
+
+    state[0] = (head_x - food % grid_size) / grid_size
+    state[1] = (head_y - food // grid_size) / grid_size
+
+    i = 2
+    for y in range(head_y + pad - vision, head_y + pad + vision + 1):
+        for x in range(head_x + pad - vision, head_x + pad + vision + 1):
+            state[i] = occupancy[y, x]
+            i += 1
+
+
+@_jit
+def _breakout_step(state, blocks, dirty, n_dirty, paddle_move, paddle_size):
+    """Executes an action like BreakoutEnv.step and returns the reward and whether the game is done"""
+    reward = 0
+    old_x, old_y, old_paddle_x = state[BALL_X], state[BALL_Y], state[PADDLE_X]
+
+    state[PADDLE_X] = min(max(state[PADDLE_X] + paddle_move, 0), WIDTH - paddle_size)
+    paddle_x_end = state[PADDLE_X] + paddle_size - 1
+
+    # left right walls
+    if state[BALL_X] == 0 and state[VEL_X] == -1 or state[BALL_X] == WIDTH - 1 and state[VEL_X] == 1:
+        state[VEL_X] *= -1
+
+    # roof
+    if state[BALL_Y] == 0:
+        state[VEL_Y] *= -1
+
+    # paddle
+    if state[BALL_Y] == HEIGHT - 2 and state[PADDLE_X] <= state[BALL_X] <= paddle_x_end:
+        state[VEL_X] = -1 if state[BALL_X] <= paddle_x_end - paddle_size // 2 else 1
+        state[VEL_Y] = -1
+
+    # blocks
+    next_x, next_y = state[BALL_X] + state[VEL_X], state[BALL_Y] + state[VEL_Y]
+    if SPACE_TOP + N_LAYERS > next_y >= SPACE_TOP:
+        layer = next_y - SPACE_TOP
+
+        # straight
+        if blocks[layer, state[BALL_X]] == 0:
+            reward += 1
+            state[BLOCK_HITS] += 1
+            blocks[layer, state[BALL_X]] = 1
+            _mark(dirty, n_dirty, next_y, next_y + 1, state[BALL_X], state[BALL_X] + 1)
+            state[VEL_Y] *= -1
+
+        # diagonal
+        elif blocks[layer, next_x] == 0:
+            reward += 1
+            state[BLOCK_HITS] += 1
+            blocks[layer, next_x] = 1
+            _mark(dirty, n_dirty, next_y, next_y + 1, next_x, next_x + 1)
+            state[VEL_X] *= -1
+            state[VEL_Y] *= -1
+
+    # check for walls again
+    if state[BALL_X] == 0 and state[VEL_X] == -1 or state[BALL_X] == WIDTH - 1 and state[VEL_X] == 1:
+        state[VEL_X] *= -1
+
+    # only move when there's no block in the way
+    next_x, next_y = state[BALL_X] + state[VEL_X], state[BALL_Y] + state[VEL_Y]
+    if not SPACE_TOP + N_LAYERS > next_y >= SPACE_TOP or blocks[next_y - SPACE_TOP, next_x] == 1:
+        state[BALL_X], state[BALL_Y] = next_x, next_y
+
+    _mark(dirty, n_dirty, old_y, old_y + 1, old_x, old_x + 1)
+    _mark(dirty, n_dirty, state[BALL_Y], state[BALL_Y] + 1, state[BALL_X], state[BALL_X] + 1)
+
+    # the paddle moves by at most one cell, so only the cells at its edges change
+    if state[PADDLE_X] != old_paddle_x:
+        x_start = min(old_paddle_x, state[PADDLE_X])
+        _mark(dirty, n_dirty, HEIGHT - 1, HEIGHT, x_start, x_start + 2)
+        _mark(dirty, n_dirty, HEIGHT - 1, HEIGHT, x_start + paddle_size - 1, x_start + paddle_size + 1)
+
+    done = state[BALL_Y] == HEIGHT - 1
+    if done:
+        reward -= 10
+
+    if reward == 0:
+        state[STEPS_WITHOUT_REWARD] += 1
+    else:
+        state[STEPS_WITHOUT_REWARD] = 0
+
+    if state[BLOCK_HITS] == N_BLOCKS or state[STEPS_WITHOUT_REWARD] > 1000:
+        done = True
+
+    return reward, done
+
+
+@_jit
+def _breakout_observe(state, paddle_size):
+    """Returns the state of a Breakout game like BreakoutEnv.get_state"""
+    return (state[PADDLE_X] / (WIDTH - 1), (state[PADDLE_X] + paddle_size - 1) / (WIDTH - 1),
+            state[BALL_X] / (WIDTH - 1), state[BALL_Y] / (HEIGHT - 1))
+
+
+@_jit
+def _pong_step(state, dirty, n_dirty, action):
+    """Executes an action like PongEnv.step and returns the reward and whether the game is done"""
+    reward = 0
+    old_x, old_y = state[BALL_X], state[BALL_Y]
+
+    for paddle, x in [(LEFT_PADDLE, 1), (RIGHT_PADDLE, 14)]:
+        old_pos = state[paddle]
+        state[paddle] = min(max(state[paddle] + PONG_MOVES[action, paddle - LEFT_PADDLE], 1), 7)
+        if state[paddle] != old_pos:
+            _mark(dirty, n_dirty, min(old_pos, state[paddle]) - 1, max(old_pos, state[paddle]) + 2, x, x + 1)
+
+    if (state[BALL_Y] == 0 and state[VEL_Y] == -1) or (state[BALL_Y] == 8 and state[VEL_Y] == 1):
+        state[VEL_Y] *= -1
+
+    if state[BALL_X] == 2 and abs(state[BALL_Y] - state[LEFT_PADDLE]) <= 1 or \
+            state[BALL_X] == 13 and abs(state[BALL_Y] - state[RIGHT_PADDLE]) <= 1:
+        state[VEL_X] *= -1
+        reward += 10
+
+    state[BALL_X] += state[VEL_X]
+    state[BALL_Y] += state[VEL_Y]
+
+    _mark(dirty, n_dirty, old_y, old_y + 1, old_x, old_x + 1)
+    _mark(dirty, n_dirty, state[BALL_Y], state[BALL_Y] + 1, state[BALL_X], state[BALL_X] + 1)
+
+    done = state[BALL_X] == 0 or state[BALL_X] == 15
+    if done:
+        reward -= 10
+
+    return reward, done
+
+
+@_jit
+def _pong_observe(state):
+    """Returns the state of a Pong game like PongEnv.get_state"""
+    return state[LEFT_PADDLE] / 9, state[BALL_X] / 16, state[BALL_Y] / 9, state[RIGHT_PADDLE] / 9
+
+
+class _NumbaEnv(EnvInterface):
+    """Base class of the Numba environments, which record the changed regions of the frame inside the kernels and pass
+    them on to the frame buffer when a screenshot is taken"""
+
+    def __init__(self, height: int, width: int, seed=None):
+        self.rng = RandomStream(seed)
+        self._frame_buffer = FrameBuffer(height, width, self._paint_region)
+        self._dirty = np.zeros((MAX_DIRTY_REGIONS, 4), dtype=np.int64)
+        self._n_dirty = np.zeros(1, dtype=np.int64)
+
+    def seed(self, seed=None):
+        """Replaces the random stream of the environment by a new one that is seeded with seed"""
+        self.rng = RandomStream(seed)
+
+    def screenshot(self):
+        """Returns a screenshot of the environment as a numpy array. Only the cells that changed since the last
+            screenshot are repainted, the returned array is reused by the next screenshot"""
+        n_dirty = self._n_dirty[0]
+        if n_dirty > MAX_DIRTY_REGIONS:
+            self._frame_buffer.invalidate()
+        else:
+            for region in self._dirty[:n_dirty].tolist():
+                self._frame_buffer.mark(*region)
+        self._n_dirty[0] = 0
+
+        return self._frame_buffer.render()
+
+    def get_changed_regions(self):
+        """Returns the regions that were repainted by the last screenshot"""
+        return self._frame_buffer.changed_regions
+
+    def _invalidate(self):
+        """Marks the whole frame as changed"""
+        self._n_dirty[0] = 0
+        self._frame_buffer.invalidate()
+
+
+class NumbaSnakeEnv(_NumbaEnv):
+    """
+    The NumbaSnakeEnv class follows the rules of the SnakeEnv class and returns the same observations, but keeps the
+    game in flat arrays that are updated by compiled kernels. Food is drawn from the random stream exactly like
+    SnakeEnv, so both classes play the same games for the same seed.
+
+    Args:
+        grid_size (int): The dimensions of the environment: Env dimension = grid_size x grid_size. Grid size must be odd
+            and greater than or equal to 3.
+        vision (int): The snake's vision aka. the area around the head of the snake which state is returned as input to
+            the RL agent. Snake size must be greater than or equal to 1.
+        frame_skip (int): How many times every action is executed by step. The rewards of the repeated steps are summed
+            up and the repetition stops early when the episode ends.
+        seed: Optional seed of the RandomStream from which the food positions are drawn, an int or a
+            np.random.SeedSequence.
+    """
+
+    action_pool = SNAKE_ACTION_POOL
+
+    def __init__(self, grid_size: int = 7, vision: int = 2, frame_skip: int = 1, seed=None):
+        if grid_size % 2 == 0 or grid_size < 3:
+            raise ValueError("grid_size must be odd and greater than or equal to 3")
+        if vision < 0:
+            raise ValueError("vision must be greater than or equal to 1")
+        if frame_skip < 1:
+            raise ValueError("frame_skip must be greater than or equal to 1")
+
+        super().__init__(grid_size, grid_size, seed)
+
+        self.grid_size = grid_size
+        self.vision = vision
+        self.frame_skip = frame_skip
+
+        self.output_dim = 4
+        self.snapshot_dtype = snake_snapshot_dtype(grid_size)
+        self.encoding_dtype = snake_encoding_dtype(grid_size)
+
+        self._pad = max(vision, 1)
+        self._walls = np.ones((grid_size + 2 * self._pad, grid_size + 2 * self._pad), dtype=np.uint8)
+        self._walls[self._pad:-self._pad, self._pad:-self._pad] = 0
+        self._occupancy = self._walls.copy()
+
+        self._body = np.zeros(grid_size * grid_size, dtype=np.int64)
+        self._free_cells = np.zeros(grid_size * grid_size, dtype=np.int64)
+        self._free_positions = np.zeros(grid_size * grid_size, dtype=np.int64)
+        self._counters = np.zeros(6, dtype=np.int64)
+
+    def reset(self):
+        """Resets the environment"""
+        _snake_reset(self._occupancy, self._walls, self._body, self._free_cells, self._free_positions, self._counters,
+                     self.grid_size, self._pad)
+        self._spawn_food()
+        self._invalidate()
+
+        return self.get_state()
+
+    def step(self, action: int):
+        """Executes the action frame_skip times in the environment, or until the episode ends. The action is an index
+            into SNAKE_ACTION_POOL or one of its actions
+
+        Returns:
+            state (np.ndarray): The new state of the environment after the action was executed.
+            reward (float): The sum of the rewards for the executed actions.
+            done (bool): done = True if snake dies, else done = False.
+            score (int): How many pieces of food the snake ate so far.
+        """
+        reward, done, score = repeat_action(self._step, action_index(SNAKE_ACTION_INDICES, action), self.frame_skip)
+        return self.get_state(), reward, done, score
+
+    def step_into(self, action: int, obs_out: np.ndarray):
+        """Executes the action like step, but writes the new state into obs_out instead of allocating it. Returns
+            reward, done and score like step"""
+        reward, done, score = repeat_action(self._step, action_index(SNAKE_ACTION_INDICES, action), self.frame_skip)
+        self.get_state_into(obs_out)
+
+        return reward, done, score
+
+    def _step(self, action: int):
+        """Executes the action index once and returns the reward, done and the score"""
+        outcome = _snake_step(self._occupancy, self._body, self._free_cells, self._free_positions, self._counters,
+                              self._dirty, self._n_dirty, action, self.grid_size, self.vision,
+                              self._pad)
+
+        if outcome == DIED:
+            done, reward = True, -1
+        elif outcome == ATE:
+            if self._spawn_food():
+                done, reward = False, 10
+            else:
+                done, reward = True, 100
+        else:
+            done, reward = False, -0.1
+
+        return reward, done, int(self._counters[SCORE])
+
+    def get_state(self):
+        """Returns the state of the environment which consists of the state of the area around the snake's head and the
+            position of the food"""
+        state = np.empty(2 + (2 * self.vision + 1) ** 2, dtype=np.float32)
+        self.get_state_into(state)
+
+        return state
+
+    def get_state_into(self, out: np.ndarray):
+        """Writes the state of the environment into out, a float32 array of length 2 + (2 * vision + 1)^2"""
+        _snake_observe(self._occupancy, self._body, self._counters, self.grid_size, self.vision, self._pad, out)
+
+    def get_snapshot(self):
+        """Returns the state of the game as a record of snapshot_dtype, which can be restored with restore_snapshot"""
+        snapshot = np.zeros((), dtype=self.snapshot_dtype)
+        head_ptr, length = self._counters[HEAD_PTR], self._counters[LENGTH]
+
+        snapshot["score"] = self._counters[SCORE]
+        snapshot["length"] = length
+        snapshot["food"] = self._counters[FOOD]
+        snapshot["last_action"] = self._counters[LAST_ACTION]
+        snapshot["body"][:length] = self._body[(head_ptr - np.arange(length)) % len(self._body)]
+        snapshot["free_cells"] = self._free_cells
+        snapshot["n_free"] = self._counters[N_FREE]
+        self.rng.get_state(snapshot["rng"])
+
+        return snapshot
+
+    def get_encoding(self):
+        """Returns the flat indices of the head and the food, the length and the last action of the snake as a tuple
+            that fits encoding_dtype, like SnakeEnv.get_encoding"""
+        counters = self._counters
+        return (self._body[counters[HEAD_PTR]], counters[FOOD], counters[LENGTH], counters[LAST_ACTION])
+
+    def restore_snapshot(self, snapshot: np.ndarray):
+        """Restores the state of the game from a record of snapshot_dtype"""
+        length = int(snapshot["length"])
+
+        self._body[:length] = snapshot["body"][:length][::-1]
+        self._free_cells[:] = snapshot["free_cells"]
+        self._free_positions[self._free_cells] = np.arange(len(self._free_cells))
+
+        self._counters[:] = [length - 1, length, snapshot["last_action"], snapshot["n_free"], snapshot["food"],
+                             snapshot["score"]]
+
+        self._occupancy[:] = self._walls
+        self._occupancy[self._pad:-self._pad, self._pad:-self._pad].flat[snapshot["body"][:length]] = 1
+
+        self.rng.set_state(snapshot["rng"])
+        self._invalidate()
+
+    def _paint_region(self, region: np.ndarray, y_start: int, y_end: int, x_start: int, x_end: int):
+        """Paints the cells of the grid from y_start to y_end and x_start to x_end into the region"""
+        head_y, head_x = divmod(int(self._body[self._counters[HEAD_PTR]]), self.grid_size)
+        food_y, food_x = divmod(int(self._counters[FOOD]), self.grid_size)
+
+        paint_snake_region(region, y_start, y_end, x_start, x_end, self._occupancy, self._pad, self.vision,
+                           (head_x, head_y), (food_x, food_y))
+
+    def _spawn_food(self):
+        """Spawns the food on a random free cell. True if food is spawned, False if food couldn't be spawned"""
+        n_free = int(self._counters[N_FREE])
+        if n_free == 0:
+            return False
+
+        self._counters[FOOD] = food = self._free_cells[self.rng.integers(n_free)]
+        self._frame_buffer.mark_cell(food % self.grid_size, food // self.grid_size)
+
+        return True
+
+
+class NumbaBreakoutEnv(_NumbaEnv):
+    """
+    The NumbaBreakoutEnv class follows the rules of the BreakoutEnv class and returns the same observations, but keeps
+    the game in flat arrays that are updated by compiled kernels. The ball is drawn from the random stream exactly like
+    BreakoutEnv, so both classes play the same games for the same seed.
+
+    Args:
+        paddle_size (int): The width of the paddle in cells.
+        frame_skip (int): How many times every action is executed by step. The rewards of the repeated steps are summed
+            up and the repetition stops early when the episode ends.
+        seed: Optional seed of the RandomStream from which the start of the ball is drawn, an int or a
+            np.random.SeedSequence.
+    """
+
+    action_pool = BREAKOUT_ACTION_POOL
+    snapshot_dtype = BREAKOUT_SNAPSHOT_DTYPE
+    encoding_dtype = BREAKOUT_ENCODING_DTYPE
+
+    def __init__(self, paddle_size: int, frame_skip: int = 1, seed=None):
+        if frame_skip < 1:
+            raise ValueError("frame_skip must be greater than or equal to 1")
+
+        super().__init__(HEIGHT, WIDTH, seed)
+
+        self.paddle_size = paddle_size
+        self.frame_skip = frame_skip
+        self.output_dim = 2
+
+        # blocks[layer, x] = 1 if the block was destroyed, 0 if it is still there
+        self.blocks = np.zeros((N_LAYERS, WIDTH), dtype=np.uint8)
+        self._state = np.zeros(7, dtype=np.int64)
+
+    def reset(self):
+        """Resets the environment"""
+        self.blocks[:] = 0
+
+        # the same random draws as a new Ball
+        ball_x = self.rng.integers(WIDTH)
+        vel_x, vel_y = self.rng.choice([[-1, 1], [1, 1]])
+        self._state[:] = [ball_x, SPACE_TOP + N_LAYERS + 1, vel_x, vel_y, WIDTH // 2 - self.paddle_size // 2, 0, 0]
+
+        self._invalidate()
+
+        return self.get_state()
+
+    def step(self, action: int):
+        """Executes the action frame_skip times in the environment, or until the episode ends. The action is an index
+            into BREAKOUT_ACTION_POOL or one of its actions
+
+        Returns:
+            state (list[float]): The new state of the environment after the action was executed.
+            reward (float): The sum of the rewards for the executed actions.
+            done (bool): done = True if game over, else done = False.
+        """
+        reward, done, info = repeat_action(self._step, action_index(BREAKOUT_ACTION_INDICES, action), self.frame_skip)
+        return self.get_state(), reward, done, info
+
+    def step_into(self, action: int, obs_out: np.ndarray):
+        """Executes the action like step, but writes the new state into obs_out instead of allocating it. Returns
+            reward, done and info like step"""
+        reward, done, info = repeat_action(self._step, action_index(BREAKOUT_ACTION_INDICES, action), self.frame_skip)
+        self.get_state_into(obs_out)
+
+        return reward, done, info
+
+    def _step(self, action: int):
+        """Executes the action index once and returns the reward, done and the additional information"""
+        reward, done = _breakout_step(self._state, self.blocks, self._dirty, self._n_dirty,
+                                      BREAKOUT_PADDLE_MOVES[action], self.paddle_size)
+
+        return reward, done, None
+
+    def get_state(self):
+        """Returns the state of the environment which consists of the paddle position and the ball position"""
+        return list(_breakout_observe(self._state, self.paddle_size))
+
+    def get_state_into(self, out: np.ndarray):
+        """Writes the state of the environment into out, a float32 array of length 4"""
+        out[:] = _breakout_observe(self._state, self.paddle_size)
+
+    def get_snapshot(self):
+        """Returns the state of the game as a record of snapshot_dtype, which can be restored with restore_snapshot"""
+        snapshot = np.zeros((), dtype=BREAKOUT_SNAPSHOT_DTYPE)
+
+        snapshot["block_hit_counter"] = self._state[BLOCK_HITS]
+        snapshot["steps_without_reward_counter"] = self._state[STEPS_WITHOUT_REWARD]
+        snapshot["ball_pos"] = self._state[BALL_X:BALL_Y + 1]
+        snapshot["ball_vel"] = self._state[VEL_X:VEL_Y + 1]
+        snapshot["paddle_x_start"] = self._state[PADDLE_X]
+        snapshot["blocks"] = self.blocks
+        self.rng.get_state(snapshot["rng"])
+
+        return snapshot
+
+    def get_encoding(self):
+        """Returns the position and the velocity of the ball and the start of the paddle as a tuple that fits
+            encoding_dtype"""
+        state = self._state.tolist()
+        return state[BALL_X:BALL_Y + 1], state[VEL_X:VEL_Y + 1], state[PADDLE_X]
+
+    def restore_snapshot(self, snapshot: np.ndarray):
+        """Restores the state of the game from a record of snapshot_dtype"""
+        self._state[BLOCK_HITS] = snapshot["block_hit_counter"]
+        self._state[STEPS_WITHOUT_REWARD] = snapshot["steps_without_reward_counter"]
+        self._state[BALL_X:BALL_Y + 1] = snapshot["ball_pos"]
+        self._state[VEL_X:VEL_Y + 1] = snapshot["ball_vel"]
+        self._state[PADDLE_X] = snapshot["paddle_x_start"]
+        self.blocks[:] = snapshot["blocks"]
+
+        self.rng.set_state(snapshot["rng"])
+        self._invalidate()
+
+    def _paint_region(self, region: np.ndarray, y_start: int, y_end: int, x_start: int, x_end: int):
+        """Paints the cells of the board from y_start to y_end and x_start to x_end into the region"""
+        ball_x, ball_y, _, _, paddle_x = self._state[:PADDLE_X + 1].tolist()
+
+        paint_breakout_region(region, y_start, y_end, x_start, x_end, self.blocks, (ball_x, ball_y), paddle_x,
+                              paddle_x + self.paddle_size - 1)
+
+
+class NumbaPongEnv(_NumbaEnv):
+    """
+    The NumbaPongEnv class follows the rules of the PongEnv class and returns the same observations, but keeps the
+    game in a flat array that is updated by compiled kernels. The ball is drawn from the random stream exactly like
+    PongEnv, so both classes play the same games for the same seed.
+
+    Args:
+        frame_skip (int): How many times every action is executed by step. The rewards of the repeated steps are summed
+            up and the repetition stops early when the episode ends.
+        seed: Optional seed of the RandomStream from which the start of the ball is drawn, an int or a
+            np.random.SeedSequence.
+    """
+
+    action_pool = PONG_ACTION_POOL
+    snapshot_dtype = PONG_SNAPSHOT_DTYPE
+    encoding_dtype = PONG_ENCODING_DTYPE
+
+    def __init__(self, frame_skip: int = 1, seed=None):
+        if frame_skip < 1:
+            raise ValueError("frame_skip must be greater than or equal to 1")
+
+        super().__init__(9, 16, seed)
+
+        self.frame_skip = frame_skip
+        self.output_dim = 4
+
+        self._state = np.zeros(6, dtype=np.int64)
+
+    def reset(self):
+        """Resets the environment"""
+        # the same random draws as a new Ball
+        ball_x, ball_y = self.rng.integers(3, 13), self.rng.integers(9)
+        if ball_x < 8:
+            vel_x, vel_y = self.rng.choice([[1, 1], [1, -1]])
+        else:
+            vel_x, vel_y = self.rng.choice([[-1, 1], [-1, -1]])
+        self._state[:] = [ball_x, ball_y, vel_x, vel_y, 4, 4]
+
+        self._invalidate()
+
+        return self.get_state()
+
+    def step(self, action: int):
+        """Executes the action frame_skip times in the environment, or until the episode ends. The action is an index
+            into PONG_ACTION_POOL or one of its actions
+
+        Returns:
+            state (list[float]): The new state of the environment after the action was executed.
+            reward (float): The sum of the rewards for the executed actions.
+            done (bool): done = True if snake dies, else done = False.
+        """
+        reward, done, info = repeat_action(self._step, action_index(PONG_ACTION_INDICES, action), self.frame_skip)
+        return self.get_state(), reward, done, info
+
+    def step_into(self, action: int, obs_out: np.ndarray):
+        """Executes the action like step, but writes the new state into obs_out instead of allocating it. Returns
+            reward, done and info like step"""
+        reward, done, info = repeat_action(self._step, action_index(PONG_ACTION_INDICES, action), self.frame_skip)
+        self.get_state_into(obs_out)
+
+        return reward, done, info
+
+    def _step(self, action: int):
+        """Executes the action index once and returns the reward, done and the additional information"""
+        reward, done = _pong_step(self._state, self._dirty, self._n_dirty, action)
+
+        return reward, done, None
+
+    def get_state(self):
+        """Returns the state of the environment which consists of the left paddle position, the ball position, and the
+            right paddle position"""
+        return list(_pong_observe(self._state))
+
+    def get_state_into(self, out: np.ndarray):
+        """Writes the state of the environment into out, a float32 array of length 4"""
+        out[:] = _pong_observe(self._state)
+
+    def get_snapshot(self):
+        """Returns the state of the game as a record of snapshot_dtype, which can be restored with restore_snapshot"""
+        snapshot = np.zeros((), dtype=PONG_SNAPSHOT_DTYPE)
+
+        snapshot["ball_pos"] = self._state[BALL_X:BALL_Y + 1]
+        snapshot["ball_vel"] = self._state[VEL_X:VEL_Y + 1]
+        snapshot["paddle_pos"] = self._state[LEFT_PADDLE:RIGHT_PADDLE + 1]
+        self.rng.get_state(snapshot["rng"])
+
+        return snapshot
+
+    def get_encoding(self):
+        """Returns the position and the velocity of the ball and the positions of the paddles as a tuple that fits
+            encoding_dtype"""
+        state = self._state.tolist()
+        return state[BALL_X:BALL_Y + 1], state[VEL_X:VEL_Y + 1], state[LEFT_PADDLE:RIGHT_PADDLE + 1]
+
+    def restore_snapshot(self, snapshot: np.ndarray):
+        """Restores the state of the game from a record of snapshot_dtype"""
+        self._state[BALL_X:BALL_Y + 1] = snapshot["ball_pos"]
+        self._state[VEL_X:VEL_Y + 1] = snapshot["ball_vel"]
+        self._state[LEFT_PADDLE:RIGHT_PADDLE + 1] = snapshot["paddle_pos"]
+
+        self.rng.set_state(snapshot["rng"])
+        self._invalidate()
+
+    def _paint_region(self, region: np.ndarray, y_start: int, y_end: int, x_start: int, x_end: int):
+        """Paints the cells of the field from y_start to y_end and x_start to x_end into the region"""
+        ball_x, ball_y, _, _, left_paddle_pos, right_paddle_pos = self._state.tolist()
+
+        paint_pong_region(region, y_start, y_end, x_start, x_end, (ball_x, ball_y), left_paddle_pos, right_paddle_pos)
+
+
+NUMBA_ENVS = {SnakeEnv: NumbaSnakeEnv, BreakoutEnv: NumbaBreakoutEnv, PongEnv: NumbaPongEnv}
@@ -0,0 +1,147 @@
+import numpy as np
+
+# ITU-R BT.601 luma weights, scaled so that the grayscale frames lie between 0 and 1
+GRAYSCALE_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32) / 255
+
+
+class PixelObservationWrapper:
+    """
+    The PixelObservationWrapper class replaces the feature vector observations of an environment with its last
+    screenshots. The screenshots are converted to float32 frames in [0, 1] and stacked along the channel axis, which
+    gives observations of shape (n_frames * channels, height, width) that can be fed to a ConvEncoder.
+
+    The frames are written into a preallocated ring buffer that is longer than the stack. Every observation is a view
+    of n_frames consecutive frames of the buffer, so stacking copies nothing. When the write position reaches the end
+    of the buffer, the last n_frames - 1 frames are copied to its start. An observation stays valid for the next
+    n_frames steps of its episode, which is enough to store the state and the new state of a transition; copy it to
+    keep it longer.
+
+    Wrapping does not reset the environment. The frame buffer is allocated and filled with the current screenshot on
+    the first reset or get_state, observation_shape is known from then on.
+
+    Args:
+        env: The environment to wrap. It must provide reset, step and screenshot.
+        n_frames (int): The number of consecutive frames in an observation.
+        grayscale (bool): If True frames have one grayscale channel, else three RGB channels.
+        downsample (int): Only every downsample-th row and column of the screenshot is kept.
+    """
+
+    def __init__(self, env, n_frames: int = 4, grayscale: bool = True, downsample: int = 1):
+        if n_frames < 1:
+            raise ValueError("n_frames must be greater than or equal to 1")
+        if downsample < 1:
+            raise ValueError("downsample must be greater than or equal to 1")
+
+        self.env = env
+        self.n_frames = n_frames
+        self.grayscale = grayscale
+        self.downsample = downsample
+
+        self.output_dim = env.output_dim
+
+        # the frame buffer is allocated with the first screenshot, so that wrapping does not reset the environment
+        self.observation_shape = None
+        self._env_state = None
+        self._frames = None
+        self._position = n_frames - 1
+
+    def seed(self, seed=None):
+        """Seeds the random stream of the wrapped environment"""
+        self.env.seed(seed)
+
+    def reset(self):
+        """Resets the environment and fills the frame stack with its first screenshot"""
+        self.env.reset()
+        self._fill_frames()
+
+        return self.get_state()
+
+    def step(self, action):
+        """Executes the action in the environment
+
+        Returns:
+            state (np.ndarray): The stacked frames after the action was executed.
+            reward (float): The reward for the executed action.
+            done (bool): done = True if game over, else done = False.
+            info: The additional information returned by the environment.
+        """
+        reward, done, info = self.env.step_into(action, self._env_state)
+
+        self._position += 1
+        if self._position == len(self._frames):
+            self._position = self.n_frames - 1
+            self._frames[:self._position] = self._frames[len(self._frames) - self._position:]
+
+        self._write_frame(self._position)
+
+        return self.get_state(), reward, done, info
+
+    def step_into(self, action, obs_out: np.ndarray):
+        """Executes the action like step, but copies the stacked frames into obs_out. Returns reward, done and info
+            like step"""
+        _, reward, done, info = self.step(action)
+        self.get_state_into(obs_out)
+
+        return reward, done, info
+
+    def get_state(self):
+        """Returns the last n_frames frames as a (n_frames * channels, height, width) view of the frame buffer"""
+        if self._frames is None:
+            self._fill_frames()
+
+        return self._frames[self._position - self.n_frames + 1:self._position + 1].reshape(self.observation_shape)
+
+    def get_state_into(self, out: np.ndarray):
+        """Copies the last n_frames frames into out, a float32 array of shape observation_shape"""
+        out[:] = self.get_state()
+
+    def screenshot(self):
+        """Returns a screenshot of the wrapped environment"""
+        return self.env.screenshot()
+
+    def get_changed_regions(self):
+        """Returns the regions that were repainted by the last screenshot of the wrapped environment"""
+        return self.env.get_changed_regions()
+
+    def get_snapshot(self):
+        """Returns a snapshot of the wrapped environment, which does not contain the stacked frames"""
+        return self.env.get_snapshot()
+
+    def restore_snapshot(self, snapshot):
+        """Restores a snapshot of the wrapped environment and fills the frame stack with the restored screenshot like
+            reset, because the snapshot does not contain the frames before it"""
+        self.env.restore_snapshot(snapshot)
+        self._fill_frames()
+
+    def get_encoding(self):
+        """Returns the encoding of the wrapped environment"""
+        return self.env.get_encoding()
+
+    def _fill_frames(self):
+        """Fills the frame stack with the current screenshot of the environment"""
+        if self._frames is None:
+            self._allocate_frames()
+
+        self._position = self.n_frames - 1
+        self._write_frame(self._position)
+        self._frames[:self._position] = self._frames[self._position]
+
+    def _allocate_frames(self):
+        """Allocates the frame buffer for screenshots of the shape of the current one"""
+        height, width, _ = self.env.screenshot()[::self.downsample, ::self.downsample].shape
+        channels = 1 if self.grayscale else 3
+
+        # receives the feature vector states of the environment, which are not used
+        self._env_state = np.empty(np.shape(self.env.get_state()), dtype=np.float32)
+
+        self.observation_shape = (self.n_frames * channels, height, width)
+        self._frames = np.zeros((3 * self.n_frames, channels, height, width), dtype=np.float32)
+
+    def _write_frame(self, position: int):
+        """Converts the current screenshot of the environment into the frame at the position of the buffer"""
+        screenshot = self.env.screenshot()[::self.downsample, ::self.downsample]
+
+        if self.grayscale:
+            np.einsum("hwc,c->hw", screenshot, GRAYSCALE_WEIGHTS, out=self._frames[position, 0])
+        else:
+            np.multiply(screenshot.transpose(2, 0, 1), 1 / 255, out=self._frames[position])
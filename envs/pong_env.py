@@ -1,21 +1,53 @@
-import random
 import numpy as np
 
-from .action import Action
+from .interface import EnvInterface
+from .action import Action, action_index, action_indices
+from .frame_buffer import FrameBuffer
+from .frame_skip import repeat_action
+from .random_stream import RANDOM_STREAM_STATE_DTYPE, RandomStream
 
 PONG_ACTION_POOL = [(Action.UP, Action.UP), (Action.UP, Action.DOWN), (Action.DOWN, Action.UP),
                     (Action.DOWN, Action.DOWN)]
+PONG_ACTION_INDICES = action_indices(PONG_ACTION_POOL)
+
+# the directions in which every action index moves the (left, right) paddles, -1 is up
+PONG_PADDLE_MOVES = [(left.value[1], right.value[1]) for left, right in PONG_ACTION_POOL]
+
+# record that holds the state of a Pong game, the paddle positions are the ones of the left and the right paddle and
+# rng is the state of the random stream of the game
+PONG_SNAPSHOT_DTYPE = np.dtype([("ball_pos", np.int8, (2,)), ("ball_vel", np.int8, (2,)),
+                                ("paddle_pos", np.int8, (2,)), ("rng", RANDOM_STREAM_STATE_DTYPE)])
+
+# compact record of a Pong game, the snapshot without the state of the random stream
+PONG_ENCODING_DTYPE = np.dtype([("ball_pos", np.int8, (2,)), ("ball_vel", np.int8, (2,)),
+                                ("paddle_pos", np.int8, (2,))])
+
+
+def paint_pong_region(region, y_start, y_end, x_start, x_end, ball_pos, left_paddle_pos, right_paddle_pos):
+    """Paints the cells of a Pong field from y_start to y_end and x_start to x_end into the region"""
+    region[:] = (0, 0, 0)
+
+    white = (255, 255, 255)
+
+    for paddle_pos, x in [(left_paddle_pos, 1), (right_paddle_pos, 14)]:
+        if x_start <= x < x_end:
+            paddle_start, paddle_end = max(paddle_pos - 1, y_start), min(paddle_pos + 2, y_end)
+            region[paddle_start - y_start:max(paddle_end, paddle_start) - y_start, x - x_start] = white
+
+    if y_start <= ball_pos[1] < y_end and x_start <= ball_pos[0] < x_end:
+        region[ball_pos[1] - y_start, ball_pos[0] - x_start] = white
 
 
 class Ball:
-    """The Ball class is responsible for the ball movement based on action input"""
+    """The Ball class is responsible for the ball movement based on action input. Its start is drawn from the stream
+        rng, without a stream the position and the velocity are left for restore_snapshot"""
 
-    def __init__(self):
-        self.pos = [random.choice(range(3, 13)), random.choice(range(9))]
-        if self.pos[0] < 8:
-            self.vel = random.choice([[1, 1], [1, -1]])
+    def __init__(self, rng: RandomStream = None):
+        if rng is None:
+            self.pos, self.vel = [0, 0], [0, 0]
         else:
-            self.vel = random.choice([[-1, 1], [-1, -1]])
+            self.pos = [rng.integers(3, 13), rng.integers(9)]
+            self.vel = rng.choice([[1, 1], [1, -1]] if self.pos[0] < 8 else [[-1, 1], [-1, -1]])
 
     def move(self):
         """Moves the ball in the direction of the velocity"""
@@ -40,44 +72,86 @@ class Paddle:
             self.pos += 1
 
 
-class PongEnv:
-    """The PongEnv class provides the logic of the Pong environment as well as all necessary methods to connect
-            with the reinforcement learning agents."""
+class PongEnv(EnvInterface):
+    """
+    The PongEnv class provides the logic of the Pong environment as well as all necessary methods to connect with the
+    reinforcement learning agents.
 
-    def __init__(self):
+    Args:
+        frame_skip (int): How many times every action is executed by step. The rewards of the repeated steps are summed
+            up and the repetition stops early when the episode ends.
+        seed: Optional seed of the RandomStream from which the start of the ball is drawn, an int or a
+            np.random.SeedSequence.
+    """
+
+    action_pool = PONG_ACTION_POOL
+    snapshot_dtype = PONG_SNAPSHOT_DTYPE
+    encoding_dtype = PONG_ENCODING_DTYPE
+
+    def __init__(self, frame_skip: int = 1, seed=None):
+        if frame_skip < 1:
+            raise ValueError("frame_skip must be greater than or equal to 1")
+
+        self.frame_skip = frame_skip
+        self.rng = RandomStream(seed)
         self.output_dim = 4
 
         self.ball = None
         self.left_paddle = None
         self.right_paddle = None
 
+        self._frame_buffer = FrameBuffer(9, 16, self._paint_region)
+
+    def seed(self, seed=None):
+        """Replaces the random stream of the environment by a new one that is seeded with seed"""
+        self.rng = RandomStream(seed)
+
     def reset(self):
         """Resets the environment"""
-        self.ball = Ball()
+        self.ball = Ball(self.rng)
         self.left_paddle = Paddle()
         self.right_paddle = Paddle()
 
+        self._frame_buffer.invalidate()
+
         return self.get_state()
 
-    def step(self, action):
-        """Executes the action in the environment
+    def step(self, action: int):
+        """Executes the action frame_skip times in the environment, or until the episode ends. The action is an index
+            into PONG_ACTION_POOL or one of its actions
 
         Returns:
             state (list[float]): The new state of the environment after the action was executed.
-            reward (float): The reward for the executed action.
+            reward (float): The sum of the rewards for the executed actions.
             done (bool): done = True if snake dies, else done = False.
         """
-        left_action, right_action = action
+        reward, done, info = repeat_action(self._step, action_index(PONG_ACTION_INDICES, action), self.frame_skip)
+        return self.get_state(), reward, done, info
+
+    def step_into(self, action: int, obs_out: np.ndarray):
+        """Executes the action like step, but writes the new state into obs_out instead of allocating it. Returns
+            reward, done and info like step"""
+        reward, done, info = repeat_action(self._step, action_index(PONG_ACTION_INDICES, action), self.frame_skip)
+        self.get_state_into(obs_out)
+
+        return reward, done, info
+
+    def _step(self, action: int):
+        """Executes the action index once and returns the reward, done and the additional information"""
+        left_move, right_move = PONG_PADDLE_MOVES[action]
         reward = 0
 
-        if left_action == Action.UP:
+        old_ball_pos = self.ball.pos[0], self.ball.pos[1]
+        old_left_pos, old_right_pos = self.left_paddle.pos, self.right_paddle.pos
+
+        if left_move == -1:
             self.left_paddle.up()
-        elif left_action == Action.DOWN:
+        elif left_move == 1:
             self.left_paddle.down()
 
-        if right_action == Action.UP:
+        if right_move == -1:
             self.right_paddle.up()
-        elif right_action == Action.DOWN:
+        elif right_move == 1:
             self.right_paddle.down()
 
         if (self.ball.pos[1] == 0 and self.ball.vel[1] == -1) or (self.ball.pos[1] == 8 and self.ball.vel[1] == 1):
@@ -95,34 +169,73 @@ class PongEnv:
 
         self.ball.move()
 
+        self._frame_buffer.mark_cell(*old_ball_pos)
+        self._frame_buffer.mark_cell(*self.ball.pos)
+        if self.left_paddle.pos != old_left_pos:
+            self._frame_buffer.mark(min(old_left_pos, self.left_paddle.pos) - 1,
+                                    max(old_left_pos, self.left_paddle.pos) + 2, 1, 2)
+        if self.right_paddle.pos != old_right_pos:
+            self._frame_buffer.mark(min(old_right_pos, self.right_paddle.pos) - 1,
+                                    max(old_right_pos, self.right_paddle.pos) + 2, 14, 15)
+
         if self.ball.pos[0] == 0 or self.ball.pos[0] == 15:
             reward -= 10
             done = True
         else:
             done = False
 
-        return self.get_state(), reward, done, None
+        return reward, done, None
 
-    def screenshot(self):
-        """Returns a screenshot of the environment as a numpy array"""
-        arr = np.zeros([9, 16, 3], dtype=np.uint8)
-        arr[:] = (0, 0, 0)
+    def get_snapshot(self):
+        """Returns the state of the game as a record of snapshot_dtype, which can be restored with restore_snapshot"""
+        snapshot = np.zeros((), dtype=PONG_SNAPSHOT_DTYPE)
+
+        snapshot["ball_pos"] = self.ball.pos
+        snapshot["ball_vel"] = self.ball.vel
+        snapshot["paddle_pos"] = self.left_paddle.pos, self.right_paddle.pos
+        self.rng.get_state(snapshot["rng"])
 
-        white = (255, 255, 255)
+        return snapshot
 
-        arr[self.left_paddle.pos - 1][1] = white
-        arr[self.left_paddle.pos][1] = white
-        arr[self.left_paddle.pos + 1][1] = white
+    def get_encoding(self):
+        """Returns the position and the velocity of the ball and the positions of the paddles as a tuple that fits
+            encoding_dtype"""
+        return tuple(self.ball.pos), tuple(self.ball.vel), (self.left_paddle.pos, self.right_paddle.pos)
 
-        arr[self.right_paddle.pos - 1][14] = white
-        arr[self.right_paddle.pos][14] = white
-        arr[self.right_paddle.pos + 1][14] = white
+    def restore_snapshot(self, snapshot: np.ndarray):
+        """Restores the state of the game from a record of snapshot_dtype"""
+        # the game objects are built without a reset, so restoring draws no random numbers
+        if self.ball is None:
+            self.ball = Ball()
+            self.left_paddle = Paddle()
+            self.right_paddle = Paddle()
 
-        arr[self.ball.pos[1], self.ball.pos[0]] = white
+        self.ball.pos = snapshot["ball_pos"].tolist()
+        self.ball.vel = snapshot["ball_vel"].tolist()
+        self.left_paddle.pos, self.right_paddle.pos = snapshot["paddle_pos"].tolist()
 
-        return arr
+        self.rng.set_state(snapshot["rng"])
+        self._frame_buffer.invalidate()
+
+    def screenshot(self):
+        """Returns a screenshot of the environment as a numpy array. Only the cells that changed since the last
+            screenshot are repainted, the returned array is reused by the next screenshot"""
+        return self._frame_buffer.render()
+
+    def get_changed_regions(self):
+        """Returns the regions that were repainted by the last screenshot"""
+        return self._frame_buffer.changed_regions
+
+    def _paint_region(self, region, y_start, y_end, x_start, x_end):
+        """Paints the cells of the field from y_start to y_end and x_start to x_end into the region"""
+        paint_pong_region(region, y_start, y_end, x_start, x_end, self.ball.pos, self.left_paddle.pos,
+                          self.right_paddle.pos)
 
     def get_state(self):
         """Returns the state of the environment which consists of the left paddle position, the ball position, and the
             right paddle position"""
         return [self.left_paddle.pos / 9, self.ball.pos[0] / 16, self.ball.pos[1] / 9, self.right_paddle.pos / 9]
+
+    def get_state_into(self, out: np.ndarray):
+        """Writes the state of the environment into out, a float32 array of length 4"""
+        out[:] = (self.left_paddle.pos / 9, self.ball.pos[0] / 16, self.ball.pos[1] / 9, self.right_paddle.pos / 9)
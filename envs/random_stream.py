@@ -0,0 +1,124 @@
+import numpy as np
+
+
+# record of the state of a Philox bit generator
+_GENERATOR_STATE_DTYPE = np.dtype([("counter", np.uint64, (4,)), ("key", np.uint64, (2,)), ("buffer", np.uint64, (4,)),
+                                   ("buffer_pos", np.int64), ("has_uint32", np.int64), ("uinteger", np.uint64)])
+
+# record of the state of a RandomStream, see RandomStream.get_state. The block of numbers is not stored, it is drawn
+# again from the state of the generator before the block. A record of zeros holds no state, restoring it leaves the
+# stream as it is
+RANDOM_STREAM_STATE_DTYPE = np.dtype([("saved", np.bool_), ("generator", _GENERATOR_STATE_DTYPE),
+                                      ("block_generator", _GENERATOR_STATE_DTYPE), ("block_length", np.int64),
+                                      ("position", np.int64)])
+
+
+def _generator_record(state: dict):
+    """Returns the state dict of a Philox bit generator as a tuple that can be written into a record of
+        _GENERATOR_STATE_DTYPE at once, which is much cheaper than writing its fields one by one"""
+    return (state["state"]["counter"], state["state"]["key"], state["buffer"], state["buffer_pos"], state["has_uint32"],
+            state["uinteger"])
+
+
+def _generator_state(record: np.ndarray):
+    """Returns the state dict of a Philox bit generator from a record of _GENERATOR_STATE_DTYPE"""
+    return {"bit_generator": "Philox", "state": {"counter": record["counter"].copy(), "key": record["key"].copy()},
+            "buffer": record["buffer"].copy(), "buffer_pos": int(record["buffer_pos"]),
+            "has_uint32": int(record["has_uint32"]), "uinteger": int(record["uinteger"])}
+
+
+class RandomStream:
+    """
+    The RandomStream class is the source of randomness of a single environment or agent. It owns a np.random.Generator
+    with a Philox bit generator, draws uniform numbers from it in blocks and hands them out one by one, which is much
+    cheaper than calling the generator or the random module for every number.
+
+    Philox is a counter-based generator, so streams that are seeded with different spawn keys of the same seed are
+    statistically independent. spawn creates such streams, e.g. one per environment of a worker process, and the same
+    seed always reproduces the same numbers.
+
+    Args:
+        seed: An int, a np.random.SeedSequence or None to seed from the entropy of the operating system.
+        block_size (int): How many uniform numbers are drawn from the generator at once.
+    """
+
+    def __init__(self, seed=None, block_size: int = 1024):
+        if block_size < 1:
+            raise ValueError("block_size must be greater than or equal to 1")
+
+        self.seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.generator = np.random.Generator(np.random.Philox(self.seed_sequence))
+        self.block_size = block_size
+
+        # python floats, which are faster to hand out one by one than the elements of an array
+        self._block = []
+        self._position = 0
+        # the state of the generator before the block, from which the block can be drawn again
+        self._block_generator = np.zeros((), dtype=_GENERATOR_STATE_DTYPE)
+
+    def spawn(self, n_streams: int):
+        """Returns n_streams new streams that are independent of this stream and of each other"""
+        return [RandomStream(seed_sequence, self.block_size) for seed_sequence in self.seed_sequence.spawn(n_streams)]
+
+    def random(self):
+        """Returns a uniform float in [0, 1)"""
+        if self._position == len(self._block):
+            self._draw_block()
+
+        value = self._block[self._position]
+        self._position += 1
+
+        return value
+
+    def integers(self, low: int, high: int = None):
+        """Returns a uniform int in [low, high), or in [0, low) if high is None"""
+        if high is None:
+            low, high = 0, low
+
+        # the buffer is read here instead of calling random, this is the most frequent draw of the environments
+        if self._position == len(self._block):
+            self._draw_block()
+
+        value = low + int(self._block[self._position] * (high - low))
+        self._position += 1
+
+        # the product can round up to high for very large ranges
+        return value if value < high else high - 1
+
+    def choice(self, options):
+        """Returns a uniformly chosen element of the sequence options"""
+        return options[self.integers(len(options))]
+
+    def get_state(self, out: np.ndarray = None):
+        """Returns the state of the stream as a record of RANDOM_STREAM_STATE_DTYPE, which can be stored in the
+            snapshots of the environments and restored with set_state to repeat the following numbers. If out is given,
+            the state is written into this record, e.g. the field of a snapshot, instead of a new one"""
+        if out is None:
+            out = np.empty((), dtype=RANDOM_STREAM_STATE_DTYPE)
+        out[...] = (True, _generator_record(self.generator.bit_generator.state), self._block_generator,
+                    len(self._block), self._position)
+
+        return out
+
+    def set_state(self, state: np.ndarray):
+        """Restores a state that was returned by get_state. The block is only drawn again if the stream holds another
+            one, which is rare when the state of the same stream is restored"""
+        if not state["saved"]:
+            return
+
+        block_length = int(state["block_length"])
+        if block_length != len(self._block) or state["block_generator"].tobytes() != self._block_generator.tobytes():
+            self._block_generator[...] = state["block_generator"]
+            self._block = []
+            if block_length > 0:
+                self.generator.bit_generator.state = _generator_state(state["block_generator"])
+                self._block = self.generator.random(block_length).tolist()
+
+        self.generator.bit_generator.state = _generator_state(state["generator"])
+        self._position = int(state["position"])
+
+    def _draw_block(self):
+        """Draws the next block of numbers and remembers the state of the generator before it"""
+        self._block_generator[...] = _generator_record(self.generator.bit_generator.state)
+        self._block = self.generator.random(self.block_size).tolist()
+        self._position = 0
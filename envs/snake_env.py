@@ -2,59 +2,250 @@ import numpy as np
 from typing import List, Tuple
 
 from .interface import EnvInterface
-from .action import Action
+from .action import Action, action_index, action_indices
+from .frame_buffer import FrameBuffer
+from .frame_skip import repeat_action
+from .random_stream import RANDOM_STREAM_STATE_DTYPE, RandomStream
 
 SNAKE_ACTION_POOL = [Action.UP, Action.RIGHT, Action.DOWN, Action.LEFT]
+SNAKE_ACTION_INDICES = action_indices(SNAKE_ACTION_POOL)
+
+# the (x, y) move of every action index and the index of the opposite action, which the snake ignores
+SNAKE_MOVES = [action.value for action in SNAKE_ACTION_POOL]
+SNAKE_OPPOSITE_ACTIONS = [SNAKE_MOVES.index((-x, -y)) for x, y in SNAKE_MOVES]
+
+
+def snake_snapshot_dtype(grid_size: int):
+    """Returns the dtype of the snapshot records of snake games with the grid size. Cells are stored as flat indices
+        (y * grid_size + x), the body starts with the head and the last action is an index into SNAKE_ACTION_POOL. rng
+        is the state of the random stream from which the food is drawn"""
+    cell_type = np.min_scalar_type(grid_size * grid_size - 1)
+
+    return np.dtype([("score", np.int32), ("length", np.int32), ("n_free", np.int32), ("food", cell_type),
+                     ("last_action", np.int8), ("body", cell_type, (grid_size * grid_size,)),
+                     ("free_cells", cell_type, (grid_size * grid_size,)), ("rng", RANDOM_STREAM_STATE_DTYPE)])
+
+
+def snake_encoding_dtype(grid_size: int):
+    """Returns the dtype of the compact encodings of the states of snake games with the grid size, see
+        SnakeEnv.get_encoding"""
+    cell_type = np.min_scalar_type(grid_size * grid_size - 1)
+
+    return np.dtype([("head", cell_type), ("food", cell_type), ("length", np.int32), ("last_action", np.int8)])
+
+
+def paint_snake_region(region: np.ndarray, y_start: int, y_end: int, x_start: int, x_end: int, occupancy: np.ndarray,
+                       pad: int, vision: int, snake_head: Tuple, food_cell: Tuple):
+    """Paints the cells of a snake game from y_start to y_end and x_start to x_end into the region. The occupancy grid
+        is padded by pad cells on each side"""
+    occupancy = occupancy[y_start + pad:y_end + pad, x_start + pad:x_end + pad]
+
+    # the free cells inside the vision are painted first, food and snake are painted over them
+    in_vision_y = np.abs(np.arange(y_start, y_end) - snake_head[1]) <= vision
+    in_vision_x = np.abs(np.arange(x_start, x_end) - snake_head[0]) <= vision
+
+    region[:] = (0, 0, 0)
+    region[np.outer(in_vision_y, in_vision_x) & (occupancy == 0)] = (10, 10, 10)
+
+    if y_start <= food_cell[1] < y_end and x_start <= food_cell[0] < x_end:
+        region[food_cell[1] - y_start, food_cell[0] - x_start] = (0, 255, 127)
+
+    # inside the grid the occupied cells are the snake's body
+    region[occupancy == 1] = (65, 105, 225)
+
+    if y_start <= snake_head[1] < y_end and x_start <= snake_head[0] < x_end:
+        region[snake_head[1] - y_start, snake_head[0] - x_start] = (0, 191, 255)
+
+
+class FreeCellIndex:
+    """
+    The FreeCellIndex class keeps track of the cells of the grid that are not occupied by the snake. The free cells are
+    stored densely at the front of an array of flat cell indices (y * grid_size + x) and a position map remembers where
+    each cell is stored, so that adding, removing and sampling a cell are O(1).
+
+    Args:
+        grid_size (int): The dimensions of the grid: grid dimension = grid_size x grid_size.
+    """
+
+    def __init__(self, grid_size: int):
+        self.grid_size = grid_size
+
+        self._cells = list(range(grid_size * grid_size))
+        self._positions = list(range(grid_size * grid_size))
+        self._n_free = grid_size * grid_size
+
+    def __len__(self):
+        return self._n_free
+
+    def __contains__(self, flat_cell: int):
+        return self._positions[flat_cell] < self._n_free
+
+    def remove(self, flat_cell: int):
+        """Marks a free cell as occupied by swapping it with the last free cell"""
+        self._n_free -= 1
+        self._swap(flat_cell, self._cells[self._n_free])
+
+    def add(self, flat_cell: int):
+        """Marks an occupied cell as free by swapping it with the first occupied cell"""
+        self._swap(flat_cell, self._cells[self._n_free])
+        self._n_free += 1
+
+    def sample(self, rng: RandomStream):
+        """Returns the flat index of a random free cell, drawn from the stream rng"""
+        return self._cells[rng.integers(self._n_free)]
+
+    def get_snapshot(self):
+        """Returns the storage order of the cells and the number of free cells at the front of it"""
+        return self._cells, self._n_free
+
+    def restore_snapshot(self, cells: np.ndarray, n_free: int):
+        """Restores the storage order of the cells and the number of free cells at the front of it"""
+        positions = np.empty(len(cells), dtype=np.int64)
+        positions[cells] = np.arange(len(cells))
+
+        self._cells = cells.tolist()
+        self._positions = positions.tolist()
+        self._n_free = n_free
+
+    def _swap(self, flat_cell_a: int, flat_cell_b: int):
+        """Swaps the storage positions of two cells"""
+        position_a, position_b = self._positions[flat_cell_a], self._positions[flat_cell_b]
+        self._cells[position_a], self._cells[position_b] = flat_cell_b, flat_cell_a
+        self._positions[flat_cell_a], self._positions[flat_cell_b] = position_b, position_a
 
 
 class Snake:
     """
-    The Snake class is responsible for movement through the environment based on action input.
+    The Snake class is responsible for movement through the environment based on action input. Actions are integer
+    indices into SNAKE_ACTION_POOL.
+
+    The body is stored as flat cell indices (y * grid_size + x) in a preallocated ring buffer with the head at
+    _head_ptr and the rest of the body at the preceding positions, so that moving and growing only write a single entry
+    regardless of the length of the snake.
 
     Args:
-        cells (List[Tuple]): The coordinates of the cells that the Snake is initiated in.
-        vel (Action): Optional argument to set the last action of the snake, which is needed as fallback if the next
+        cells (List[Tuple]): The coordinates of the cells that the Snake is initiated in, starting with the head.
+        grid_size (int): The dimensions of the grid the snake moves in.
+        vel (int): Optional argument to set the last action of the snake, which is needed as fallback if the next
             action is invalid.
+        free_cells (FreeCellIndex): Optional index of the free cells of the grid, which the snake keeps up to date
+            while it moves and grows.
     """
 
-    def __init__(self, cells: List[Tuple], vel: Action = Action.UP):
-        self.cells = cells
-        self._last_action = vel
+    __slots__ = ("grid_size", "free_cells", "_last_action", "_flat_moves", "_capacity", "_body", "_head_ptr",
+                 "_length")
 
-        self.cell_lookup = set()
-        self.cell_lookup.update(cells)
+    def __init__(self, cells: List[Tuple], grid_size: int, vel: int = SNAKE_ACTION_INDICES[Action.UP],
+                 free_cells: FreeCellIndex = None):
+        self.grid_size = grid_size
+        self.free_cells = free_cells
+        self._last_action = vel
 
-    def move(self, action: Action):
-        """Moves the snake by one grid in the direction of the action"""
+        # the change of the flat cell index with every action
+        self._flat_moves = [x + y * grid_size for x, y in SNAKE_MOVES]
+
+        self._capacity = grid_size * grid_size
+        self._body = [0] * self._capacity
+        self._length = len(cells)
+        self._head_ptr = self._length - 1
+
+        for i, cell in enumerate(cells):
+            flat_cell = cell[1] * grid_size + cell[0]
+            self._body[self._head_ptr - i] = flat_cell
+
+            if free_cells is not None:
+                free_cells.remove(flat_cell)
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def head(self):
+        """The coordinates of the snake's head"""
+        y, x = divmod(self._body[self._head_ptr], self.grid_size)
+        return x, y
+
+    @property
+    def flat_head(self):
+        """The flat index of the snake's head"""
+        return self._body[self._head_ptr]
+
+    @property
+    def cells(self):
+        """The coordinates of the snake's cells, starting with the head"""
+        cells = []
+        for i in range(self._length):
+            y, x = divmod(self._body[(self._head_ptr - i) % self._capacity], self.grid_size)
+            cells.append((x, y))
+
+        return cells
+
+    @property
+    def flat_cells(self):
+        """The flat indices of the snake's cells, starting with the head"""
+        start = self._head_ptr - self._length + 1
+        if start >= 0:
+            cells = self._body[start:self._head_ptr + 1]
+        else:
+            cells = self._body[start:] + self._body[:self._head_ptr + 1]
+
+        return cells[::-1]
+
+    @property
+    def last_action(self):
+        """The index of the last action that the snake executed"""
+        return self._last_action
+
+    def restore(self, flat_cells: List[int], last_action: int):
+        """Replaces the body of the snake with the flat cells, starting with the head, and its last action. The free
+            cell index is not updated"""
+        self._length = len(flat_cells)
+        self._head_ptr = self._length - 1
+        self._body[:self._length] = flat_cells[::-1]
+        self._last_action = last_action
+
+    def move(self, action: int):
+        """Moves the snake by one grid in the direction of the action. Returns the tail cell that the snake left"""
+        # the tail is read before growing, because a snake that fills the whole buffer grows into the tail's slot
+        tail_cell = self._body[(self._head_ptr - self._length + 1) % self._capacity]
+        self._length -= 1
         self.grow(action)
-        self.cell_lookup.remove(self.cells.pop())
 
-    def grow(self, action: Action):
-        """Extends the snake by one grid in the direction of the action"""
-        next_cell = self.next_cell(action)
+        if self.free_cells is not None:
+            self.free_cells.add(tail_cell)
 
-        self.cells.insert(0, next_cell)
-        self.cell_lookup.add(next_cell)
+        y, x = divmod(tail_cell, self.grid_size)
+        return x, y
 
-        if not self._is_180_turn(action):
+    def grow(self, action: int):
+        """Extends the snake by one grid in the direction of the action"""
+        if self._is_180_turn(action):
+            action = self._last_action
+        else:
             self._last_action = action
 
-    def next_cell(self, action: Action):
+        next_cell = self._body[self._head_ptr] + self._flat_moves[action]
+
+        self._head_ptr = (self._head_ptr + 1) % self._capacity
+        self._body[self._head_ptr] = next_cell
+        self._length += 1
+
+        if self.free_cells is not None:
+            self.free_cells.remove(next_cell)
+
+    def next_cell(self, action: int):
         """Returns the coordinates of the upcoming cell based on the action"""
         if self._is_180_turn(action):
             action = self._last_action
 
-        snake_head = self.cells[0]
-        next_cell = snake_head[0] + action.value[0], snake_head[1] + action.value[1]
+        y, x = divmod(self._body[self._head_ptr], self.grid_size)
+        move_x, move_y = SNAKE_MOVES[action]
 
-        return next_cell
+        return x + move_x, y + move_y
 
-    def _is_180_turn(self, action: Action):
+    def _is_180_turn(self, action: int):
         """Checks whether the action is the opposite of the last action"""
-        return (action == Action.UP and self._last_action == Action.DOWN) or \
-               (action == Action.DOWN and self._last_action == Action.UP) or \
-               (action == Action.LEFT and self._last_action == Action.RIGHT) or \
-               (action == Action.RIGHT and self._last_action == Action.LEFT)
+        return action == SNAKE_OPPOSITE_ACTIONS[self._last_action]
 
 
 class SnakeEnv(EnvInterface):
@@ -67,50 +258,94 @@ class SnakeEnv(EnvInterface):
             and greater than or equal to 3.
         vision (int): The snake's vision aka. the area around the head of the snake which state is returned as input to
             the RL agent. Snake size must be greater than or equal to 1.
+        frame_skip (int): How many times every action is executed by step. The rewards of the repeated steps are summed
+            up and the repetition stops early when the episode ends.
+        seed: Optional seed of the RandomStream from which the food positions are drawn, an int or a
+            np.random.SeedSequence.
     """
 
-    def __init__(self, grid_size: int = 7, vision: int = 2):
+    action_pool = SNAKE_ACTION_POOL
+
+    def __init__(self, grid_size: int = 7, vision: int = 2, frame_skip: int = 1, seed=None):
         if grid_size % 2 == 0 or grid_size < 3:
             raise ValueError("grid_size must be odd and greater than or equal to 3")
         if vision < 0:
             raise ValueError("vision must be greater than or equal to 1")
+        if frame_skip < 1:
+            raise ValueError("frame_skip must be greater than or equal to 1")
 
         self.grid_size = grid_size
-        self._grid = self._make_grid()
 
         self.vision = vision
+        self.frame_skip = frame_skip
+        self.rng = RandomStream(seed)
+
+        # occupancy grid with a wall border that is wide enough to hold the vision window around any cell of the grid.
+        # Cells are 1 if they are either part of the snake or a wall and are indexed with [y + pad, x + pad]
+        self._pad = max(vision, 1)
+        self._walls = np.ones((grid_size + 2 * self._pad, grid_size + 2 * self._pad), dtype=np.uint8)
+        self._walls[self._pad:-self._pad, self._pad:-self._pad] = 0
+        self._occupancy = None
 
         self._score = None
         self._snake = None
         self._food_cell = None
 
+        self._frame_buffer = FrameBuffer(grid_size, grid_size, self._paint_region)
+
         self.output_dim = 4
+        self.snapshot_dtype = snake_snapshot_dtype(grid_size)
+        self.encoding_dtype = snake_encoding_dtype(grid_size)
+
+    def seed(self, seed=None):
+        """Replaces the random stream of the environment by a new one that is seeded with seed"""
+        self.rng = RandomStream(seed)
 
     def reset(self):
         """Resets the environment"""
         self._score = 0
+        self._occupancy = self._walls.copy()
         self._spawn_snake()
         self._spawn_food()
+        self._frame_buffer.invalidate()
 
         return self.get_state()
 
-    def step(self, action: Action):
-        """Executes the action in the environment
+    def step(self, action: int):
+        """Executes the action frame_skip times in the environment, or until the episode ends. The action is an index
+            into SNAKE_ACTION_POOL or one of its actions
 
         Returns:
             state (list[float]): The new state of the environment after the action was executed.
-            reward (float): The reward for the executed action.
+            reward (float): The sum of the rewards for the executed actions.
             done (bool): done = True if snake dies, else done = False.
             score (int): How many pieces of food the snake ate so far.
         """
+        reward, done, score = repeat_action(self._step, action_index(SNAKE_ACTION_INDICES, action), self.frame_skip)
+        return self.get_state(), reward, done, score
+
+    def step_into(self, action: int, obs_out: np.ndarray):
+        """Executes the action like step, but writes the new state into obs_out instead of allocating it. Returns
+            reward, done and score like step"""
+        reward, done, score = repeat_action(self._step, action_index(SNAKE_ACTION_INDICES, action), self.frame_skip)
+        self.get_state_into(obs_out)
+
+        return reward, done, score
+
+    def _step(self, action: int):
+        """Executes the action index once and returns the reward, done and the score"""
 
         next_cell = self._snake.next_cell(action)
 
-        if self._is_snake(next_cell) or self._is_wall(next_cell):
+        if self._occupancy[next_cell[1] + self._pad, next_cell[0] + self._pad]:
             done = True
             reward = -1
         else:
             done = False
+            self._mark_vision_changed(self._snake.head)
+            self._mark_vision_changed(next_cell)
+
+            self._occupancy[next_cell[1] + self._pad, next_cell[0] + self._pad] = 1
             if next_cell == self._food_cell:
                 self._snake.grow(action)
                 self._score += 1
@@ -119,42 +354,89 @@ class SnakeEnv(EnvInterface):
                     reward = 100
                 else:
                     reward = 10
+                    self._frame_buffer.mark_cell(*self._food_cell)
             else:
-                self._snake.move(action)
+                tail_cell = self._snake.move(action)
+                self._occupancy[tail_cell[1] + self._pad, tail_cell[0] + self._pad] = 0
+                self._frame_buffer.mark_cell(*tail_cell)
                 reward = -0.1
 
-        return self.get_state(), reward, done, self._score
+        return reward, done, self._score
 
     def get_state(self):
         """Returns the state of the environment which consists of the state of the area around the snake's head and the
             position of the food"""
-        snake_head = self._snake.cells[0]
+        state = np.empty(2 + (2 * self.vision + 1) ** 2, dtype=np.float32)
+        self.get_state_into(state)
 
-        food_distance_x, food_distance_y = np.subtract(snake_head, self._food_cell)
-        food_position = [food_distance_x / self.grid_size, food_distance_y / self.grid_size]
+        return state
 
-        return np.array(food_position + self._surrounding_cell_state(snake_head), dtype=np.float32)
+    def get_state_into(self, out: np.ndarray):
+        """Writes the state of the environment into out, a contiguous float32 array of length 2 + (2 * vision + 1)^2"""
+        snake_head = self._snake.head
 
-    def screenshot(self):
-        """Returns a screenshot of the environment as a numpy array"""
-        arr = np.zeros([self.grid_size, self.grid_size, 3], dtype=np.uint8)
-        arr[:] = (0, 0, 0)
+        out[0] = (snake_head[0] - self._food_cell[0]) / self.grid_size
+        out[1] = (snake_head[1] - self._food_cell[1]) / self.grid_size
+        out[2:].reshape(2 * self.vision + 1, 2 * self.vision + 1)[:] = self._vision_window(snake_head)
 
-        arr[self._food_cell[1]][self._food_cell[0]] = (0, 255, 127)
+    def get_snapshot(self):
+        """Returns the state of the game as a record of snapshot_dtype, which can be restored with restore_snapshot"""
+        snapshot = np.zeros((), dtype=self.snapshot_dtype)
 
-        for idx, snake_grid in enumerate(self._snake.cells):
-            if idx == 0:
-                arr[snake_grid[1]][snake_grid[0]] = (0, 191, 255)
-            else:
-                arr[snake_grid[1]][snake_grid[0]] = (65, 105, 225)
+        snapshot["score"] = self._score
+        snapshot["length"] = len(self._snake)
+        snapshot["food"] = self._food_cell[1] * self.grid_size + self._food_cell[0]
+        snapshot["last_action"] = self._snake.last_action
+        snapshot["body"][:len(self._snake)] = self._snake.flat_cells
+        snapshot["free_cells"], snapshot["n_free"] = self._snake.free_cells.get_snapshot()
+        self.rng.get_state(snapshot["rng"])
+
+        return snapshot
+
+    def get_encoding(self):
+        """Returns the flat indices of the head and the food, the length and the last action of the snake as a tuple
+            that fits encoding_dtype. Within an episode with frame_skip 1 the body of the snake are the cells of the
+            last length heads, together with the body of the snapshot at its start"""
+        return (self._snake.flat_head, self._food_cell[1] * self.grid_size + self._food_cell[0], len(self._snake),
+                self._snake.last_action)
+
+    def restore_snapshot(self, snapshot: np.ndarray):
+        """Restores the state of the game from a record of snapshot_dtype"""
+        body = snapshot["body"][:snapshot["length"]]
 
-        for y in range(self.vision * 2 + 1):
-            for x in range(self.vision * 2 + 1):
-                cell = (self._snake.cells[0][0] - self.vision + x, self._snake.cells[0][1] - self.vision + y)
-                if not self._is_wall(cell) and not self._is_snake(cell) and not cell == self._food_cell:
-                    arr[cell[1]][cell[0]] = (10, 10, 10)
+        if self._snake is None:
+            self._snake = Snake([], self.grid_size, free_cells=FreeCellIndex(self.grid_size))
+        self._snake.restore(body.tolist(), int(snapshot["last_action"]))
+        self._snake.free_cells.restore_snapshot(snapshot["free_cells"], int(snapshot["n_free"]))
 
-        return arr
+        self._occupancy = self._walls.copy()
+        self._occupancy[self._pad:-self._pad, self._pad:-self._pad].flat[body] = 1
+
+        self._score = int(snapshot["score"])
+        y, x = divmod(int(snapshot["food"]), self.grid_size)
+        self._food_cell = x, y
+
+        self.rng.set_state(snapshot["rng"])
+        self._frame_buffer.invalidate()
+
+    def screenshot(self):
+        """Returns a screenshot of the environment as a numpy array. Only the cells that changed since the last
+            screenshot are repainted, the returned array is reused by the next screenshot"""
+        return self._frame_buffer.render()
+
+    def get_changed_regions(self):
+        """Returns the regions that were repainted by the last screenshot"""
+        return self._frame_buffer.changed_regions
+
+    def _paint_region(self, region: np.ndarray, y_start: int, y_end: int, x_start: int, x_end: int):
+        """Paints the cells of the grid from y_start to y_end and x_start to x_end into the region"""
+        paint_snake_region(region, y_start, y_end, x_start, x_end, self._occupancy, self._pad, self.vision,
+                           self._snake.head, self._food_cell)
+
+    def _mark_vision_changed(self, cell: Tuple):
+        """Marks the vision window around the cell as changed in the frame buffer"""
+        self._frame_buffer.mark(cell[1] - self.vision, cell[1] + self.vision + 1,
+                                cell[0] - self.vision, cell[0] + self.vision + 1)
 
     def _is_wall(self, cell: Tuple):
         """Checks whether a specific cell is a wall"""
@@ -162,18 +444,17 @@ class SnakeEnv(EnvInterface):
 
     def _is_snake(self, cell: Tuple):
         """Checks whether a specific cell is part of the snake"""
-        return True if cell in self._snake.cell_lookup else False
+        return not self._is_wall(cell) and self._occupancy[cell[1] + self._pad, cell[0] + self._pad] == 1
 
     def _surrounding_cell_state(self, snake_head):
         """Returns the state of each cell around the snake's head. State = 1 if the cell is either part of the snake or
             a wall, State = 0 if cell is free"""
-        surrounding_cells_state = []
-        for y in range(self.vision * 2 + 1):
-            for x in range(self.vision * 2 + 1):
-                cell = (snake_head[0] - self.vision + x, snake_head[1] - self.vision + y)
-                surrounding_cells_state.append(self._is_snake(cell) or self._is_wall(cell))
+        return self._vision_window(snake_head).ravel()
 
-        return surrounding_cells_state
+    def _vision_window(self, cell: Tuple):
+        """Returns the (2 * vision + 1) x (2 * vision + 1) view of the occupancy grid that is centered on the cell"""
+        x, y = cell[0] + self._pad, cell[1] + self._pad
+        return self._occupancy[y - self.vision:y + self.vision + 1, x - self.vision:x + self.vision + 1]
 
     def _spawn_snake(self):
         """Spawns the snake in the environments"""
@@ -181,22 +462,15 @@ class SnakeEnv(EnvInterface):
         snake_x = self.grid_size // 2
         for i in range(2):
             snake_cells.append((snake_x, self.grid_size // 2 + i))
+            self._occupancy[self.grid_size // 2 + i + self._pad, snake_x + self._pad] = 1
 
-        self._snake = Snake(snake_cells)
+        self._snake = Snake(snake_cells, self.grid_size, free_cells=FreeCellIndex(self.grid_size))
 
     def _spawn_food(self):
         """Spawns the food in the environment. True if food is spawned, False if food couldn't be spawned"""
-        available_cells = list(self._grid.difference(self._snake.cell_lookup))
-        if len(available_cells) > 0:
-            self._food_cell = available_cells[np.random.choice(len(available_cells))]
+        if len(self._snake.free_cells) > 0:
+            y, x = divmod(self._snake.free_cells.sample(self.rng), self.grid_size)
+            self._food_cell = x, y
             return True
         else:
             return False
-
-    def _make_grid(self):
-        """Creates the environment grid"""
-        grid = set()
-        for i in range(self.grid_size):
-            for j in range(self.grid_size):
-                grid.add((i, j))
-        return grid
@@ -0,0 +1,226 @@
+import multiprocessing as mp
+import os
+import weakref
+from multiprocessing import shared_memory
+from typing import Callable, List
+
+import numpy as np
+
+
+class SubprocVecEnv:
+    """
+    The SubprocVecEnv class runs environments in worker processes, so that they are stepped in parallel on several cores
+    and outside of the process that trains the agent.
+
+    The states, rewards and dones of all environments live in one shared memory block, which the workers write into
+    directly. Only the integer actions and short commands are sent over the pipes to the workers. Actions are indices
+    into the action_pool of the environments. Environments that are done are reset automatically in their worker;
+    their last observation is kept in final_states.
+
+    Args:
+        env_fns (List[Callable]): Functions that create the environments, e.g. functools.partial(SnakeEnv, 7, 2). They
+            must be picklable if the start method of the processes is "spawn".
+        n_workers (int): The number of worker processes, by default one per core but at most one per environment. The
+            environments are split into contiguous chunks, one per worker.
+        seed (int): Optional seed from which an independent random stream is derived for every environment. The
+            environments must provide a seed method for it.
+        start_method (str): Optional multiprocessing start method, e.g. "fork" or "spawn".
+    """
+
+    def __init__(self, env_fns: List[Callable], n_workers: int = None, seed: int = None, start_method: str = None):
+        self.n_envs = len(env_fns)
+        if self.n_envs < 1:
+            raise ValueError("env_fns must contain at least one function")
+
+        probe_env = env_fns[0]()
+        self.output_dim = probe_env.output_dim
+        self.state_dim = len(probe_env.reset())
+
+        if n_workers is None:
+            n_workers = os.cpu_count() or 1
+        n_workers = max(1, min(n_workers, self.n_envs))
+
+        self._layout = _make_layout(self.n_envs, self.state_dim)
+        self._shared_memory = shared_memory.SharedMemory(create=True, size=self._layout["size"])
+        self.states, self.final_states, self.rewards, self.dones = _attach_arrays(self._shared_memory, self._layout)
+
+        context = mp.get_context(start_method)
+        bounds = np.linspace(0, self.n_envs, n_workers + 1).astype(int)
+        seeds = np.random.SeedSequence(seed).spawn(self.n_envs)
+
+        self._slices = []
+        self._remotes = []
+        self._processes = []
+        for i in range(n_workers):
+            start, end = bounds[i], bounds[i + 1]
+            remote, worker_remote = context.Pipe()
+            process = context.Process(target=_worker, daemon=True,
+                                      args=(worker_remote, remote, env_fns[start:end], self._shared_memory.name,
+                                            self._layout, start, seeds[start:end]))
+            process.start()
+            worker_remote.close()
+
+            self._slices.append(slice(start, end))
+            self._remotes.append(remote)
+            self._processes.append(process)
+
+        self._waiting = False
+
+        # stops the workers and releases the shared memory if the environment is garbage collected or the interpreter
+        # exits without close, it must not hold a reference to self
+        self._finalizer = weakref.finalize(self, _release, self._remotes, self._processes, self._shared_memory)
+
+    def reset(self):
+        """Resets all environments
+
+        Returns:
+            states (np.ndarray): The states of all environments, shape (n_envs, state_dim).
+        """
+        for remote in self._remotes:
+            remote.send(("reset", None))
+        self._wait()
+
+        return self.states.copy()
+
+    def step(self, actions: np.ndarray):
+        """Executes one action per environment
+
+        Args:
+            actions (np.ndarray): Integer indices into the action pool of the environments, shape (n_envs,).
+
+        Returns:
+            states (np.ndarray): The new states, shape (n_envs, state_dim). Environments that are done are already
+                reset.
+            rewards (np.ndarray): The rewards for the executed actions.
+            dones (np.ndarray): dones[i] = True if environment i ended with this step.
+        """
+        self.step_async(actions)
+        return self.step_wait()
+
+    def step_async(self, actions: np.ndarray):
+        """Sends the actions to the workers without waiting for the results, so that the caller can work in the
+            meantime"""
+        actions = np.asarray(actions, dtype=np.int64)
+        for remote, env_slice in zip(self._remotes, self._slices):
+            remote.send(("step", actions[env_slice]))
+        self._waiting = True
+
+    def step_wait(self):
+        """Waits for the workers to finish the step that was started with step_async and returns its results"""
+        self._wait()
+        self._waiting = False
+
+        return self.states.copy(), self.rewards.copy(), self.dones.copy(), None
+
+    def close(self):
+        """Stops the workers and releases the shared memory"""
+        if not self._finalizer.alive:
+            return
+
+        if self._waiting:
+            self._wait()
+
+        # the arrays must be released before the shared memory they point into can be closed
+        self.states = self.final_states = self.rewards = self.dones = None
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _wait(self):
+        """Waits until every worker reported that it finished its command"""
+        for remote in self._remotes:
+            error = remote.recv()
+            if error is not None:
+                raise RuntimeError(f"Environment worker failed: {error}")
+
+
+def _make_layout(n_envs: int, state_dim: int):
+    """Returns the offsets and shapes of the arrays in the shared memory block"""
+    layout = {}
+    offset = 0
+    for name, shape, dtype in [("states", (n_envs, state_dim), np.float32),
+                               ("final_states", (n_envs, state_dim), np.float32),
+                               ("rewards", (n_envs,), np.float64),
+                               ("dones", (n_envs,), np.bool_)]:
+        layout[name] = (offset, shape, dtype)
+        # keep every array aligned to 8 bytes
+        offset += -(-int(np.prod(shape)) * np.dtype(dtype).itemsize // 8) * 8
+
+    layout["size"] = max(offset, 1)
+
+    return layout
+
+
+def _attach_arrays(memory: shared_memory.SharedMemory, layout: dict):
+    """Returns the states, final_states, rewards and dones arrays that are backed by the shared memory block"""
+    return [np.ndarray(shape, dtype=dtype, buffer=memory.buf, offset=offset)
+            for offset, shape, dtype in (layout[name] for name in ["states", "final_states", "rewards", "dones"])]
+
+
+def _release(remotes: list, processes: list, memory: shared_memory.SharedMemory):
+    """Stops the workers, closes their pipes and unlinks the shared memory"""
+    for remote in remotes:
+        try:
+            remote.send(("close", None))
+        except OSError:
+            # the worker already exited, e.g. it was terminated at the exit of the interpreter
+            pass
+    for process in processes:
+        process.join()
+    for remote in remotes:
+        remote.close()
+
+    try:
+        memory.close()
+    except BufferError:
+        # arrays that point into the memory are still referenced, its mapping is released with them
+        pass
+    memory.unlink()
+
+
+def _worker(remote, parent_remote, env_fns, memory_name, layout, start, seed_sequences):
+    """Runs a chunk of environments and writes their results into the rows start to start + len(env_fns) of the shared
+        arrays"""
+    parent_remote.close()
+
+    memory = shared_memory.SharedMemory(name=memory_name)
+    states, final_states, rewards, dones = _attach_arrays(memory, layout)
+    envs = [env_fn() for env_fn in env_fns]
+
+    # environments created by the same function would otherwise share their seed, e.g. after a fork
+    for env, seed_sequence in zip(envs, seed_sequences):
+        env.seed(seed_sequence)
+
+    try:
+        while True:
+            command, data = remote.recv()
+
+            try:
+                if command == "step":
+                    # the states are written straight into the shared arrays
+                    for i, (env, action) in enumerate(zip(envs, data), start):
+                        rewards[i], dones[i], _ = env.step_into(action, states[i])
+                        if dones[i]:
+                            final_states[i] = states[i]
+                            env.reset()
+                            env.get_state_into(states[i])
+
+                elif command == "reset":
+                    for i, env in enumerate(envs, start):
+                        env.reset()
+                        env.get_state_into(states[i])
+
+                elif command == "close":
+                    break
+
+                remote.send(None)
+            except Exception as error:
+                remote.send(repr(error))
+    finally:
+        del states, final_states, rewards, dones
+        memory.close()
+        remote.close()
@@ -0,0 +1,248 @@
+import numpy as np
+
+from .pong_env import PONG_ACTION_POOL, PONG_SNAPSHOT_DTYPE, PongEnv
+from .random_stream import RandomStream
+
+WIDTH = 16
+HEIGHT = 9
+
+# the paddles are centered on the rows 1 to 7, so that they always fit on the field
+N_PADDLE_POSITIONS = 7
+
+# index of the ball velocity (vel_x, vel_y) is 2 * (vel_x > 0) + (vel_y > 0)
+N_VELOCITIES = 4
+N_STATES = WIDTH * HEIGHT * N_VELOCITIES * N_PADDLE_POSITIONS * N_PADDLE_POSITIONS
+
+
+def state_index(ball_pos: np.ndarray, ball_vel: np.ndarray, paddle_pos: np.ndarray):
+    """Returns the indices of the states with the given ball positions and velocities and (left, right) paddle
+        positions, each of shape (..., 2)"""
+    # the int8 fields of the snapshots would overflow
+    ball_pos, ball_vel = np.asarray(ball_pos, dtype=np.int64), np.asarray(ball_vel, dtype=np.int64)
+    paddle_pos = np.asarray(paddle_pos, dtype=np.int64)
+    velocity = 2 * (ball_vel[..., 0] > 0) + (ball_vel[..., 1] > 0)
+
+    index = (ball_pos[..., 0] * HEIGHT + ball_pos[..., 1]) * N_VELOCITIES + velocity
+    index = index * N_PADDLE_POSITIONS + paddle_pos[..., 0] - 1
+
+    return index * N_PADDLE_POSITIONS + paddle_pos[..., 1] - 1
+
+
+def state_snapshots(indices: np.ndarray):
+    """Returns the states with the given indices as records of PONG_SNAPSHOT_DTYPE, without the state of a random
+        stream"""
+    indices = np.asarray(indices)
+    snapshots = np.zeros(indices.shape, dtype=PONG_SNAPSHOT_DTYPE)
+
+    rest, snapshots["paddle_pos"][..., 1] = np.divmod(indices, N_PADDLE_POSITIONS)
+    rest, snapshots["paddle_pos"][..., 0] = np.divmod(rest, N_PADDLE_POSITIONS)
+    snapshots["paddle_pos"] += 1
+
+    rest, velocity = np.divmod(rest, N_VELOCITIES)
+    snapshots["ball_vel"][..., 0] = np.where(velocity >= 2, 1, -1)
+    snapshots["ball_vel"][..., 1] = np.where(velocity % 2 == 1, 1, -1)
+    snapshots["ball_pos"][..., 0], snapshots["ball_pos"][..., 1] = np.divmod(rest, HEIGHT)
+
+    return snapshots
+
+
+class PongTable:
+    """
+    The PongTable class enumerates every state of a Pong game and tabulates the outcome of every action in it. The
+    table is built once by stepping a PongEnv from each state, so it follows the rules of the PongEnv class exactly.
+
+    States are indices into the arrays of the table, see state_index, and actions are indices into PONG_ACTION_POOL.
+    Terminal states, in which the ball reached the left or the right border, are absorbing: every action keeps the game
+    in the state without a reward.
+
+    Attributes:
+        next_states (np.ndarray): next_states[state, action] is the state after the action, shape (N_STATES, 4).
+        rewards (np.ndarray): The reward of every action in every state.
+        dones (np.ndarray): dones[state, action] = True if the action ends the game.
+        terminal (np.ndarray): terminal[state] = True if the game is over in the state.
+        observations (np.ndarray): The observation PongEnv.get_state returns in every state, shape (N_STATES, 4).
+        start_states (np.ndarray): The states a game can start in after a reset, which are all equally likely.
+    """
+
+    def __init__(self):
+        snapshots = state_snapshots(np.arange(N_STATES))
+        ball_x = snapshots["ball_pos"][:, 0]
+
+        self.terminal = (ball_x == 0) | (ball_x == WIDTH - 1)
+        self.next_states = np.repeat(np.arange(N_STATES)[:, None], len(PONG_ACTION_POOL), axis=1)
+        self.rewards = np.zeros((N_STATES, len(PONG_ACTION_POOL)), dtype=np.float32)
+        self.dones = np.repeat(self.terminal[:, None], len(PONG_ACTION_POOL), axis=1)
+
+        # the outcomes are collected as (state, action, ball x, ball y, vel x, vel y, left, right, reward, done) rows
+        # and indexed all at once
+        outcomes = []
+        env = PongEnv()
+        env.reset()
+        for state in np.flatnonzero(~self.terminal):
+            for action in range(len(PONG_ACTION_POOL)):
+                env.restore_snapshot(snapshots[state])
+                reward, done, _ = env._step(action)
+                outcomes.append((state, action, *env.ball.pos, *env.ball.vel, env.left_paddle.pos,
+                                 env.right_paddle.pos, reward, done))
+
+        outcomes = np.array(outcomes, dtype=np.int64)
+        states, actions = outcomes[:, 0], outcomes[:, 1]
+        self.next_states[states, actions] = state_index(outcomes[:, 2:4], outcomes[:, 4:6], outcomes[:, 6:8])
+        self.rewards[states, actions] = outcomes[:, 8]
+        self.dones[states, actions] = outcomes[:, 9]
+
+        self.observations = np.stack([snapshots["paddle_pos"][:, 0] / 9, snapshots["ball_pos"][:, 0] / 16,
+                                      snapshots["ball_pos"][:, 1] / 9, snapshots["paddle_pos"][:, 1] / 9],
+                                     axis=1).astype(np.float32)
+
+        # the balls a PongEnv starts with, each heading away from the closer paddle
+        x, y, vel_y = np.meshgrid(np.arange(3, 13), np.arange(HEIGHT), [-1, 1], indexing="ij")
+        vel_x = np.where(x < 8, 1, -1)
+        self.start_states = state_index(np.stack([x, y], axis=-1), np.stack([vel_x, vel_y], axis=-1),
+                                        np.full(x.shape + (2,), 4)).ravel()
+
+
+def value_iteration(table: PongTable, gamma: float = 0.99, tolerance: float = 1e-6, max_iterations: int = 100_000):
+    """Computes the optimal values and policy of the table with value iteration. All states are updated at once with
+        array operations, until the values change by less than tolerance
+
+    Args:
+        table (PongTable): The tabulated game.
+        gamma (float): The discount factor, must be smaller than 1 because a perfect player never loses.
+        tolerance (float): The largest change of a value at which the iteration stops.
+        max_iterations (int): The iteration stops after this many updates even if it did not converge.
+
+    Returns:
+        policy (np.ndarray): The index of the optimal action in every state, shape (N_STATES,).
+        values (np.ndarray): The optimal discounted return of every state. values[table.start_states].mean() is the
+            return an optimal agent expects from a new game.
+    """
+    if not 0 <= gamma < 1:
+        raise ValueError("gamma must be greater than or equal to 0 and smaller than 1")
+
+    # action-major copies of the table, which make the gather and the maximum over the actions contiguous
+    next_states = np.ascontiguousarray(table.next_states.T, dtype=np.intp)
+    continues = np.ascontiguousarray(gamma * ~table.dones.T)
+    rewards = np.ascontiguousarray(table.rewards.T, dtype=np.float64)
+
+    values = np.zeros(N_STATES, dtype=np.float64)
+    new_values = np.empty_like(values)
+    q_values = np.empty(next_states.shape, dtype=np.float64)
+
+    for _ in range(max_iterations):
+        np.take(values, next_states, out=q_values)
+        q_values *= continues
+        q_values += rewards
+        q_values.max(axis=0, out=new_values)
+
+        change = np.abs(new_values - values).max()
+        values, new_values = new_values, values
+        if change < tolerance:
+            break
+
+    np.take(values, next_states, out=q_values)
+    policy = (rewards + continues * q_values).argmax(axis=0)
+
+    return policy, values
+
+
+class TabularPongEnv:
+    """
+    The TabularPongEnv class simulates a batch of independent Pong games by looking up every step in a PongTable. A
+    step of all games is a few fancy indexing operations, which makes it the fastest way to play Pong. It follows the
+    interface of the VecPongEnv class and draws the new games like it, so with the same seed and actions both play the
+    same games.
+
+    Actions are integer indices into PONG_ACTION_POOL. Games that are done are reset automatically; their last
+    observation is kept in final_states.
+
+    Args:
+        n_envs (int): The number of games that are simulated at once.
+        table (PongTable): The tabulated game, which can be shared by several environments. By default a new table is
+            built.
+        seed: Optional seed of the RandomStream from which the new games are drawn, an int or a np.random.SeedSequence.
+    """
+
+    def __init__(self, n_envs: int, table: PongTable = None, seed=None):
+        if n_envs < 1:
+            raise ValueError("n_envs must be greater than or equal to 1")
+
+        self.n_envs = n_envs
+        self.table = PongTable() if table is None else table
+        self.rng = RandomStream(seed)
+
+        self.output_dim = len(PONG_ACTION_POOL)
+        self.state_dim = 4
+
+        self.states = np.zeros(n_envs, dtype=np.int64)
+        self.final_states = np.zeros((n_envs, self.state_dim), dtype=np.float32)
+
+    def seed(self, seed=None):
+        """Replaces the random stream of the games by a new one that is seeded with seed"""
+        self.rng = RandomStream(seed)
+
+    def reset(self):
+        """Resets all games
+
+        Returns:
+            states (np.ndarray): The states of all games, shape (n_envs, 4).
+        """
+        self.states[:] = self._draw_games(self.n_envs)
+
+        return self.get_state()
+
+    def step(self, actions: np.ndarray):
+        """Executes one action per game
+
+        Args:
+            actions (np.ndarray): Integer indices into PONG_ACTION_POOL, shape (n_envs,).
+
+        Returns:
+            states (np.ndarray): The new states, shape (n_envs, 4). Games that are done are already reset.
+            rewards (np.ndarray): The rewards for the executed actions.
+            dones (np.ndarray): dones[i] = True if game i ended with this step.
+        """
+        rewards = self.table.rewards[self.states, actions].astype(np.float64)
+        dones = self.table.dones[self.states, actions]
+        self.states = self.table.next_states[self.states, actions]
+
+        finished = np.flatnonzero(dones)
+        if finished.size > 0:
+            self.final_states[finished] = self.table.observations[self.states[finished]]
+            self.states[finished] = self._draw_games(finished.size)
+
+        return self.get_state(), rewards, dones, None
+
+    def get_state(self):
+        """Returns the states of all games, each equal to PongEnv.get_state of the same game"""
+        return self.table.observations[self.states]
+
+    def get_snapshots(self, envs: np.ndarray = None):
+        """Returns the states of the given games, by default of all games, as records of PONG_SNAPSHOT_DTYPE"""
+        snapshots = state_snapshots(self.states if envs is None else self.states[envs])
+
+        # the games share one random stream, whose state is stored in every record
+        snapshots["rng"] = self.rng.get_state()
+
+        return snapshots
+
+    def restore_snapshots(self, snapshots: np.ndarray, envs: np.ndarray = None):
+        """Restores the given games, by default all games, from records of PONG_SNAPSHOT_DTYPE. A single record is
+            restored into all of the given games. The random stream, which all games share, is restored from the first
+            record"""
+        envs = slice(None) if envs is None else np.asarray(envs, dtype=np.int64)
+        rng_states = np.ravel(snapshots["rng"])
+        if len(rng_states) > 0:
+            self.rng.set_state(rng_states[0])
+
+        self.states[envs] = state_index(snapshots["ball_pos"], snapshots["ball_vel"], snapshots["paddle_pos"])
+
+    def _draw_games(self, n: int):
+        """Returns the start states of n new games, which are drawn like the games of VecPongEnv._reset_envs"""
+        generator = self.rng.generator
+        x = generator.integers(3, 13, size=n)
+        y = generator.integers(0, HEIGHT, size=n)
+        vel_y = generator.choice([-1, 1], size=n)
+
+        return state_index(np.stack([x, y], axis=-1), np.stack([np.where(x < 8, 1, -1), vel_y], axis=-1),
+                           np.full((n, 2), 4))
@@ -0,0 +1,45 @@
+import numpy as np
+import unittest
+from envs.action import Action, action_bin_edges, action_index, action_indices
+from envs.pong_env import PONG_ACTION_POOL, PongEnv
+
+
+class TestAction(unittest.TestCase):
+    def test_action_indices(self):
+        indices = action_indices(PONG_ACTION_POOL)
+        for i, action in enumerate(PONG_ACTION_POOL):
+            self.assertEqual(indices[action], i)
+            self.assertEqual(indices[i], i)
+            self.assertEqual(indices[np.int64(i)], i)
+
+    def test_action_index(self):
+        indices = action_indices(PONG_ACTION_POOL)
+        for i, action in enumerate(PONG_ACTION_POOL):
+            self.assertEqual(action_index(indices, action), i)
+            self.assertEqual(action_index(indices, list(action)), i)
+            self.assertEqual(action_index(indices, np.array(action)), i)
+            self.assertEqual(action_index(indices, np.array(i)), i)
+        self.assertRaises(KeyError, action_index, indices, [Action.LEFT, Action.UP])
+
+        # the paddle actions of Pong used to be accepted as lists, which are not hashable
+        env, list_env = PongEnv(seed=0), PongEnv(seed=0)
+        env.reset()
+        list_env.reset()
+        state = np.empty(4, dtype=np.float32)
+        for action in PONG_ACTION_POOL * 5:
+            self.assertEqual(list_env.step(list(action)), env.step(action))
+            self.assertEqual(list_env.step_into(np.array(action), state), env.step_into(action, state))
+
+    def test_action_bin_edges(self):
+        for n_actions in [2, 3, 4]:
+            edges = action_bin_edges(n_actions)
+            actions = np.concatenate([np.random.RandomState(0).uniform(-1, 1, size=1000), edges, [-1, 1]])
+
+            # the first bin whose upper end the action is smaller than or equal to
+            expected = [next(i for i in range(n_actions) if action <= -1 + (i + 1) * (2 / n_actions))
+                        for action in actions]
+            np.testing.assert_array_equal(np.digitize(actions, edges, right=True), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
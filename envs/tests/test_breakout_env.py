@@ -1,13 +1,14 @@
 import numpy as np
 from copy import deepcopy
 import unittest
-from envs.breakout_env import BreakoutEnv, Action
+from envs.breakout_env import BreakoutEnv, Action, COLORS, RED, SPACE_TOP, N_LAYERS
 
 
 class TestBreakoutEnv(unittest.TestCase):
 
     def test_step(self):
-        env = BreakoutEnv(15)
+        # a seed for which the ball does not start next to a side wall
+        env = BreakoutEnv(15, seed=1)
         env.reset()
 
         ball_pos = deepcopy(env.ball.pos)
@@ -28,6 +29,48 @@ class TestBreakoutEnv(unittest.TestCase):
             env.paddle.x_end == paddle_x_end + action.value[0] and
             env.paddle.y_pos == paddle_y_pos)
 
+    def test_screenshot(self):
+        env = BreakoutEnv(15)
+        env.reset()
+        env.blocks[2, 5] = 1
+
+        arr = env.screenshot()
+
+        for layer in range(N_LAYERS):
+            self.assertTrue(np.all(arr[SPACE_TOP + layer, :5] == COLORS[layer]))
+        self.assertTrue(np.all(arr[SPACE_TOP + 2, 5] == 0))
+        self.assertTrue(np.all(arr[env.ball.pos[1], env.ball.pos[0]] == RED))
+        self.assertTrue(np.all(arr[env.paddle.y_pos, env.paddle.x_start:env.paddle.x_end + 1] == RED))
+        self.assertEqual(np.count_nonzero(arr[env.paddle.y_pos].any(axis=1)), 15)
+
+    def test_snapshot(self):
+        env = BreakoutEnv(15)
+        env.reset()
+        for _ in range(20):
+            env.step(Action.LEFT)
+
+        snapshot = env.get_snapshot()
+        trajectory = [env.step(Action.RIGHT) + (env.screenshot().copy(),) for _ in range(50)]
+
+        for restored_env in [BreakoutEnv(15), env]:
+            restored_env.restore_snapshot(snapshot)
+
+            for state, reward, done, _, screenshot in trajectory:
+                self.assertEqual(restored_env.step(Action.RIGHT), (state, reward, done, None))
+                np.testing.assert_array_equal(restored_env.screenshot(), screenshot)
+
+        # the stream is restored with the game, so the next games start alike
+        restored_env = BreakoutEnv(15, seed=1)
+        for game in [env, restored_env]:
+            game.restore_snapshot(snapshot)
+        self.assertEqual(restored_env.reset(), env.reset())
+
+        # restoring a record without a stream into a new environment draws no numbers from its stream
+        snapshot["rng"] = np.zeros((), dtype=snapshot["rng"].dtype)
+        restored_env = BreakoutEnv(15, seed=0)
+        restored_env.restore_snapshot(snapshot)
+        self.assertEqual(restored_env.reset(), BreakoutEnv(15, seed=0).reset())
+
 
 if __name__ == "__main__":
     unittest.main()
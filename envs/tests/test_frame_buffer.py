@@ -0,0 +1,58 @@
+import numpy as np
+import unittest
+from envs.frame_buffer import FrameBuffer, MAX_DIRTY_REGIONS
+from envs.breakout_env import BreakoutEnv, BREAKOUT_ACTION_POOL
+from envs.pong_env import PongEnv, PONG_ACTION_POOL
+from envs.snake_env import SnakeEnv, SNAKE_ACTION_POOL
+
+
+class TestFrameBuffer(unittest.TestCase):
+    def test_render(self):
+        painted = []
+        frame_buffer = FrameBuffer(4, 5, lambda region, *bounds: painted.append(bounds))
+
+        frame_buffer.render()
+        self.assertEqual(painted, [(0, 4, 0, 5)])
+
+        painted.clear()
+        frame_buffer.mark_cell(2, 1)
+        frame_buffer.mark(-1, 2, 3, 9)
+        frame_buffer.mark(4, 6, 0, 5)
+        frame_buffer.render()
+        self.assertEqual(painted, [(1, 2, 2, 3), (0, 2, 3, 5)])
+        self.assertEqual(frame_buffer.changed_regions, painted)
+
+        painted.clear()
+        frame_buffer.render()
+        self.assertEqual(painted, [])
+
+    def test_too_many_regions(self):
+        frame_buffer = FrameBuffer(4, 5, lambda region, *bounds: None)
+        frame_buffer.render()
+
+        for _ in range(MAX_DIRTY_REGIONS + 1):
+            frame_buffer.mark_cell(0, 0)
+        frame_buffer.render()
+
+        self.assertEqual(frame_buffer.changed_regions, [(0, 4, 0, 5)])
+
+    def test_incremental_screenshots(self):
+        np.random.seed(0)
+
+        for env, action_pool in [(SnakeEnv(9, 2), SNAKE_ACTION_POOL), (BreakoutEnv(15), BREAKOUT_ACTION_POOL),
+                                 (PongEnv(), PONG_ACTION_POOL)]:
+            env.reset()
+            for _ in range(300):
+                _, _, done, _ = env.step(action_pool[np.random.randint(len(action_pool))])
+                if done:
+                    env.reset()
+
+                if np.random.random() < 0.5:
+                    screenshot = env.screenshot().copy()
+
+                    env._frame_buffer.invalidate()
+                    np.testing.assert_array_equal(screenshot, env.screenshot())
+
+
+if __name__ == "__main__":
+    unittest.main()
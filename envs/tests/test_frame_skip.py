@@ -0,0 +1,72 @@
+import numpy as np
+import unittest
+from envs.frame_skip import FrameSkipWrapper, repeat_action
+from envs.pong_env import PongEnv, Action
+from envs.snake_env import SnakeEnv, SNAKE_ACTION_POOL
+
+
+class CountdownEnv:
+    """Environment that ends after a fixed number of steps and rewards every step with its number"""
+
+    def __init__(self, n_steps):
+        self.n_steps = n_steps
+        self.steps = 0
+
+    def step(self, action):
+        self.steps += 1
+        return self.steps, self.steps == self.n_steps, action
+
+
+class TestFrameSkip(unittest.TestCase):
+    def test_init(self):
+        self.assertRaises(ValueError, FrameSkipWrapper, PongEnv(), 0)
+        self.assertRaises(ValueError, PongEnv, 0)
+        self.assertRaises(ValueError, SnakeEnv, 7, 2, 0)
+
+    def test_repeat_action(self):
+        env = CountdownEnv(5)
+
+        self.assertEqual(repeat_action(env.step, "a", 3), (1 + 2 + 3, False, "a"))
+        # the repetition stops when the episode ends
+        self.assertEqual(repeat_action(env.step, "b", 3), (4 + 5, True, "b"))
+
+    def test_constructor_matches_repeated_steps(self):
+        env = PongEnv(frame_skip=3)
+        env.reset()
+
+        single_step_env = PongEnv()
+        single_step_env.restore_snapshot(env.get_snapshot())
+
+        for _ in range(2):
+            rewards = 0
+            for _ in range(3):
+                state, reward, done, _ = single_step_env.step((Action.UP, Action.DOWN))
+                rewards += reward
+                if done:
+                    break
+
+            self.assertEqual(env.step((Action.UP, Action.DOWN)), (state, rewards, done, None))
+            if done:
+                break
+
+    def test_wrapper_matches_constructor(self):
+        envs = [FrameSkipWrapper(SnakeEnv(7, 2, seed=0), 4), SnakeEnv(7, 2, frame_skip=4, seed=0)]
+
+        trajectories = []
+        for env in envs:
+            actions = np.random.RandomState(1).randint(len(SNAKE_ACTION_POOL), size=200)
+
+            trajectory = [env.reset().tolist()]
+            for action in actions:
+                state, reward, done, score = env.step(SNAKE_ACTION_POOL[action])
+                trajectory.append((state.tolist(), reward, done, score))
+                if done:
+                    trajectory.append(env.reset().tolist())
+
+            trajectories.append(trajectory)
+
+        self.assertEqual(trajectories[0], trajectories[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import numpy as np
+import unittest
+from envs.snake_env import SnakeEnv
+from envs.breakout_env import BreakoutEnv, HEIGHT, N_LAYERS, SPACE_TOP, WIDTH
+from envs.pong_env import PongEnv
+from envs.vec_snake_env import VecSnakeEnv
+from envs.vec_breakout_env import VecBreakoutEnv
+from envs.vec_pong_env import VecPongEnv
+from envs.tabular_pong import TabularPongEnv
+from envs.numba_envs import NumbaSnakeEnv, NumbaBreakoutEnv, NumbaPongEnv
+from envs.golden_trajectories import GOLDEN_ENVS, load, record, replay
+
+GOLDEN_DIRECTORY = os.path.join(os.path.dirname(__file__), "golden")
+
+# the engines that must follow the golden trajectories of each fixture
+ENGINES = {
+    "snake_5_1": [lambda: SnakeEnv(5, 1), lambda: VecSnakeEnv(1, 5, 1), lambda: NumbaSnakeEnv(5, 1)],
+    "snake_7_2": [lambda: SnakeEnv(7, 2), lambda: VecSnakeEnv(1, 7, 2), lambda: NumbaSnakeEnv(7, 2)],
+    "snake_11_3": [lambda: SnakeEnv(11, 3), lambda: VecSnakeEnv(1, 11, 3), lambda: NumbaSnakeEnv(11, 3)],
+    "breakout_3": [lambda: BreakoutEnv(3), lambda: VecBreakoutEnv(1, 3), lambda: NumbaBreakoutEnv(3)],
+    "breakout_15": [lambda: BreakoutEnv(15), lambda: VecBreakoutEnv(1, 15), lambda: NumbaBreakoutEnv(15)],
+    "breakout_walls": [lambda: BreakoutEnv(3), lambda: VecBreakoutEnv(1, 3), lambda: NumbaBreakoutEnv(3)],
+    "pong": [PongEnv, lambda: VecPongEnv(1), lambda: TabularPongEnv(1), NumbaPongEnv],
+}
+
+
+def wall_rechecks(fixture, paddle_size):
+    """Returns the x positions of the ball in the steps of a Breakout fixture in which the second wall check of
+        BreakoutEnv._step turned the ball, i.e. a diagonal block hit at a side wall"""
+    env = BreakoutEnv(paddle_size)
+    positions = []
+
+    done, episode = True, 0
+    for action in fixture["actions"].tolist():
+        if done:
+            env.reset()
+            env.restore_snapshot(fixture["start_snapshots"][episode])
+            episode += 1
+
+        # the velocity after the first wall check and the roof, the paddle is far from the blocks
+        (x, y), (vel_x, vel_y) = env.ball.pos, env.ball.vel
+        if x == 0 and vel_x == -1 or x == WIDTH - 1 and vel_x == 1:
+            vel_x *= -1
+        if y == 0:
+            vel_y *= -1
+
+        layer = y + vel_y - SPACE_TOP
+        if x in (0, WIDTH - 1) and 0 <= layer < N_LAYERS and y != HEIGHT - 2 and env.blocks[layer, x] == 1 and \
+                env.blocks[layer, x + vel_x] == 0:
+            positions.append(x)
+
+        _, _, done, _ = env.step(action)
+
+    return positions
+
+
+class TestGoldenTrajectories(unittest.TestCase):
+    def test_fixtures_are_current(self):
+        # the reference environments themselves must still play the recorded games
+        for name in GOLDEN_ENVS:
+            fixture = load(os.path.join(GOLDEN_DIRECTORY, f"{name}.npz"))
+            recorded = record(name, len(fixture["actions"]))
+
+            for key, value in fixture.items():
+                np.testing.assert_array_equal(recorded[key], value, err_msg=f"{name} {key}")
+
+    def test_engines(self):
+        for name, engines in ENGINES.items():
+            fixture = load(os.path.join(GOLDEN_DIRECTORY, f"{name}.npz"))
+            for create in engines:
+                env = create()
+                with self.subTest(name=name, engine=type(env).__name__):
+                    self.assertIsNone(replay(fixture, env))
+
+    def test_wall_rechecks(self):
+        # the engines must replay diagonal block hits at both side walls, which breakout_walls is made for
+        fixture = load(os.path.join(GOLDEN_DIRECTORY, "breakout_walls.npz"))
+        positions = wall_rechecks(fixture, 3)
+        self.assertGreaterEqual(positions.count(0), 5)
+        self.assertGreaterEqual(positions.count(WIDTH - 1), 5)
+
+    def test_divergence(self):
+        fixture = load(os.path.join(GOLDEN_DIRECTORY, "snake_7_2.npz"))
+        fixture["rewards"][100] += 1
+
+        divergence = replay(fixture, SnakeEnv(7, 2))
+        self.assertEqual((divergence.step, divergence.field), (100, "reward"))
+        self.assertEqual(divergence.episode, np.count_nonzero(fixture["dones"][:100]))
+
+        # without resyncing the games only match with the seed of the recording
+        fixture = load(os.path.join(GOLDEN_DIRECTORY, "pong.npz"))
+        self.assertIsNone(replay(fixture, PongEnv(seed=0), resync=False))
+        self.assertEqual(replay(fixture, PongEnv(seed=1), resync=False)[:3], (0, -1, "observation"))
+
+        self.assertRaises(ValueError, replay, fixture, VecPongEnv(2))
+
+
+if __name__ == "__main__":
+    unittest.main()
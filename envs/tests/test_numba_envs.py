@@ -0,0 +1,73 @@
+import numpy as np
+import unittest
+from envs.snake_env import SnakeEnv, SNAKE_ACTION_POOL
+from envs.breakout_env import BreakoutEnv, BREAKOUT_ACTION_POOL
+from envs.pong_env import PongEnv, PONG_ACTION_POOL
+from envs.numba_envs import make_env, NumbaSnakeEnv, NumbaBreakoutEnv, NumbaPongEnv, NUMBA_AVAILABLE
+
+
+class TestNumbaEnvs(unittest.TestCase):
+    def test_make_env(self):
+        self.assertRaises(ValueError, make_env, SnakeEnv, backend="cython")
+        self.assertIsInstance(make_env(SnakeEnv, 7, 2), SnakeEnv)
+
+        if NUMBA_AVAILABLE:
+            self.assertIsInstance(make_env(BreakoutEnv, 5, backend="numba"), NumbaBreakoutEnv)
+
+    def test_snake_matches_python(self):
+        for grid_size, vision in [(5, 1), (7, 2)]:
+            self._assert_same_games(SnakeEnv(grid_size, vision, seed=0), NumbaSnakeEnv(grid_size, vision, seed=0),
+                                    SNAKE_ACTION_POOL)
+
+    def test_breakout_matches_python(self):
+        self._assert_same_games(BreakoutEnv(5, seed=0), NumbaBreakoutEnv(5, seed=0), BREAKOUT_ACTION_POOL, n_steps=3000)
+
+    def test_pong_matches_python(self):
+        self._assert_same_games(PongEnv(seed=0), NumbaPongEnv(seed=0), PONG_ACTION_POOL)
+
+    def test_step_into(self):
+        envs = [SnakeEnv(5, 1), BreakoutEnv(5), PongEnv(), NumbaSnakeEnv(5, 1), NumbaBreakoutEnv(5), NumbaPongEnv()]
+        for env in envs:
+            action_pool = env.action_pool
+            env.reset()
+            snapshot = env.get_snapshot()
+            random_state = env.rng.get_state()
+
+            expected = [env.step(action_pool[i % len(action_pool)]) for i in range(20)]
+
+            env.restore_snapshot(snapshot)
+            env.rng.set_state(random_state)
+            state = np.empty(len(env.get_state()), dtype=np.float32)
+            for i, (expected_state, reward, done, info) in enumerate(expected):
+                self.assertEqual(env.step_into(action_pool[i % len(action_pool)], state), (reward, done, info))
+                np.testing.assert_array_equal(state, np.asarray(expected_state, dtype=np.float32))
+                if done:
+                    break
+
+    def _assert_same_games(self, env, numba_env, action_pool, n_steps=1000):
+        """Plays both environments, which must be seeded alike, with the same actions and compares every step, the
+            snapshots, the encodings and some screenshots"""
+        trajectories = []
+        for game in [env, numba_env]:
+            actions = np.random.RandomState(1).randint(len(action_pool), size=n_steps)
+
+            trajectory = [np.asarray(game.reset()).tolist()]
+            for i, action in enumerate(actions):
+                state, reward, done, info = game.step(action_pool[action])
+                encoding = np.array(game.get_encoding(), dtype=game.encoding_dtype)
+                trajectory.append((np.asarray(state).tolist(), reward, done, info, game.get_snapshot().tobytes(),
+                                   encoding.tobytes()))
+                if i % 10 == 0:
+                    trajectory.append(game.screenshot().tobytes())
+                if done:
+                    trajectory.append(np.asarray(game.reset()).tolist())
+
+            trajectories.append(trajectory)
+
+        self.assertEqual(len(trajectories[0]), len(trajectories[1]))
+        for step, numba_step in zip(*trajectories):
+            self.assertEqual(step, numba_step)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import numpy as np
+import unittest
+from envs.pixel_observation import PixelObservationWrapper
+from envs.breakout_env import BreakoutEnv, BREAKOUT_ACTION_POOL, HEIGHT, WIDTH
+from envs.pong_env import PongEnv, PONG_ACTION_POOL
+
+
+class TestPixelObservationWrapper(unittest.TestCase):
+    def test_shapes(self):
+        env = PixelObservationWrapper(BreakoutEnv(15), n_frames=4, grayscale=True, downsample=2)
+        state = env.reset()
+        self.assertEqual(state.shape, (4, (HEIGHT + 1) // 2, WIDTH // 2))
+        self.assertEqual(state.dtype, np.float32)
+
+        env = PixelObservationWrapper(BreakoutEnv(15), n_frames=2, grayscale=False)
+        state = env.reset()
+        self.assertEqual(state.shape, (6, HEIGHT, WIDTH))
+        np.testing.assert_allclose(state[3:].transpose(1, 2, 0), env.screenshot() / 255, rtol=1e-6)
+
+    def test_frame_stack(self):
+        np.random.seed(0)
+
+        for n_frames in [1, 3]:
+            env = PixelObservationWrapper(PongEnv(), n_frames=n_frames, grayscale=False)
+            screenshots = [env.reset()[-3:].copy()] * n_frames
+            states = []
+
+            for _ in range(100):
+                state, _, done, _ = env.step(PONG_ACTION_POOL[np.random.randint(len(PONG_ACTION_POOL))])
+                if done:
+                    break
+
+                self.assertTrue(np.shares_memory(state, env._frames))
+
+                screenshots.append(env.screenshot().transpose(2, 0, 1) / 255)
+                expected = np.concatenate(screenshots[-n_frames:])
+                np.testing.assert_allclose(state, expected, rtol=1e-6)
+
+                # observations of the previous n_frames steps must still be intact
+                states.append((state, expected))
+                for old_state, old_expected in states[-n_frames - 1:]:
+                    np.testing.assert_allclose(old_state, old_expected, rtol=1e-6)
+
+    def test_grayscale(self):
+        env = PixelObservationWrapper(BreakoutEnv(15), n_frames=1)
+        state = env.reset()
+        env.step(BREAKOUT_ACTION_POOL[0])
+
+        expected = env.screenshot() @ np.array([0.299, 0.587, 0.114]) / 255
+        np.testing.assert_allclose(env.get_state()[0], expected, rtol=1e-5)
+        self.assertTrue(np.all((state >= 0) & (state <= 1)))
+
+    def test_lazy_frames(self):
+        env = PongEnv(seed=0)
+        env.reset()
+        snapshot = env.get_snapshot()
+
+        # wrapping neither resets the environment nor draws from its stream, the stack is filled on the first get_state
+        wrapper = PixelObservationWrapper(env, n_frames=2)
+        self.assertIsNone(wrapper.observation_shape)
+        self.assertEqual(env.get_snapshot().tobytes(), snapshot.tobytes())
+
+        expected = env.screenshot() @ np.array([0.299, 0.587, 0.114]) / 255
+        np.testing.assert_allclose(wrapper.get_state(), np.stack([expected] * 2), rtol=1e-5)
+        self.assertEqual(wrapper.observation_shape, (2, 9, 16))
+
+    def test_restore_snapshot(self):
+        env = PixelObservationWrapper(PongEnv(seed=0), n_frames=3)
+        env.reset()
+        for _ in range(5):
+            env.step(PONG_ACTION_POOL[0])
+        snapshot = env.get_snapshot()
+        state = env.step(PONG_ACTION_POOL[1])[0].copy()
+
+        # the frame stack is filled with the restored screenshot, from which the same action gives the same frame
+        env.reset()
+        env.restore_snapshot(snapshot)
+        expected = env.screenshot() @ np.array([0.299, 0.587, 0.114]) / 255
+        np.testing.assert_allclose(env.get_state(), np.stack([expected] * 3), rtol=1e-5)
+        np.testing.assert_allclose(env.step(PONG_ACTION_POOL[1])[0][-1], state[-1], rtol=1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
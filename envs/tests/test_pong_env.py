@@ -43,7 +43,8 @@ class TestPongEnv(unittest.TestCase):
         self.assertTrue(left_paddle_pos == env.left_paddle.pos and right_paddle_pos == env.right_paddle.pos)
 
     def test_get_state(self):
-        env = PongEnv()
+        # a seed for which the ball does not bounce off a wall or a paddle in the first step
+        env = PongEnv(seed=0)
         env.reset()
 
         left_paddle_pos = env.left_paddle.pos
@@ -57,6 +58,30 @@ class TestPongEnv(unittest.TestCase):
             new_state[0] == [(left_paddle_pos - 1) / 9, (ball_pos[0] + ball_vel[0]) / 16,
                              (ball_pos[1] + ball_vel[1]) / 9, (right_paddle_pos + 1) / 9])
 
+    def test_snapshot(self):
+        env = PongEnv()
+        env.reset()
+        env.step((Action.UP, Action.DOWN))
+
+        snapshot = env.get_snapshot()
+        trajectory = [env.step((Action.DOWN, Action.UP)) for _ in range(3)]
+
+        for restored_env in [PongEnv(), env]:
+            restored_env.restore_snapshot(snapshot)
+            self.assertEqual([restored_env.step((Action.DOWN, Action.UP)) for _ in range(3)], trajectory)
+
+        # the stream is restored with the game, so the next games start alike
+        restored_env = PongEnv(seed=1)
+        for game in [env, restored_env]:
+            game.restore_snapshot(snapshot)
+        self.assertEqual(restored_env.reset(), env.reset())
+
+        # restoring a record without a stream into a new environment draws no numbers from its stream
+        snapshot["rng"] = np.zeros((), dtype=snapshot["rng"].dtype)
+        restored_env = PongEnv(seed=0)
+        restored_env.restore_snapshot(snapshot)
+        self.assertEqual(restored_env.reset(), PongEnv(seed=0).reset())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,53 @@
+import numpy as np
+import unittest
+from envs.random_stream import RANDOM_STREAM_STATE_DTYPE, RandomStream
+
+
+class TestRandomStream(unittest.TestCase):
+    def test_stream_init(self):
+        self.assertRaises(ValueError, RandomStream, 0, 0)
+
+    def test_reproducible(self):
+        streams = [RandomStream(7, block_size=3), RandomStream(7, block_size=3)]
+        draws = [[(stream.random(), stream.integers(2, 5), stream.choice("abc")) for _ in range(10)]
+                 for stream in streams]
+
+        self.assertEqual(draws[0], draws[1])
+        for value, integer, letter in draws[0]:
+            self.assertTrue(0 <= value < 1)
+            self.assertIn(integer, [2, 3, 4])
+            self.assertIn(letter, "abc")
+
+    def test_spawn(self):
+        first, second = RandomStream(0).spawn(2)
+        self.assertNotEqual([first.random() for _ in range(5)], [second.random() for _ in range(5)])
+
+        # the spawned streams of the same seed are the same in every run
+        self.assertEqual(RandomStream(0).spawn(2)[1].random(), RandomStream(0).spawn(2)[1].random())
+
+    def test_state(self):
+        # the state is stored before the first block, within a block, at its end and after direct draws of the generator
+        for n_draws, n_generator_draws in [(0, 0), (6, 0), (8, 0), (6, 3)]:
+            stream = RandomStream(0, block_size=4)
+            for _ in range(n_draws):
+                stream.random()
+            stream.generator.random(n_generator_draws)
+
+            state = stream.get_state()
+            self.assertEqual(state.dtype, RANDOM_STREAM_STATE_DTYPE)
+            draws = [stream.integers(100) for _ in range(10)] + stream.generator.random(2).tolist()
+
+            # the stream itself and another one repeat the numbers
+            for restored in [stream, RandomStream(1, block_size=4)]:
+                restored.set_state(state.copy())
+                self.assertEqual([restored.integers(100) for _ in range(10)] + restored.generator.random(2).tolist(),
+                                 draws)
+
+        # a record of zeros holds no state and leaves the stream as it is
+        state = stream.get_state()
+        stream.set_state(np.zeros((), dtype=RANDOM_STREAM_STATE_DTYPE))
+        self.assertEqual(stream.get_state().tobytes(), state.tobytes())
+
+
+if __name__ == "__main__":
+    unittest.main()
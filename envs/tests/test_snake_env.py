@@ -1,6 +1,8 @@
 import numpy as np
 import unittest
-from envs.snake_env import SnakeEnv, Action
+from envs.snake_env import (SnakeEnv, Snake, FreeCellIndex, Action, SNAKE_ACTION_INDICES, SNAKE_ACTION_POOL,
+                            SNAKE_MOVES)
+from envs.random_stream import RandomStream
 
 
 class TestSnakeEnv(unittest.TestCase):
@@ -61,6 +63,138 @@ class TestSnakeEnv(unittest.TestCase):
         self.assertCountEqual(surrounding_cell_state,
                               [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0])
 
+    def test_occupancy(self):
+        env = SnakeEnv(7, 3)
+        env.reset()
+
+        for action in [Action.UP, Action.UP, Action.LEFT, Action.DOWN, Action.DOWN, Action.DOWN]:
+            env.step(action)
+
+            occupancy = np.zeros((7, 7), dtype=np.uint8)
+            for cell in env._snake.cells:
+                occupancy[cell[1], cell[0]] = 1
+
+            np.testing.assert_array_equal(env._occupancy[3:-3, 3:-3], occupancy)
+            self.assertTrue(np.all(env._occupancy[:3] == 1) and np.all(env._occupancy[:, -3:] == 1))
+
+        window = env._vision_window(env._snake.cells[0])
+        self.assertEqual(window.shape, (7, 7))
+        self.assertTrue(np.shares_memory(window, env._occupancy))
+
+    def test_free_cell_index(self):
+        free_cells = FreeCellIndex(3)
+        rng = RandomStream(0)
+        for flat_cell in [0, 5, 4]:
+            free_cells.remove(flat_cell)
+        free_cells.add(5)
+
+        self.assertEqual(len(free_cells), 7)
+        self.assertNotIn(0, free_cells)
+        self.assertNotIn(4, free_cells)
+        self.assertIn(5, free_cells)
+
+        for _ in range(20):
+            self.assertIn(free_cells.sample(rng), free_cells)
+
+    def test_free_cells(self):
+        env = SnakeEnv(5, 1)
+        env.reset()
+
+        for action in [Action.UP, Action.LEFT, Action.LEFT, Action.DOWN, Action.DOWN, Action.RIGHT]:
+            _, _, done, _ = env.step(action)
+            if done:
+                break
+
+            free_cells = env._snake.free_cells
+            self.assertEqual(len(free_cells), 25 - len(env._snake))
+            for cell in env._snake.cells:
+                self.assertNotIn(cell[1] * 5 + cell[0], free_cells)
+            self.assertIn(env._food_cell[1] * 5 + env._food_cell[0], free_cells)
+
+    def test_snake_ring_buffer(self):
+        snake = Snake([(1, 1), (1, 2)], 3)
+        up, right, down, left = (SNAKE_ACTION_INDICES[action]
+                                 for action in [Action.UP, Action.RIGHT, Action.DOWN, Action.LEFT])
+
+        snake.grow(right)
+        snake.move(up)
+        snake.move(left)
+        snake.grow(left)
+        self.assertEqual(snake.cells, [(0, 0), (1, 0), (2, 0), (2, 1)])
+
+        # circle the border of the grid three times, which wraps around the end of the buffer several times
+        for action in [down, down, right, right, up, up, left, left] * 3:
+            snake.move(action)
+        self.assertEqual(snake.cells, [(0, 0), (1, 0), (2, 0), (2, 1)])
+        self.assertEqual(snake.head, (0, 0))
+
+    def test_integer_actions(self):
+        # integer indices play the same game as the actions of the pool, including the ignored 180 degree turns
+        indices = [1, 3, 2, 0, 0, 3, 1, 2] * 3
+        int_env, action_env = SnakeEnv(5, 1, seed=0), SnakeEnv(5, 1, seed=0)
+        int_env.reset()
+        action_env.reset()
+
+        for index in indices:
+            int_result = int_env.step(np.int64(index))
+            action_result = action_env.step(SNAKE_ACTION_POOL[index])
+            np.testing.assert_array_equal(int_result[0], action_result[0])
+            self.assertEqual(int_result[1:], action_result[1:])
+            self.assertEqual(int_env._snake.last_action, action_env._snake.last_action)
+            if int_result[2]:
+                break
+
+    def test_snapshot(self):
+        env = SnakeEnv(5, 1, seed=0)
+        env.reset()
+        env.step(Action.LEFT)
+
+        snapshot = env.get_snapshot()
+        actions = [Action.UP, Action.RIGHT, Action.RIGHT, Action.DOWN, Action.DOWN, Action.LEFT, Action.LEFT] * 3
+
+        trajectory = []
+        for action in actions:
+            state, reward, done, score = env.step(action)
+            trajectory.append((state, reward, done, score, env.screenshot().copy()))
+            if done:
+                break
+
+        # restore into a fresh environment as well as into the one that moved on, the snapshot holds the stream
+        for restored_env in [SnakeEnv(5, 1), env]:
+            restored_env.restore_snapshot(snapshot)
+
+            for action, (state, reward, done, score, screenshot) in zip(actions, trajectory):
+                self.assertEqual(restored_env.step(action)[1:], (reward, done, score))
+                np.testing.assert_array_equal(restored_env.get_state(), state)
+                np.testing.assert_array_equal(restored_env.screenshot(), screenshot)
+
+    def test_snapshot_branches(self):
+        # the snake heads for the food, so it eats in the branches and the food that spawns next must be drawn again
+        n_eaten = 0
+        for seed in [3, 6, 17, 24, 40, 44]:
+            env = SnakeEnv(5, 1, seed=seed)
+            env.reset()
+            snapshot = env.get_snapshot()
+
+            branches = []
+            for _ in range(2):
+                env.restore_snapshot(snapshot)
+                branch = []
+                for _ in range(40):
+                    (x, y), (food_x, food_y) = env._snake.head, env._food_cell
+                    action = min(range(len(SNAKE_ACTION_POOL)), key=lambda i: abs(x + SNAKE_MOVES[i][0] - food_x) +
+                                 abs(y + SNAKE_MOVES[i][1] - food_y))
+                    state, reward, done, _ = env.step(action)
+                    branch.append((state.tolist(), reward, done, env.get_snapshot().tobytes()))
+                    if done:
+                        break
+                branches.append(branch)
+
+            self.assertEqual(branches[0], branches[1])
+            n_eaten += sum(reward > 0 for _, reward, _, _ in branches[0])
+
+        self.assertGreater(n_eaten, 6)
+
 
 if __name__ == "__main__":
     unittest.main()
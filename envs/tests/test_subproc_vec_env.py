@@ -0,0 +1,72 @@
+import gc
+import numpy as np
+import unittest
+from functools import partial
+from multiprocessing import shared_memory
+from envs.subproc_vec_env import SubprocVecEnv
+from envs.pong_env import PongEnv, PONG_ACTION_POOL, Action
+from envs.snake_env import SnakeEnv
+
+
+class TestSubprocVecEnv(unittest.TestCase):
+    def test_env_init(self):
+        self.assertRaises(ValueError, SubprocVecEnv, [])
+
+    def test_step(self):
+        with SubprocVecEnv([PongEnv] * 5, n_workers=2, seed=0) as env:
+            states = env.reset()
+            self.assertEqual(states.shape, (5, 4))
+            np.testing.assert_allclose(states[:, [0, 3]], 4 / 9)
+
+            up = PONG_ACTION_POOL.index((Action.UP, Action.UP))
+            for _ in range(3):
+                states, rewards, dones, _ = env.step(np.full(5, up))
+
+            self.assertEqual(rewards.shape, (5,))
+            self.assertEqual(dones.dtype, bool)
+
+            # paddles of games that did not end are at the top, paddles of games that were reset are centered
+            self.assertTrue(np.all(np.isclose(states[:, 0], 1 / 9) | np.isclose(states[:, 0], 4 / 9)))
+
+    def test_auto_reset(self):
+        with SubprocVecEnv([partial(SnakeEnv, 5, 1)] * 4, n_workers=2, seed=0) as env:
+            env.reset()
+
+            # moving up runs every snake into the wall after three steps
+            for _ in range(2):
+                _, rewards, dones, _ = env.step(np.zeros(4))
+                self.assertFalse(dones.any())
+
+            states, rewards, dones, _ = env.step(np.zeros(4))
+            np.testing.assert_array_equal(dones, True)
+            np.testing.assert_array_equal(rewards, -1)
+
+            # the final states see the wall above the head, the states after the reset don't
+            self.assertTrue(np.all(env.final_states[:, 2:5] == 1))
+            self.assertTrue(np.all(states[:, 2:5] == 0))
+
+    def test_independent_workers(self):
+        with SubprocVecEnv([PongEnv] * 8, n_workers=8, seed=0) as env:
+            states = env.reset()
+
+        self.assertGreater(len(np.unique(states[:, 1:3], axis=0)), 1)
+
+    def test_release_without_close(self):
+        env = SubprocVecEnv([PongEnv] * 2, n_workers=2, seed=0)
+        env.reset()
+        processes, memory_name = env._processes, env._shared_memory.name
+
+        # an environment that is not closed stops its workers and unlinks its memory when it is garbage collected
+        del env
+        gc.collect()
+        self.assertFalse(any(process.is_alive() for process in processes))
+        self.assertRaises(FileNotFoundError, shared_memory.SharedMemory, name=memory_name)
+
+        env = SubprocVecEnv([PongEnv] * 2, n_workers=2, seed=0)
+        env.close()
+        env.close()
+        self.assertIsNone(env.states)
+
+
+if __name__ == "__main__":
+    unittest.main()
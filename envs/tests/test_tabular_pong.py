@@ -0,0 +1,55 @@
+import numpy as np
+import unittest
+from envs.tabular_pong import PongTable, TabularPongEnv, N_STATES, state_index, state_snapshots, value_iteration
+from envs.vec_pong_env import VecPongEnv
+
+
+class TestTabularPong(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # building the table takes a moment, so all tests share it
+        cls.table = PongTable()
+
+    def test_state_index(self):
+        snapshots = state_snapshots(np.arange(N_STATES))
+        np.testing.assert_array_equal(state_index(snapshots["ball_pos"], snapshots["ball_vel"],
+                                                  snapshots["paddle_pos"]), np.arange(N_STATES))
+
+    def test_matches_vec_pong_env(self):
+        n_envs = 500
+        vec_env = VecPongEnv(n_envs, seed=0)
+        env = TabularPongEnv(n_envs, self.table, seed=0)
+
+        # both environments draw the same new games from the same seed, so they play the same games step by step
+        np.testing.assert_array_equal(env.reset(), vec_env.reset())
+
+        n_dones = 0
+        actions = np.random.RandomState(0).randint(4, size=(300, n_envs))
+        for step_actions in actions:
+            states, rewards, dones, _ = vec_env.step(step_actions)
+            table_states, table_rewards, table_dones, _ = env.step(step_actions)
+
+            np.testing.assert_array_equal(table_rewards, rewards)
+            np.testing.assert_array_equal(table_dones, dones)
+            np.testing.assert_array_equal(env.final_states[dones], vec_env.final_states[dones])
+            np.testing.assert_array_equal(table_states, states)
+            n_dones += np.count_nonzero(dones)
+
+        self.assertGreater(n_dones, n_envs)
+
+    def test_value_iteration(self):
+        self.assertRaises(ValueError, value_iteration, self.table, 1)
+
+        policy, values = value_iteration(self.table)
+        self.assertTrue(np.all(values[self.table.terminal] == 0))
+
+        # the optimal policy returns every ball, so none of the games ever ends
+        env = TabularPongEnv(len(self.table.start_states), self.table)
+        env.states[:] = self.table.start_states
+        for _ in range(200):
+            _, _, dones, _ = env.step(policy[env.states])
+            self.assertFalse(dones.any())
+
+
+if __name__ == "__main__":
+    unittest.main()
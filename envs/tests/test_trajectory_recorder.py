@@ -0,0 +1,120 @@
+import os
+import tempfile
+import numpy as np
+import unittest
+from envs.pong_env import PongEnv
+from envs.breakout_env import BreakoutEnv
+from envs.snake_env import SnakeEnv
+from envs.trajectory_recorder import TrajectoryRecorder, TrajectoryReader
+
+
+class TestTrajectoryRecorder(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "trajectories")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_recorder_init(self):
+        self.assertRaises(ValueError, TrajectoryRecorder, self.path, PongEnv(), 0)
+
+        TrajectoryRecorder(self.path, SnakeEnv(9, vision=3)).close()
+        self.assertRaises(ValueError, TrajectoryRecorder, self.path, PongEnv())
+        self.assertRaises(ValueError, TrajectoryRecorder, self.path, SnakeEnv(9, vision=3, frame_skip=2))
+        TrajectoryRecorder(self.path, SnakeEnv(9, vision=3, seed=1)).close()
+
+        # the metadata holds everything that is needed to construct the recorded environment again
+        metadata = TrajectoryReader(self.path).metadata
+        self.assertEqual(metadata["env"], "SnakeEnv")
+        self.assertEqual(metadata["env_args"], {"grid_size": 9, "vision": 3, "frame_skip": 1})
+        self.assertEqual(metadata["frame_skip"], 1)
+
+    def test_replay_episodes(self):
+        for make_env in [PongEnv, lambda seed: SnakeEnv(5, seed=seed), lambda seed: BreakoutEnv(3, seed=seed)]:
+            env = make_env(seed=0)
+            actions = np.random.RandomState(0).randint(len(env.action_pool), size=300)
+
+            # a small chunk size makes the file grow several times
+            with TrajectoryRecorder(self.path, env, chunk_size=16) as recorder:
+                env.reset()
+                recorder.start_episode(env)
+                for action in actions:
+                    encoding = env.get_encoding()
+                    _, reward, done, _ = env.step(action)
+                    recorder.record(encoding, action, reward, done)
+                    if done:
+                        env.reset()
+                        recorder.start_episode(env)
+
+            reader = TrajectoryReader(self.path)
+            self.assertEqual(len(reader.steps), len(actions))
+            self.assertGreater(len(reader), 1)
+            self.assertEqual(len(reader.starts), len(reader) + 1)
+            np.testing.assert_array_equal(reader.steps["action"], actions)
+
+            # an environment with another seed that is restored to the start of an episode plays it again, including
+            # the random draws
+            replay_env = make_env(seed=1)
+            for i in range(len(reader)):
+                episode = reader.episode(i)
+                self.assertTrue(episode["done"][-1])
+                self.assertFalse(episode["done"][:-1].any())
+
+                reader.restore(i, replay_env)
+                for step in episode:
+                    encoding = np.array(replay_env.get_encoding(), dtype=replay_env.encoding_dtype)
+                    self.assertEqual(encoding.tobytes(), step["encoding"].tobytes())
+                    _, reward, _, _ = replay_env.step(step["action"])
+                    self.assertAlmostEqual(reward, step["reward"])
+
+            os.remove(self.path)
+
+    def test_snake_body(self):
+        env = SnakeEnv(7, seed=3)
+        snapshot = env.get_snapshot() if env.reset() is not None else None
+        heads = snapshot["body"][:snapshot["length"]][::-1].tolist()
+
+        # the body of the snake are its last heads, which only need the snapshot at the start of the episode
+        for action in np.random.RandomState(3).randint(len(env.action_pool), size=100):
+            encoding = np.array(env.get_encoding(), dtype=env.encoding_dtype)
+            self.assertEqual(heads[-1], encoding["head"])
+            np.testing.assert_array_equal(heads[::-1][:encoding["length"]],
+                                          env.get_snapshot()["body"][:encoding["length"]])
+
+            _, _, done, _ = env.step(action)
+            if done:
+                break
+            heads.append(np.array(env.get_encoding(), dtype=env.encoding_dtype)["head"])
+
+    def test_continue_recording(self):
+        env = PongEnv(seed=0)
+        env.reset()
+        encoding = env.get_encoding()
+
+        with TrajectoryRecorder(self.path, env) as recorder:
+            self.assertRaises(ValueError, recorder.record, encoding, 0, 0, True)
+
+        os.remove(self.path)
+        with TrajectoryRecorder(self.path, env) as recorder:
+            for done in [False, True, False]:
+                if recorder.n_steps in [0, 2]:
+                    recorder.start_episode(env)
+                recorder.record(encoding, 1, 0, done)
+
+        # the unfinished episode is dropped with its start when the recording is continued
+        with TrajectoryRecorder(self.path, env) as recorder:
+            self.assertEqual((recorder.n_steps, recorder.n_starts), (2, 1))
+            recorder.start_episode(env)
+            for done in [False, False, True]:
+                recorder.record(encoding, 2, 0, done)
+
+        reader = TrajectoryReader(self.path)
+        np.testing.assert_array_equal(reader.episode_starts, [0, 2])
+        np.testing.assert_array_equal(reader.index["start"], [0, 1])
+        self.assertEqual(len(reader.starts), 2)
+        np.testing.assert_array_equal(reader.episode(1)["action"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import numpy as np
+import unittest
+from envs.breakout_env import BreakoutEnv, BREAKOUT_ACTION_POOL, BREAKOUT_SNAPSHOT_DTYPE, Action
+from envs.vec_breakout_env import VecBreakoutEnv
+
+
+class TestVecBreakoutEnv(unittest.TestCase):
+    def test_env_init(self):
+        self.assertRaises(ValueError, VecBreakoutEnv, 0, 15)
+
+    def test_step(self):
+        env = VecBreakoutEnv(4, 15, seed=1)
+        env.reset()
+
+        ball_pos = env.ball_pos.copy()
+        ball_vel = env.ball_vel.copy()
+        paddle_x_start = env.paddle_x_start.copy()
+
+        env.step(np.full(4, BREAKOUT_ACTION_POOL.index(Action.RIGHT)))
+
+        np.testing.assert_array_equal(env.ball_pos, ball_pos + ball_vel)
+        np.testing.assert_array_equal(env.paddle_x_start, paddle_x_start + 1)
+
+    def test_matches_breakout_env(self):
+        np.random.seed(0)
+
+        for paddle_size in [3, 15]:
+            n_envs = 8
+            vec_env = VecBreakoutEnv(n_envs, paddle_size)
+            envs = [BreakoutEnv(paddle_size) for _ in range(n_envs)]
+
+            vec_env.reset()
+            for i, env in enumerate(envs):
+                self._sync_ball(env, vec_env, i)
+
+            for _ in range(2000):
+                # follow the ball most of the time so that the games last long enough to clear blocks
+                paddle_center = vec_env.paddle_x_start + paddle_size // 2
+                actions = np.where(vec_env.ball_pos[:, 0] > paddle_center, 1, 0)
+                explore = np.random.random(n_envs) < 0.2
+                actions[explore] = np.random.randint(2, size=explore.sum())
+
+                states, rewards, dones, _ = vec_env.step(actions)
+
+                for i, env in enumerate(envs):
+                    state, reward, done, _ = env.step(BREAKOUT_ACTION_POOL[actions[i]])
+
+                    self.assertEqual(reward, rewards[i])
+                    self.assertEqual(done, dones[i])
+
+                    if done:
+                        np.testing.assert_allclose(state, vec_env.final_states[i], rtol=1e-6)
+                        self._sync_ball(env, vec_env, i)
+                    else:
+                        np.testing.assert_allclose(state, states[i], rtol=1e-6)
+                        np.testing.assert_array_equal(env.blocks, vec_env.blocks[i])
+
+    def test_restore_snapshots(self):
+        envs = [BreakoutEnv(5) for _ in range(3)]
+        for i, env in enumerate(envs):
+            env.reset()
+            for _ in range(30 * i):
+                env.step(Action.LEFT)
+
+        vec_env = VecBreakoutEnv(3, 5)
+        vec_env.reset()
+        vec_env.restore_snapshots(np.stack([env.get_snapshot() for env in envs]), [2, 1, 0])
+
+        # the games are the restored ones, the shared stream is the one of the first record
+        snapshots = vec_env.get_snapshots([2, 1, 0])
+        for env, snapshot in zip(envs, snapshots):
+            for field in BREAKOUT_SNAPSHOT_DTYPE.names[:-1]:
+                np.testing.assert_array_equal(env.get_snapshot()[field], snapshot[field])
+        self.assertEqual(snapshots["rng"][0].tobytes(), envs[0].rng.get_state().tobytes())
+
+        for _ in range(100):
+            states, rewards, dones, _ = vec_env.step(np.zeros(3, dtype=np.int64))
+            if dones.any():
+                break
+
+            for i, env in zip([2, 1, 0], envs):
+                state, reward, _, _ = env.step(Action.LEFT)
+
+                self.assertEqual(reward, rewards[i])
+                np.testing.assert_allclose(state, states[i], rtol=1e-6)
+                np.testing.assert_array_equal(env.blocks, vec_env.blocks[i])
+
+    @staticmethod
+    def _sync_ball(env, vec_env, i):
+        env.reset()
+        env.ball.pos = vec_env.ball_pos[i].tolist()
+        env.ball.vel = vec_env.ball_vel[i].tolist()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import numpy as np
+import unittest
+from envs.pong_env import PongEnv, PONG_ACTION_POOL, Action
+from envs.vec_pong_env import VecPongEnv
+
+
+class TestVecPongEnv(unittest.TestCase):
+    def test_env_init(self):
+        self.assertRaises(ValueError, VecPongEnv, 0)
+
+    def test_paddle_clamping(self):
+        env = VecPongEnv(4)
+        env.reset()
+
+        for _ in range(5):
+            env.step(np.full(4, PONG_ACTION_POOL.index((Action.UP, Action.DOWN))))
+        np.testing.assert_array_equal(env.paddle_pos, [[1, 7]] * 4)
+
+        for _ in range(10):
+            env.step(np.full(4, PONG_ACTION_POOL.index((Action.DOWN, Action.UP))))
+        np.testing.assert_array_equal(env.paddle_pos, [[7, 1]] * 4)
+
+    def test_matches_pong_env(self):
+        np.random.seed(0)
+
+        n_envs = 16
+        vec_env = VecPongEnv(n_envs)
+        envs = [PongEnv() for _ in range(n_envs)]
+
+        vec_env.reset()
+        for i, env in enumerate(envs):
+            self._sync_ball(env, vec_env, i)
+
+        for _ in range(500):
+            actions = np.random.randint(len(PONG_ACTION_POOL), size=n_envs)
+            states, rewards, dones, _ = vec_env.step(actions)
+
+            for i, env in enumerate(envs):
+                state, reward, done, _ = env.step(PONG_ACTION_POOL[actions[i]])
+
+                self.assertEqual(reward, rewards[i])
+                self.assertEqual(done, dones[i])
+
+                if done:
+                    np.testing.assert_allclose(state, vec_env.final_states[i], rtol=1e-6)
+                    self._sync_ball(env, vec_env, i)
+                else:
+                    np.testing.assert_allclose(state, states[i], rtol=1e-6)
+
+    def test_restore_snapshots(self):
+        env = PongEnv()
+        env.reset()
+
+        vec_env = VecPongEnv(3)
+        vec_env.reset()
+        vec_env.restore_snapshots(env.get_snapshot(), [0, 2])
+
+        np.testing.assert_allclose(vec_env.get_state()[[0, 2]], [env.get_state()] * 2, rtol=1e-6)
+        self.assertEqual(vec_env.get_snapshots([2])[0], env.get_snapshot())
+
+        restored_env = PongEnv()
+        restored_env.restore_snapshot(vec_env.get_snapshots()[1])
+        np.testing.assert_allclose(restored_env.get_state(), vec_env.get_state()[1], rtol=1e-6)
+
+    @staticmethod
+    def _sync_ball(env, vec_env, i):
+        env.reset()
+        env.ball.pos = vec_env.ball_pos[i].tolist()
+        env.ball.vel = vec_env.ball_vel[i].tolist()
+
+
+if __name__ == "__main__":
+    unittest.main()
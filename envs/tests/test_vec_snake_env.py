@@ -0,0 +1,94 @@
+import numpy as np
+import unittest
+from envs.snake_env import SnakeEnv, SNAKE_ACTION_POOL
+from envs.vec_snake_env import VecSnakeEnv
+
+
+class TestVecSnakeEnv(unittest.TestCase):
+    def test_env_init(self):
+        self.assertRaises(ValueError, VecSnakeEnv, 0)
+        self.assertRaises(ValueError, VecSnakeEnv, 4, 4)
+
+    def test_reset(self):
+        env = VecSnakeEnv(8, 7, 2)
+        states = env.reset()
+
+        self.assertEqual(states.shape, (8, 2 + 5 * 5))
+        self.assertEqual(states.dtype, np.float32)
+
+        for food in env._food:
+            self.assertNotIn(env._to_cell(food), [(3, 3), (3, 4)])
+
+    def test_matches_snake_env(self):
+        np.random.seed(0)
+
+        for grid_size, vision in [(5, 1), (7, 2), (9, 4)]:
+            n_envs = 4
+            vec_env = VecSnakeEnv(n_envs, grid_size, vision)
+            envs = [SnakeEnv(grid_size, vision) for _ in range(n_envs)]
+
+            vec_env.reset()
+            for i, env in enumerate(envs):
+                env.reset()
+                env._food_cell = vec_env._to_cell(vec_env._food[i])
+
+            for _ in range(500):
+                actions = np.random.randint(len(SNAKE_ACTION_POOL), size=n_envs)
+                states, rewards, dones, scores = vec_env.step(actions)
+
+                for i, env in enumerate(envs):
+                    state, reward, done, score = env.step(SNAKE_ACTION_POOL[actions[i]])
+
+                    self.assertEqual(reward, rewards[i])
+                    self.assertEqual(done, dones[i])
+                    self.assertEqual(score, scores[i])
+
+                    if done:
+                        np.testing.assert_array_equal(state, vec_env.final_states[i])
+                        env.reset()
+                    elif reward != 10:
+                        np.testing.assert_array_equal(state, states[i])
+
+                    env._food_cell = vec_env._to_cell(vec_env._food[i])
+                    np.testing.assert_array_equal(env.get_state(), states[i])
+
+    def test_restore_snapshots(self):
+        np.random.seed(0)
+
+        envs = [SnakeEnv(7, 2) for _ in range(4)]
+        for env in envs:
+            env.reset()
+            for _ in range(10):
+                _, _, done, _ = env.step(SNAKE_ACTION_POOL[np.random.randint(len(SNAKE_ACTION_POOL))])
+                if done:
+                    env.reset()
+
+        vec_env = VecSnakeEnv(6, 7, 2)
+        vec_env.reset()
+        vec_env.restore_snapshots(np.stack([env.get_snapshot() for env in envs]), [5, 0, 3, 1])
+
+        np.testing.assert_array_equal(vec_env.get_state()[[5, 0, 3, 1]], [env.get_state() for env in envs])
+
+        snapshots = vec_env.get_snapshots([5, 0, 3, 1])
+        for env, snapshot in zip(envs, snapshots):
+            restored_env = SnakeEnv(7, 2)
+            restored_env.restore_snapshot(snapshot)
+            self.assertEqual(restored_env._snake.cells, env._snake.cells)
+            self.assertEqual(restored_env._food_cell, env._food_cell)
+            np.testing.assert_array_equal(restored_env._occupancy, env._occupancy)
+
+        # a single snapshot is restored into every given game, and the games keep running like the original
+        vec_env.restore_snapshots(envs[0].get_snapshot())
+        for _ in range(10):
+            actions = np.random.randint(len(SNAKE_ACTION_POOL), size=6)
+            states, rewards, dones, _ = vec_env.step(np.full(6, actions[0]))
+            state, reward, done, _ = envs[0].step(SNAKE_ACTION_POOL[actions[0]])
+
+            np.testing.assert_array_equal(rewards, reward)
+            if done or reward == 10:
+                break
+            np.testing.assert_array_equal(states, np.tile(state, (6, 1)))
+
+
+if __name__ == "__main__":
+    unittest.main()
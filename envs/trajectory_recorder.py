@@ -0,0 +1,227 @@
+import ast
+import inspect
+import json
+import os
+
+import numpy as np
+
+# record of path.index per finished episode: the end offset of its steps and the index of its start record
+EPISODE_INDEX_DTYPE = np.dtype([("end", np.int64), ("start", np.int64)])
+
+
+def trajectory_dtype(encoding_dtype: np.dtype):
+    """Returns the dtype of the steps of a trajectory file whose states are encodings of encoding_dtype"""
+    return np.dtype([("encoding", encoding_dtype), ("action", np.int16), ("reward", np.float32), ("done", np.bool_)])
+
+
+def env_metadata(env):
+    """Returns the class of env and the arguments it was constructed with as a dict that can be stored as JSON. The
+        arguments are the parameters of the constructor that env keeps as attributes of the same name, except the
+        seed, whose stream is stored with every episode"""
+    parameters = inspect.signature(type(env).__init__).parameters
+    args = {name: getattr(env, name) for name in parameters if name not in ("self", "seed") and hasattr(env, name)}
+
+    return {"env": type(env).__name__, "env_args": args, "frame_skip": getattr(env, "frame_skip", 1)}
+
+
+class TrajectoryRecorder:
+    """
+    The TrajectoryRecorder class appends the steps of the played episodes to an append-only file, which is mapped into
+    memory. Every step is a record of trajectory_dtype: the encoding of the state in which the action was taken, the
+    index of the action in the action pool of the environment, the reward and done. Encodings only hold the moving parts
+    of the state, e.g. the head of the snake or the ball and the paddles, see get_encoding of the environments, so
+    recording a step costs a fraction of the step itself.
+
+    The full state of the environment, its snapshot including the state of its random stream, is only recorded at the
+    start of every episode with start_episode. Restoring it and repeating the recorded actions replays the episode
+    exactly, including the random draws of the environment, see TrajectoryReader.restore.
+
+    A recording consists of four files:
+        path: The steps, a flat array of trajectory_dtype that can be opened with np.memmap.
+        path.starts: The snapshots at the start of the episodes, a flat array of the snapshot_dtype of the env.
+        path.index: A record of EPISODE_INDEX_DTYPE per finished episode, its end offset, episode i are the steps
+            ends[i - 1] to ends[i], and the index of its start in path.starts.
+        path.json: The dtypes of the steps and the starts, the class of the environment, the arguments it was
+            constructed with and its frame_skip, see env_metadata.
+
+    The file of the steps grows by chunk_size steps whenever it is full, so recording a step is a single write into
+    the mapped memory. When the recorder is closed, the file is truncated to the recorded steps. Recording into an
+    existing recording of the same environment continues it after its last finished episode, the steps of an episode
+    that was not finished are dropped.
+
+    Args:
+        path (str): The path of the file of the steps.
+        env: The recorded environment, it must provide snapshot_dtype and encoding_dtype.
+        chunk_size (int): By how many steps the file grows when it is full.
+    """
+
+    def __init__(self, path: str, env, chunk_size: int = 65536):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be greater than or equal to 1")
+
+        self.path = path
+        self.dtype = trajectory_dtype(env.encoding_dtype)
+        self.start_dtype = np.dtype(env.snapshot_dtype)
+        self.chunk_size = chunk_size
+
+        # the description of the dtypes is stored as a python literal like in the header of .npy files
+        metadata = {"dtype": repr(np.lib.format.dtype_to_descr(self.dtype)),
+                    "start_dtype": repr(np.lib.format.dtype_to_descr(self.start_dtype)), **env_metadata(env)}
+
+        if os.path.exists(path):
+            if _load_metadata(path) != json.loads(json.dumps(metadata)):
+                raise ValueError(f"{path} holds the steps of a different environment")
+            index = np.fromfile(path + ".index", dtype=EPISODE_INDEX_DTYPE)
+            self.n_steps = int(index["end"][-1]) if len(index) > 0 else 0
+            self.n_starts = int(index["start"][-1]) + 1 if len(index) > 0 else 0
+
+            # the start of the unfinished episode is dropped with its steps
+            os.truncate(path + ".starts", self.n_starts * self.start_dtype.itemsize)
+        else:
+            with open(path + ".json", "w") as file:
+                json.dump(metadata, file)
+            for suffix in ["", ".starts", ".index"]:
+                open(path + suffix, "wb").close()
+            self.n_steps = 0
+            self.n_starts = 0
+
+        self._starts_file = open(path + ".starts", "ab")
+        self._index_file = open(path + ".index", "ab")
+        self._episode_start = None
+        self._records = None
+        self._map(self.n_steps)
+
+    def start_episode(self, env):
+        """Records the snapshot of env at the start of an episode, which must be called after every reset"""
+        self._starts_file.write(env.get_snapshot().tobytes())
+
+        self._episode_start = self.n_starts
+        self.n_starts += 1
+
+    def record(self, encoding, action: int, reward: float, done: bool):
+        """Appends a step to the recording, encoding is the return value of get_encoding of the environment before the
+            step. The episode is finished if done"""
+        if self.n_steps == len(self._records):
+            self._map(self.n_steps + self.chunk_size)
+
+        n = self.n_steps
+        self._encodings[n] = encoding
+        self._actions[n] = action
+        self._rewards[n] = reward
+        self._dones[n] = done
+        self.n_steps = n + 1
+
+        if done:
+            if self._episode_start is None:
+                raise ValueError("start_episode must be called at the start of every episode")
+            self._index_file.write(np.array((self.n_steps, self._episode_start), dtype=EPISODE_INDEX_DTYPE).tobytes())
+            self._episode_start = None
+
+    def flush(self):
+        """Writes the recorded steps, episode starts and episode offsets to disk"""
+        if isinstance(self._records, np.memmap):
+            self._records.flush()
+        self._starts_file.flush()
+        self._index_file.flush()
+
+    def close(self):
+        """Writes the recording to disk and truncates the file of the steps to the recorded steps"""
+        if self._index_file.closed:
+            return
+
+        self._starts_file.close()
+        self._index_file.close()
+        self._unmap()
+        os.truncate(self.path, self.n_steps * self.dtype.itemsize)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _map(self, capacity: int):
+        """Resizes the file of the steps to capacity steps and maps it into memory"""
+        if self._records is not None:
+            self._unmap()
+        os.truncate(self.path, capacity * self.dtype.itemsize)
+
+        # an empty file can't be mapped
+        if capacity == 0:
+            self._records = np.zeros(0, dtype=self.dtype)
+        else:
+            self._records = np.memmap(self.path, dtype=self.dtype, mode="r+", shape=(capacity,))
+
+        # views of the fields, which are cheaper to write single elements into than the records
+        self._encodings = self._records["encoding"]
+        self._actions = self._records["action"]
+        self._rewards = self._records["reward"]
+        self._dones = self._records["done"]
+
+    def _unmap(self):
+        """Writes the mapped steps to disk and releases the mapping"""
+        if isinstance(self._records, np.memmap):
+            self._records.flush()
+        self._records = self._encodings = self._actions = self._rewards = self._dones = None
+
+
+class TrajectoryReader:
+    """
+    The TrajectoryReader class gives random access to the episodes of a recording of the TrajectoryRecorder class
+    without loading it. The steps and the starts stay in their files and are only read when they are accessed.
+
+    While the recording is still open, steps only belong to the recording if they belong to a finished episode.
+
+    Args:
+        path (str): The path of the file of the steps.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.metadata = _load_metadata(path)
+        self.dtype = _parse_dtype(self.metadata["dtype"])
+        self.start_dtype = _parse_dtype(self.metadata["start_dtype"])
+
+        self.steps = _open_records(path, self.dtype)
+        self.starts = _open_records(path + ".starts", self.start_dtype)
+
+        self.index = np.fromfile(path + ".index", dtype=EPISODE_INDEX_DTYPE)
+        self.episode_ends = self.index["end"]
+        self.episode_starts = np.concatenate([np.zeros(1, dtype=np.int64), self.episode_ends])[:-1]
+
+    def __len__(self):
+        return len(self.index)
+
+    def episode(self, i: int):
+        """Returns the steps of the i-th finished episode as a view into the file"""
+        return self.steps[self.episode_starts[i]:self.episode_ends[i]]
+
+    def episode_start(self, i: int):
+        """Returns the snapshot at the start of the i-th finished episode"""
+        return self.starts[self.index["start"][i]]
+
+    def restore(self, i: int, env):
+        """Restores env, an environment like the recorded one, to the start of the i-th finished episode, from which
+            the recorded actions replay the episode"""
+        env.restore_snapshot(self.episode_start(i))
+
+
+def _open_records(path: str, dtype: np.dtype):
+    """Maps the complete records of the flat array at path into memory"""
+    n_records = os.path.getsize(path) // dtype.itemsize
+
+    # an empty file can't be mapped
+    if n_records == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(n_records,))
+
+
+def _parse_dtype(descr: str):
+    """Returns the dtype of a description that was stored as a python literal"""
+    return np.lib.format.descr_to_dtype(ast.literal_eval(descr))
+
+
+def _load_metadata(path: str):
+    """Returns the dtypes and the environment of the recording at path"""
+    with open(path + ".json") as file:
+        return json.load(file)
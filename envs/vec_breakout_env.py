@@ -0,0 +1,214 @@
+import numpy as np
+
+from .action import Action
+from .breakout_env import BREAKOUT_ACTION_POOL, BREAKOUT_SNAPSHOT_DTYPE, HEIGHT, N_BLOCKS, N_LAYERS, SPACE_TOP, WIDTH
+from .random_stream import RandomStream
+
+
+class VecBreakoutEnv:
+    """
+    The VecBreakoutEnv class simulates a batch of independent Breakout games with NumPy arrays. It follows the rules of
+    the BreakoutEnv class and returns the same observations, but resolves the collisions of all games with masked
+    array operations in a single call.
+
+    Actions are integer indices into BREAKOUT_ACTION_POOL. Games that are done are reset automatically; their last
+    observation is kept in final_states.
+
+    Args:
+        n_envs (int): The number of games that are simulated at once.
+        paddle_size (int): The width of the paddle in cells.
+        seed: Optional seed of the RandomStream from which the random draws of all games are made, an int or a
+            np.random.SeedSequence.
+    """
+
+    def __init__(self, n_envs: int, paddle_size: int, seed=None):
+        if n_envs < 1:
+            raise ValueError("n_envs must be greater than or equal to 1")
+
+        self.n_envs = n_envs
+        self.paddle_size = paddle_size
+        self.rng = RandomStream(seed)
+
+        self.output_dim = len(BREAKOUT_ACTION_POOL)
+        self.state_dim = 4
+
+        self._paddle_moves = np.array([action.value[0] for action in BREAKOUT_ACTION_POOL])
+        self._all = np.arange(n_envs)
+
+        self.ball_pos = np.zeros((n_envs, 2), dtype=np.int64)
+        self.ball_vel = np.zeros((n_envs, 2), dtype=np.int64)
+        self.paddle_x_start = np.zeros(n_envs, dtype=np.int64)
+        self.blocks = np.zeros((n_envs, N_LAYERS, WIDTH), dtype=np.uint8)
+
+        self.block_hit_counter = np.zeros(n_envs, dtype=np.int64)
+        self.steps_without_reward_counter = np.zeros(n_envs, dtype=np.int64)
+
+        self.final_states = np.zeros((n_envs, self.state_dim), dtype=np.float32)
+
+    @property
+    def paddle_x_end(self):
+        return self.paddle_x_start + self.paddle_size - 1
+
+    def seed(self, seed=None):
+        """Replaces the random stream of the games by a new one that is seeded with seed"""
+        self.rng = RandomStream(seed)
+
+    def reset(self):
+        """Resets all games
+
+        Returns:
+            states (np.ndarray): The states of all games, shape (n_envs, 4).
+        """
+        self._reset_envs(self._all)
+
+        return self.get_state()
+
+    def step(self, actions: np.ndarray):
+        """Executes one action per game
+
+        Args:
+            actions (np.ndarray): Integer indices into BREAKOUT_ACTION_POOL, shape (n_envs,).
+
+        Returns:
+            states (np.ndarray): The new states, shape (n_envs, 4). Games that are done are already reset.
+            rewards (np.ndarray): The rewards for the executed actions.
+            dones (np.ndarray): dones[i] = True if game i ended with this step.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+
+        x_start = self.paddle_x_start + self._paddle_moves[actions]
+        np.clip(x_start, 0, WIDTH - self.paddle_size, out=self.paddle_x_start)
+        x_start = self.paddle_x_start
+        x_end = self.paddle_x_end
+
+        x, y = self.ball_pos[:, 0], self.ball_pos[:, 1]
+        vel_x, vel_y = self.ball_vel[:, 0], self.ball_vel[:, 1]
+
+        # left right walls
+        self._bounce_off_walls()
+
+        # roof
+        vel_y[y == 0] *= -1
+
+        # paddle
+        on_paddle = (y == HEIGHT - 2) & (x_start <= x) & (x <= x_end)
+        vel_x[on_paddle] = np.where(x[on_paddle] <= x_end[on_paddle] - self.paddle_size // 2, -1, 1)
+        vel_y[on_paddle] = -1
+
+        # blocks
+        in_layers, layer, x_ = self._next_block_cell()
+
+        straight = in_layers & (self.blocks[self._all, layer, x] == 0)
+        diagonal = in_layers & ~straight & (self.blocks[self._all, layer, x_] == 0)
+        hit = straight | diagonal
+
+        hit_envs = np.flatnonzero(hit)
+        self.blocks[hit_envs, layer[hit_envs], np.where(straight, x, x_)[hit_envs]] = 1
+        self.block_hit_counter += hit
+        vel_x[diagonal] *= -1
+        vel_y[hit] *= -1
+
+        rewards = hit.astype(np.float64)
+
+        # check for walls again
+        self._bounce_off_walls()
+
+        # only move when there's no block in the way
+        in_layers, layer, x_ = self._next_block_cell()
+        free = ~in_layers | (self.blocks[self._all, layer, x_] == 1)
+        self.ball_pos[free] += self.ball_vel[free]
+
+        lost = self.ball_pos[:, 1] == HEIGHT - 1
+        rewards[lost] -= 10
+
+        rewarded = rewards != 0
+        self.steps_without_reward_counter += 1
+        self.steps_without_reward_counter[rewarded] = 0
+
+        dones = lost | (self.block_hit_counter == N_BLOCKS) | (self.steps_without_reward_counter > 1000)
+
+        states = self.get_state()
+
+        finished = np.flatnonzero(dones)
+        if finished.size > 0:
+            self.final_states[finished] = states[finished]
+            self._reset_envs(finished)
+            states[finished] = self._observe(finished)
+
+        return states, rewards, dones, None
+
+    def get_state(self):
+        """Returns the states of all games, each equal to BreakoutEnv.get_state of the same game"""
+        return self._observe(self._all)
+
+    def get_snapshots(self, envs: np.ndarray = None):
+        """Returns the states of the given games, by default of all games, as records of BREAKOUT_SNAPSHOT_DTYPE. They
+            can be restored with restore_snapshots or BreakoutEnv.restore_snapshot"""
+        envs = self._all if envs is None else np.asarray(envs, dtype=np.int64)
+        snapshots = np.zeros(len(envs), dtype=BREAKOUT_SNAPSHOT_DTYPE)
+
+        snapshots["block_hit_counter"] = self.block_hit_counter[envs]
+        snapshots["steps_without_reward_counter"] = self.steps_without_reward_counter[envs]
+        snapshots["ball_pos"] = self.ball_pos[envs]
+        snapshots["ball_vel"] = self.ball_vel[envs]
+        snapshots["paddle_x_start"] = self.paddle_x_start[envs]
+        snapshots["blocks"] = self.blocks[envs]
+
+        # the games share one random stream, whose state is stored in every record
+        snapshots["rng"] = self.rng.get_state()
+
+        return snapshots
+
+    def restore_snapshots(self, snapshots: np.ndarray, envs: np.ndarray = None):
+        """Restores the given games, by default all games, from records of BREAKOUT_SNAPSHOT_DTYPE, e.g. from
+            BreakoutEnv.get_snapshot. A single record is restored into all of the given games. The random
+            stream, which all games share, is restored from the first record"""
+        envs = self._all if envs is None else np.asarray(envs, dtype=np.int64)
+        snapshots = np.broadcast_to(snapshots, envs.shape)
+        if len(envs) > 0:
+            self.rng.set_state(snapshots["rng"][0])
+
+        self.block_hit_counter[envs] = snapshots["block_hit_counter"]
+        self.steps_without_reward_counter[envs] = snapshots["steps_without_reward_counter"]
+        self.ball_pos[envs] = snapshots["ball_pos"]
+        self.ball_vel[envs] = snapshots["ball_vel"]
+        self.paddle_x_start[envs] = snapshots["paddle_x_start"]
+        self.blocks[envs] = snapshots["blocks"]
+
+    def _observe(self, envs: np.ndarray):
+        """Builds the states of the given games"""
+        states = np.empty((len(envs), self.state_dim), dtype=np.float32)
+        states[:, 0] = self.paddle_x_start[envs] / (WIDTH - 1)
+        states[:, 1] = self.paddle_x_end[envs] / (WIDTH - 1)
+        states[:, 2] = self.ball_pos[envs, 0] / (WIDTH - 1)
+        states[:, 3] = self.ball_pos[envs, 1] / (HEIGHT - 1)
+
+        return states
+
+    def _bounce_off_walls(self):
+        """Reverses the horizontal velocity of every ball that is about to leave the board sideways"""
+        x, vel_x = self.ball_pos[:, 0], self.ball_vel[:, 0]
+        vel_x[(x == 0) & (vel_x == -1) | (x == WIDTH - 1) & (vel_x == 1)] *= -1
+
+    def _next_block_cell(self):
+        """Returns which balls are about to enter the block layers, together with the layer and column of the cell they
+            are heading to. Layer and column are clipped so that they are valid indices for every game"""
+        next_pos = self.ball_pos + self.ball_vel
+        layer = next_pos[:, 1] - SPACE_TOP
+        in_layers = (layer >= 0) & (layer < N_LAYERS)
+
+        return in_layers, np.clip(layer, 0, N_LAYERS - 1), np.clip(next_pos[:, 0], 0, WIDTH - 1)
+
+    def _reset_envs(self, envs: np.ndarray):
+        """Puts fresh blocks, a fresh ball and a centered paddle into the given games"""
+        self.blocks[envs] = 0
+        self.paddle_x_start[envs] = WIDTH // 2 - self.paddle_size // 2
+
+        generator = self.rng.generator
+        self.ball_pos[envs, 0] = generator.integers(0, WIDTH, size=len(envs))
+        self.ball_pos[envs, 1] = SPACE_TOP + N_LAYERS + 1
+        self.ball_vel[envs, 0] = generator.choice([Action.LEFT.value[0], Action.RIGHT.value[0]], size=len(envs))
+        self.ball_vel[envs, 1] = 1
+
+        self.block_hit_counter[envs] = 0
+        self.steps_without_reward_counter[envs] = 0
@@ -0,0 +1,150 @@
+import numpy as np
+
+from .pong_env import PONG_ACTION_POOL, PONG_SNAPSHOT_DTYPE
+from .random_stream import RandomStream
+
+
+class VecPongEnv:
+    """
+    The VecPongEnv class simulates a batch of independent Pong games with NumPy arrays. It follows the rules of the
+    PongEnv class and returns the same observations, but moves the paddles and balls of all games with array operations
+    in a single call instead of allocating Ball and Paddle objects.
+
+    Actions are integer indices into PONG_ACTION_POOL. Games that are done are reset automatically; their last
+    observation is kept in final_states.
+
+    Args:
+        n_envs (int): The number of games that are simulated at once.
+        seed: Optional seed of the RandomStream from which the random draws of all games are made, an int or a
+            np.random.SeedSequence.
+    """
+
+    def __init__(self, n_envs: int, seed=None):
+        if n_envs < 1:
+            raise ValueError("n_envs must be greater than or equal to 1")
+
+        self.n_envs = n_envs
+        self.rng = RandomStream(seed)
+
+        self.output_dim = len(PONG_ACTION_POOL)
+        self.state_dim = 4
+
+        # vertical paddle movement of the left and the right paddle for every action index
+        self._paddle_moves = np.array([[left.value[1], right.value[1]] for left, right in PONG_ACTION_POOL])
+        self._all = np.arange(n_envs)
+
+        self.ball_pos = np.zeros((n_envs, 2), dtype=np.int64)
+        self.ball_vel = np.zeros((n_envs, 2), dtype=np.int64)
+        self.paddle_pos = np.zeros((n_envs, 2), dtype=np.int64)
+
+        self.final_states = np.zeros((n_envs, self.state_dim), dtype=np.float32)
+
+    def seed(self, seed=None):
+        """Replaces the random stream of the games by a new one that is seeded with seed"""
+        self.rng = RandomStream(seed)
+
+    def reset(self):
+        """Resets all games
+
+        Returns:
+            states (np.ndarray): The states of all games, shape (n_envs, 4).
+        """
+        self._reset_envs(self._all)
+
+        return self.get_state()
+
+    def step(self, actions: np.ndarray):
+        """Executes one action per game
+
+        Args:
+            actions (np.ndarray): Integer indices into PONG_ACTION_POOL, shape (n_envs,).
+
+        Returns:
+            states (np.ndarray): The new states, shape (n_envs, 4). Games that are done are already reset.
+            rewards (np.ndarray): The rewards for the executed actions.
+            dones (np.ndarray): dones[i] = True if game i ended with this step.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+
+        self.paddle_pos += self._paddle_moves[actions]
+        np.clip(self.paddle_pos, 1, 7, out=self.paddle_pos)
+
+        x, y = self.ball_pos[:, 0], self.ball_pos[:, 1]
+        vel_x, vel_y = self.ball_vel[:, 0], self.ball_vel[:, 1]
+
+        vel_y[(y == 0) & (vel_y == -1) | (y == 8) & (vel_y == 1)] *= -1
+
+        # the ball is in front of the left paddle in column 2 and in front of the right paddle in column 13
+        at_left, at_right = x == 2, x == 13
+        paddle = np.where(at_left, self.paddle_pos[:, 0], self.paddle_pos[:, 1])
+        hit = (at_left | at_right) & (np.abs(y - paddle) <= 1)
+        vel_x[hit] *= -1
+
+        self.ball_pos += self.ball_vel
+
+        dones = (self.ball_pos[:, 0] == 0) | (self.ball_pos[:, 0] == 15)
+        rewards = 10.0 * hit - 10.0 * dones
+
+        states = self.get_state()
+
+        finished = np.flatnonzero(dones)
+        if finished.size > 0:
+            self.final_states[finished] = states[finished]
+            self._reset_envs(finished)
+            states[finished] = self._observe(finished)
+
+        return states, rewards, dones, None
+
+    def get_state(self):
+        """Returns the states of all games, each equal to PongEnv.get_state of the same game"""
+        return self._observe(self._all)
+
+    def get_snapshots(self, envs: np.ndarray = None):
+        """Returns the states of the given games, by default of all games, as records of PONG_SNAPSHOT_DTYPE. They can
+            be restored with restore_snapshots or PongEnv.restore_snapshot"""
+        envs = self._all if envs is None else np.asarray(envs, dtype=np.int64)
+        snapshots = np.zeros(len(envs), dtype=PONG_SNAPSHOT_DTYPE)
+
+        snapshots["ball_pos"] = self.ball_pos[envs]
+        snapshots["ball_vel"] = self.ball_vel[envs]
+        snapshots["paddle_pos"] = self.paddle_pos[envs]
+
+        # the games share one random stream, whose state is stored in every record
+        snapshots["rng"] = self.rng.get_state()
+
+        return snapshots
+
+    def restore_snapshots(self, snapshots: np.ndarray, envs: np.ndarray = None):
+        """Restores the given games, by default all games, from records of PONG_SNAPSHOT_DTYPE, e.g. from
+            PongEnv.get_snapshot. A single record is restored into all of the given games. The random
+            stream, which all games share, is restored from the first record"""
+        envs = self._all if envs is None else np.asarray(envs, dtype=np.int64)
+        snapshots = np.broadcast_to(snapshots, envs.shape)
+        if len(envs) > 0:
+            self.rng.set_state(snapshots["rng"][0])
+
+        self.ball_pos[envs] = snapshots["ball_pos"]
+        self.ball_vel[envs] = snapshots["ball_vel"]
+        self.paddle_pos[envs] = snapshots["paddle_pos"]
+
+    def _observe(self, envs: np.ndarray):
+        """Builds the states of the given games"""
+        states = np.empty((len(envs), self.state_dim), dtype=np.float32)
+        states[:, 0] = self.paddle_pos[envs, 0] / 9
+        states[:, 1] = self.ball_pos[envs, 0] / 16
+        states[:, 2] = self.ball_pos[envs, 1] / 9
+        states[:, 3] = self.paddle_pos[envs, 1] / 9
+
+        return states
+
+    def _reset_envs(self, envs: np.ndarray):
+        """Puts a fresh ball and centered paddles into the given games"""
+        n = len(envs)
+
+        generator = self.rng.generator
+        self.ball_pos[envs, 0] = generator.integers(3, 13, size=n)
+        self.ball_pos[envs, 1] = generator.integers(0, 9, size=n)
+        self.ball_vel[envs, 0] = np.where(self.ball_pos[envs, 0] < 8, 1, -1)
+        self.ball_vel[envs, 1] = generator.choice([-1, 1], size=n)
+
+        self.paddle_pos[envs] = 4
@@ -0,0 +1,254 @@
+import numpy as np
+
+from .action import Action
+from .random_stream import RandomStream
+from .snake_env import SNAKE_ACTION_POOL, snake_snapshot_dtype
+
+
+class VecSnakeEnv:
+    """
+    The VecSnakeEnv class simulates a batch of independent snake games with NumPy arrays. It follows the rules of the
+    SnakeEnv class and returns the same observations, but steps all games with a single call.
+
+    Each game keeps a wall-padded occupancy grid and the snake body as a ring buffer of flat indices into that grid.
+    Actions are integer indices into SNAKE_ACTION_POOL. Games that are done are reset automatically; their last
+    observation is kept in final_states.
+
+    Args:
+        n_envs (int): The number of games that are simulated at once.
+        grid_size (int): The dimensions of each game: Env dimension = grid_size x grid_size. Grid size must be odd and
+            greater than or equal to 3.
+        vision (int): The snake's vision aka. the area around the head of the snake which state is returned as input to
+            the RL agent. Snake size must be greater than or equal to 1.
+        seed: Optional seed of the RandomStream from which the random draws of all games are made, an int or a
+            np.random.SeedSequence.
+    """
+
+    def __init__(self, n_envs: int, grid_size: int = 7, vision: int = 2, seed=None):
+        if n_envs < 1:
+            raise ValueError("n_envs must be greater than or equal to 1")
+        if grid_size % 2 == 0 or grid_size < 3:
+            raise ValueError("grid_size must be odd and greater than or equal to 3")
+        if vision < 0:
+            raise ValueError("vision must be greater than or equal to 1")
+
+        self.n_envs = n_envs
+        self.grid_size = grid_size
+        self.vision = vision
+        self.rng = RandomStream(seed)
+
+        self.output_dim = len(SNAKE_ACTION_POOL)
+        self.state_dim = 2 + (2 * vision + 1) ** 2
+        self.snapshot_dtype = snake_snapshot_dtype(grid_size)
+
+        # the padding must hold the whole vision window and at least one wall cell
+        self._pad = max(vision, 1)
+        self._width = grid_size + 2 * self._pad
+        self._capacity = grid_size * grid_size
+
+        self._moves = np.array([action.value[0] + action.value[1] * self._width for action in SNAKE_ACTION_POOL])
+
+        dy, dx = np.mgrid[-vision:vision + 1, -vision:vision + 1]
+        self._window = (dy * self._width + dx).ravel()
+
+        walls = np.ones((self._width, self._width), dtype=np.uint8)
+        walls[self._pad:-self._pad, self._pad:-self._pad] = 0
+        self._walls = walls.ravel()
+
+        ys, xs = np.mgrid[0:grid_size, 0:grid_size]
+        self._interior = ((ys + self._pad) * self._width + xs + self._pad).ravel()
+
+        center = grid_size // 2 + self._pad
+        self._spawn_head = center * self._width + center
+        self._spawn_tail = self._spawn_head + self._width
+
+        self._all = np.arange(n_envs)
+
+        self._grid = np.empty((n_envs, self._width * self._width), dtype=np.uint8)
+        self._body = np.zeros((n_envs, self._capacity), dtype=np.int64)
+        self._head_ptr = np.zeros(n_envs, dtype=np.int64)
+        self._length = np.zeros(n_envs, dtype=np.int64)
+        self._last_action = np.zeros(n_envs, dtype=np.int64)
+        self._food = np.zeros(n_envs, dtype=np.int64)
+        self._score = np.zeros(n_envs, dtype=np.int64)
+
+        self.final_states = np.zeros((n_envs, self.state_dim), dtype=np.float32)
+
+    def seed(self, seed=None):
+        """Replaces the random stream of the games by a new one that is seeded with seed"""
+        self.rng = RandomStream(seed)
+
+    def reset(self):
+        """Resets all games
+
+        Returns:
+            states (np.ndarray): The states of all games, shape (n_envs, state_dim).
+        """
+        self._reset_envs(self._all)
+
+        return self.get_state()
+
+    def step(self, actions: np.ndarray):
+        """Executes one action per game
+
+        Args:
+            actions (np.ndarray): Integer indices into SNAKE_ACTION_POOL, shape (n_envs,).
+
+        Returns:
+            states (np.ndarray): The new states, shape (n_envs, state_dim). Games that are done are already reset.
+            rewards (np.ndarray): The rewards for the executed actions.
+            dones (np.ndarray): dones[i] = True if game i ended with this step.
+            scores (np.ndarray): How many pieces of food each snake ate in its current episode.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+
+        # SNAKE_ACTION_POOL is ordered clockwise, so the opposite action is two indices away. A 180 degree turn falls
+        # back to the last action, exactly like Snake.next_cell
+        turn_180 = actions == (self._last_action + 2) % 4
+        actions = np.where(turn_180, self._last_action, actions)
+
+        heads = self._body[self._all, self._head_ptr]
+        next_cells = heads + self._moves[actions]
+
+        hit = self._grid[self._all, next_cells] == 1
+        alive = ~hit
+        eat = alive & (next_cells == self._food)
+        move = alive & ~eat
+
+        rewards = np.where(hit, -1.0, np.where(eat, 10.0, -0.1))
+        dones = hit.copy()
+
+        # free the tail cell of every snake that moves without growing
+        movers = np.flatnonzero(move)
+        tail_ptr = (self._head_ptr[movers] - self._length[movers] + 1) % self._capacity
+        self._grid[movers, self._body[movers, tail_ptr]] = 0
+
+        survivors = np.flatnonzero(alive)
+        self._head_ptr[survivors] = (self._head_ptr[survivors] + 1) % self._capacity
+        self._body[survivors, self._head_ptr[survivors]] = next_cells[survivors]
+        self._grid[survivors, next_cells[survivors]] = 1
+        self._last_action[survivors] = actions[survivors]
+
+        eaters = np.flatnonzero(eat)
+        self._length[eaters] += 1
+        self._score[eaters] += 1
+
+        full = eaters[~self._spawn_food(eaters)]
+        rewards[full] = 100.0
+        dones[full] = True
+
+        scores = self._score.copy()
+        states = self.get_state()
+
+        finished = np.flatnonzero(dones)
+        if finished.size > 0:
+            self.final_states[finished] = states[finished]
+            self._reset_envs(finished)
+            states[finished] = self._observe(finished)
+
+        return states, rewards, dones, scores
+
+    def get_state(self):
+        """Returns the states of all games, each equal to SnakeEnv.get_state of the same game"""
+        return self._observe(self._all)
+
+    def get_snapshots(self, envs: np.ndarray = None):
+        """Returns the states of the given games, by default of all games, as records of snapshot_dtype. They can be
+            restored with restore_snapshots or SnakeEnv.restore_snapshot"""
+        envs = self._all if envs is None else np.asarray(envs, dtype=np.int64)
+        snapshots = np.zeros(len(envs), dtype=self.snapshot_dtype)
+
+        snapshots["score"] = self._score[envs]
+        snapshots["length"] = self._length[envs]
+        snapshots["food"] = self._to_grid_index(self._food[envs])
+        snapshots["last_action"] = self._last_action[envs]
+
+        # the body starts with the head, which is stored at the head pointer of the ring buffer
+        offsets = np.arange(self._capacity)
+        body = self._body[envs[:, None], (self._head_ptr[envs, None] - offsets) % self._capacity]
+        snapshots["body"] = np.where(offsets < self._length[envs, None], self._to_grid_index(body), 0)
+
+        # the free cells of SnakeEnv are stored in front of the occupied cells
+        occupied = self._grid[envs[:, None], self._interior]
+        snapshots["free_cells"] = np.argsort(occupied, axis=1, kind="stable")
+        snapshots["n_free"] = (occupied == 0).sum(axis=1)
+
+        # the games share one random stream, whose state is stored in every record
+        snapshots["rng"] = self.rng.get_state()
+
+        return snapshots
+
+    def restore_snapshots(self, snapshots: np.ndarray, envs: np.ndarray = None):
+        """Restores the given games, by default all games, from records of snapshot_dtype, e.g. from
+            SnakeEnv.get_snapshot. A single record is restored into all of the given games. The random
+            stream, which all games share, is restored from the first record"""
+        envs = self._all if envs is None else np.asarray(envs, dtype=np.int64)
+        snapshots = np.broadcast_to(snapshots, envs.shape)
+        if len(envs) > 0:
+            self.rng.set_state(snapshots["rng"][0])
+        length = snapshots["length"].astype(np.int64)
+
+        # the body is stored reversed, so that the head is at the end of the ring buffer and the tail precedes it
+        self._body[envs] = self._interior[snapshots["body"][:, ::-1]]
+        self._head_ptr[envs] = self._capacity - 1
+        self._length[envs] = length
+
+        self._grid[envs] = self._walls
+        rows, offsets = np.nonzero(np.arange(self._capacity) >= self._capacity - length[:, None])
+        self._grid[envs[rows], self._body[envs[rows], offsets]] = 1
+
+        self._food[envs] = self._interior[snapshots["food"]]
+        self._last_action[envs] = snapshots["last_action"]
+        self._score[envs] = snapshots["score"]
+
+    def _observe(self, envs: np.ndarray):
+        """Builds the states of the given games"""
+        heads = self._body[envs, self._head_ptr[envs]]
+        food = self._food[envs]
+
+        states = np.empty((len(envs), self.state_dim), dtype=np.float32)
+        states[:, 0] = (heads % self._width - food % self._width) / self.grid_size
+        states[:, 1] = (heads // self._width - food // self._width) / self.grid_size
+        states[:, 2:] = self._grid[envs[:, None], heads[:, None] + self._window]
+
+        return states
+
+    def _reset_envs(self, envs: np.ndarray):
+        """Puts a fresh snake and food into the given games"""
+        self._grid[envs] = self._walls
+        self._body[envs, 0] = self._spawn_tail
+        self._body[envs, 1] = self._spawn_head
+        self._grid[envs, self._spawn_tail] = 1
+        self._grid[envs, self._spawn_head] = 1
+
+        self._head_ptr[envs] = 1
+        self._length[envs] = 2
+        self._last_action[envs] = SNAKE_ACTION_POOL.index(Action.UP)
+        self._score[envs] = 0
+
+        self._spawn_food(envs)
+
+    def _spawn_food(self, envs: np.ndarray):
+        """Spawns food on a random free cell of each given game. Returns a mask that is False for the games in which
+            no free cell was left"""
+        if envs.size == 0:
+            return np.ones(0, dtype=bool)
+
+        free = self._grid[envs[:, None], self._interior] == 0
+        n_free = free.sum(axis=1)
+        spawned = n_free > 0
+
+        picks = (self.rng.generator.random(len(envs)) * n_free).astype(np.int64)
+        cells = (np.cumsum(free, axis=1) > picks[:, None]).argmax(axis=1)
+        self._food[envs[spawned]] = self._interior[cells[spawned]]
+
+        return spawned
+
+    def _to_grid_index(self, flat_index):
+        """Converts a flat index of the padded grid into the flat index y * grid_size + x used by the snapshots"""
+        x, y = self._to_cell(flat_index)
+        return y * self.grid_size + x
+
+    def _to_cell(self, flat_index):
+        """Converts a flat index of the padded grid into the (x, y) coordinates used by SnakeEnv"""
+        return flat_index % self._width - self._pad, flat_index // self._width - self._pad
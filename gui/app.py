@@ -1,7 +1,7 @@
 import numpy as np
 
 from PyQt5.QtCore import pyqtSlot, QThreadPool
-from PyQt5.QtGui import QPixmap, QImage
+from PyQt5.QtGui import QPixmap, QImage, QPainter
 from PyQt5.QtWidgets import QMainWindow, QGraphicsScene
 
 from envs.breakout_env import BreakoutEnv
@@ -11,7 +11,8 @@ from envs.interface import EnvInterface
 
 from .utils import RenderMode
 from .utils import get_dddqn_config, get_ddpg_config, get_sac_config
-from .utils import get_snake_env_config
+from .utils import get_snake_env_config, SNAKE_GRID_SIZES
+from .utils import get_trajectory_path, get_pixel_observations
 from rl_thread import RLThread
 
 from gui.mainwindow import Ui_GUI
@@ -19,6 +20,9 @@ from gui.mainwindow import Ui_GUI
 ENV_NAME_TO_OBJECT = {"Snake": SnakeEnv, "Breakout": BreakoutEnv, "Pong": PongEnv}
 ENV_NAME_TO_ZOOM = {"SnakeEnv": 34, "BreakoutEnv": 12, "PongEnv": 32}
 
+# the Snake canvas keeps the size of the largest grid that is displayed with the default zoom
+MAX_SNAKE_CANVAS_SIZE = 9 * ENV_NAME_TO_ZOOM["SnakeEnv"]
+
 
 class MainWindow(QMainWindow):
     """The MainWindow class represents the graphical GUI and contains its contents"""
@@ -32,6 +36,15 @@ class MainWindow(QMainWindow):
 
         self.render_mode = RenderMode.SLOW_RENDER
 
+        # the environment that is displayed, the zoom it is displayed with and its pixmap, which is repainted partially
+        self._displayed_env = None
+        self._displayed_zoom = None
+        self._env_pixmap = None
+        self._env_pixmap_item = None
+
+        for grid_size in SNAKE_GRID_SIZES[self.ui.gridSizeComboBox.count():]:
+            self.ui.gridSizeComboBox.addItem(f"{grid_size}x{grid_size}")
+
         self.env = EnvInterface()
         self.env_changed(self.ui.envComboBox.currentText())
 
@@ -50,23 +63,28 @@ class MainWindow(QMainWindow):
     @pyqtSlot(int)
     def update_snake_vision_selections(self, index):
         self.ui.snakeVisionComboBox.clear()
-        for i in range(index + 2):
-            self.ui.snakeVisionComboBox.addItem(["1", "2", "3", "4"][i])
+        for i in range(SNAKE_GRID_SIZES[index] // 2):
+            self.ui.snakeVisionComboBox.addItem(str(i + 1))
 
     @pyqtSlot()
     def snake_env_config_changed(self):
         config = get_snake_env_config(self)
-        self.env = SnakeEnv(*config)
+        self.env = SnakeEnv(*config, frame_skip=self.ui.frameSkipSpinBox.value())
         self.env.reset()
         self._update_env_canvas()
 
     @pyqtSlot()
     def breakout_env_config_changed(self):
         paddle_size = self.ui.paddleSizeSpinBox.value()
-        self.env = BreakoutEnv(paddle_size)
+        self.env = BreakoutEnv(paddle_size, frame_skip=self.ui.frameSkipSpinBox.value())
         self.env.reset()
         self._update_env_canvas()
 
+    @pyqtSlot()
+    def frame_skip_changed(self):
+        self.init_env(self.ui.envComboBox.currentText())
+        self._update_env_canvas()
+
     @pyqtSlot()
     def start_training(self):
         self._gui_training_mode(True)
@@ -83,7 +101,7 @@ class MainWindow(QMainWindow):
         elif alg == "SAC":
             alg_config = get_sac_config(self)
 
-        self.rl_thread = RLThread(self, alg, alg_config)
+        self.rl_thread = RLThread(self, alg, alg_config, get_trajectory_path(self), get_pixel_observations(self))
         self.rl_thread.signals.update_env.connect(self._update_env_canvas)
         self.rl_thread.signals.update_learning_graph.connect(self._update_learning_curve_canvas)
 
@@ -125,14 +143,16 @@ class MainWindow(QMainWindow):
         Args:
             name (str): The name of the environment"""
 
+        frame_skip = self.ui.frameSkipSpinBox.value()
+
         if name == "Snake":
             config = get_snake_env_config(self)
-            self.env = SnakeEnv(*config)
+            self.env = SnakeEnv(*config, frame_skip=frame_skip)
         elif name == "Breakout":
             paddle_size = self.ui.paddleSizeSpinBox.value()
-            self.env = BreakoutEnv(paddle_size)
+            self.env = BreakoutEnv(paddle_size, frame_skip=frame_skip)
         elif name == "Pong":
-            self.env = PongEnv()
+            self.env = PongEnv(frame_skip=frame_skip)
 
         self.env.reset()
 
@@ -143,6 +163,9 @@ class MainWindow(QMainWindow):
             on (bool): If True: training mode is enabled, if False: training mode is disabled"""
 
         self.ui.envComboBox.setDisabled(on)
+        self.ui.frameSkipSpinBox.setDisabled(on)
+        self.ui.trajectoryPathLineEdit.setDisabled(on)
+        self.ui.pixelObservationsCheckBox.setDisabled(on)
         self.ui.envStackedWidget.setDisabled(on)
         self.ui.algComboBox.setDisabled(on)
         self.ui.algStackedWidget.setDisabled(on)
@@ -167,18 +190,44 @@ class MainWindow(QMainWindow):
         self.ui.mplWidget.canvas.ax.plot(x, running_avg, '#3399FF')
         self.ui.mplWidget.canvas.draw()
 
-    def _update_env_canvas(self):
-        """Updates the display of the environment"""
+    def _update_env_canvas(self, rendered=None):
+        """Updates the display of the environment. Only the regions that changed since the last update are repainted
+
+        Args:
+            rendered (tuple): The screenshot and its changed regions if the environment was rendered by the training
+                thread, which steps it. By default the environment is rendered here"""
         zoom = ENV_NAME_TO_ZOOM[self.env.__class__.__name__]
+        if isinstance(self.env, SnakeEnv):
+            zoom = max(1, min(zoom, MAX_SNAKE_CANVAS_SIZE // self.env.grid_size))
+
+        if rendered is None:
+            screenshot = self.env.screenshot()
+            regions = self.env.get_changed_regions()
+        else:
+            screenshot, regions = rendered
+
+        if self._displayed_env is not self.env or self._displayed_zoom != zoom:
+            img = screenshot.repeat(zoom, axis=0).repeat(zoom, axis=1)
+
+            q_img = QImage(img, img.shape[1], img.shape[0], img.shape[1] * 3, QImage.Format_RGB888)
+            self._env_pixmap = QPixmap.fromImage(q_img)
+
+            scene = QGraphicsScene(self)
+            self._env_pixmap_item = scene.addPixmap(self._env_pixmap)
+            self.ui.envView.setScene(scene)
 
-        img = self.env.screenshot().repeat(zoom, axis=0).repeat(zoom, axis=1)
+            self._displayed_env = self.env
+            self._displayed_zoom = zoom
+        else:
+            painter = QPainter(self._env_pixmap)
+            for y_start, y_end, x_start, x_end in regions:
+                img = screenshot[y_start:y_end, x_start:x_end].repeat(zoom, axis=0).repeat(zoom, axis=1)
 
-        q_img = QImage(img, img.shape[1], img.shape[0], img.shape[1] * 3, QImage.Format_RGB888)
-        q_pix = QPixmap.fromImage(q_img)
+                q_img = QImage(img, img.shape[1], img.shape[0], img.shape[1] * 3, QImage.Format_RGB888)
+                painter.drawImage(x_start * zoom, y_start * zoom, q_img)
+            painter.end()
 
-        scene = QGraphicsScene(self)
-        scene.addPixmap(q_pix)
-        self.ui.envView.setScene(scene)
+            self._env_pixmap_item.setPixmap(self._env_pixmap)
 
     def _setup_triggers(self):
         """Connects the GUI elements to the corresponding methods"""
@@ -187,6 +236,7 @@ class MainWindow(QMainWindow):
         self.ui.gridSizeComboBox.currentIndexChanged.connect(self.snake_env_config_changed)
         self.ui.snakeVisionComboBox.currentIndexChanged.connect(self.snake_env_config_changed)
         self.ui.paddleSizeSpinBox.valueChanged.connect(self.breakout_env_config_changed)
+        self.ui.frameSkipSpinBox.valueChanged.connect(self.frame_skip_changed)
         self.ui.algComboBox.currentTextChanged.connect(self.alg_changed)
         self.ui.startButton.clicked.connect(self.start_training)
         self.ui.pauseButton.clicked.connect(self.pause_training)
@@ -112,6 +112,27 @@ class Ui_GUI(object):
         self.envComboBox.addItem("")
         self.envComboBox.addItem("")
         self.configFormLayout.setWidget(0, QtWidgets.QFormLayout.FieldRole, self.envComboBox)
+        self.frameSkipLabel = QtWidgets.QLabel(self.configGroupBox)
+        self.frameSkipLabel.setObjectName("frameSkipLabel")
+        self.configFormLayout.setWidget(1, QtWidgets.QFormLayout.LabelRole, self.frameSkipLabel)
+        self.frameSkipSpinBox = QtWidgets.QSpinBox(self.configGroupBox)
+        self.frameSkipSpinBox.setMinimum(1)
+        self.frameSkipSpinBox.setMaximum(16)
+        self.frameSkipSpinBox.setProperty("value", 1)
+        self.frameSkipSpinBox.setObjectName("frameSkipSpinBox")
+        self.configFormLayout.setWidget(1, QtWidgets.QFormLayout.FieldRole, self.frameSkipSpinBox)
+        self.trajectoryPathLabel = QtWidgets.QLabel(self.configGroupBox)
+        self.trajectoryPathLabel.setObjectName("trajectoryPathLabel")
+        self.configFormLayout.setWidget(2, QtWidgets.QFormLayout.LabelRole, self.trajectoryPathLabel)
+        self.trajectoryPathLineEdit = QtWidgets.QLineEdit(self.configGroupBox)
+        self.trajectoryPathLineEdit.setObjectName("trajectoryPathLineEdit")
+        self.configFormLayout.setWidget(2, QtWidgets.QFormLayout.FieldRole, self.trajectoryPathLineEdit)
+        self.pixelObservationsLabel = QtWidgets.QLabel(self.configGroupBox)
+        self.pixelObservationsLabel.setObjectName("pixelObservationsLabel")
+        self.configFormLayout.setWidget(3, QtWidgets.QFormLayout.LabelRole, self.pixelObservationsLabel)
+        self.pixelObservationsCheckBox = QtWidgets.QCheckBox(self.configGroupBox)
+        self.pixelObservationsCheckBox.setObjectName("pixelObservationsCheckBox")
+        self.configFormLayout.setWidget(3, QtWidgets.QFormLayout.FieldRole, self.pixelObservationsCheckBox)
         self.verticalLayout.addLayout(self.configFormLayout)
         self.envStackedWidget = QtWidgets.QStackedWidget(self.configGroupBox)
         self.envStackedWidget.setObjectName("envStackedWidget")
@@ -501,6 +522,10 @@ class Ui_GUI(object):
         self.envComboBox.setItemText(0, _translate("GUI", "Snake"))
         self.envComboBox.setItemText(1, _translate("GUI", "Breakout"))
         self.envComboBox.setItemText(2, _translate("GUI", "Pong"))
+        self.frameSkipLabel.setText(_translate("GUI", "Frame Skip: "))
+        self.trajectoryPathLabel.setText(_translate("GUI", "Record Trajectories: "))
+        self.trajectoryPathLineEdit.setPlaceholderText(_translate("GUI", "File path, empty to not record"))
+        self.pixelObservationsLabel.setText(_translate("GUI", "Pixel Observations: "))
         self.label.setText(_translate("GUI", "Grid Size: "))
         self.gridSizeComboBox.setItemText(0, _translate("GUI", "5x5"))
         self.gridSizeComboBox.setItemText(1, _translate("GUI", "7x7"))
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+
+from envs.trajectory_recorder import TrajectoryReader
+from gui.app import MainWindow
+from gui.utils import RenderMode, get_dddqn_config
+from rl_algorithms.dddqn import DuelingDDQNAgent
+from rl_thread import RLThread, ALG_NAME_TO_OBJECT
+
+
+class TestMainWindow(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # the window is built without a display
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "trajectories")
+        self.window = MainWindow()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_start_training(self):
+        # the training is not started, only the thread that would run it is checked
+        with mock.patch.object(self.window.thread_pool, "start") as start:
+            self.window.start_training()
+            self.assertIsNone(self.window.rl_thread.trajectory_path)
+            self.window.stop_training()
+
+            self.window.ui.trajectoryPathLineEdit.setText(self.path)
+            self.window.start_training()
+            self.assertEqual(self.window.rl_thread.trajectory_path, self.path)
+            self.assertFalse(self.window.ui.trajectoryPathLineEdit.isEnabled())
+            self.window.stop_training()
+
+            self.window.ui.pixelObservationsCheckBox.setChecked(True)
+            self.window.start_training()
+            self.assertTrue(self.window.rl_thread.pixel_observations)
+            self.window.stop_training()
+
+        self.assertEqual(start.call_count, 3)
+        self.assertTrue(self.window.ui.trajectoryPathLineEdit.isEnabled())
+
+    def test_record_training(self):
+        self.window.render_mode = RenderMode.NO_RENDER
+        rl_thread = RLThread(self.window, "DDDQN", get_dddqn_config(self.window), self.path)
+
+        thread = threading.Thread(target=rl_thread.run)
+        thread.start()
+        deadline = time.time() + 60
+        while len(rl_thread.score_history) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        rl_thread.stop = True
+        thread.join()
+
+        # every finished episode of the training is recorded with its rewards
+        reader = TrajectoryReader(self.path)
+        self.assertGreaterEqual(len(reader), 2)
+        for i in range(len(reader)):
+            self.assertAlmostEqual(float(np.sum(reader.episode(i)["reward"])), rl_thread.score_history[i], places=4)
+
+    def test_pixel_training(self):
+        self.window.render_mode = RenderMode.NO_RENDER
+        rl_thread = RLThread(self.window, "DDDQN", get_dddqn_config(self.window), pixel_observations=True)
+        agent = mock.Mock(wraps=DuelingDDQNAgent)
+
+        thread = threading.Thread(target=rl_thread.run)
+        with mock.patch.dict(ALG_NAME_TO_OBJECT, {"DDDQN": agent}):
+            thread.start()
+            deadline = time.time() + 60
+            while len(rl_thread.score_history) < 1 and time.time() < deadline:
+                time.sleep(0.01)
+            rl_thread.stop = True
+            thread.join()
+
+        # the agent is built for the stacked frames of the screenshots, which the replay memory shares
+        self.assertGreaterEqual(len(rl_thread.score_history), 1)
+        args, kwargs = agent.call_args
+        grid_size = self.window.env.grid_size
+        self.assertEqual(args[-2], (4, grid_size, grid_size))
+        self.assertTrue(kwargs["share_observations"])
+
+    def test_render_in_training_thread(self):
+        for pixel_observations in [False, True]:
+            self.window.render_mode = RenderMode.FAST_RENDER
+            rl_thread = RLThread(self.window, "DDDQN", get_dddqn_config(self.window),
+                                 pixel_observations=pixel_observations)
+            rendered = []
+            rl_thread.signals.update_env.connect(rendered.append)
+            rl_thread.signals.update_env.connect(self.window._update_env_canvas)
+
+            thread = threading.Thread(target=rl_thread.run)
+            thread.start()
+            deadline = time.time() + 60
+            while len(rendered) < 10 and time.time() < deadline:
+                time.sleep(0.01)
+                self.app.processEvents()
+            rl_thread.stop = True
+            thread.join()
+            self.app.processEvents()
+
+            # the training thread renders the frames, repainting the changed regions of the previous frame gives them
+            self.assertGreaterEqual(len(rendered), 10)
+            frame = np.zeros_like(rendered[0][0])
+            for screenshot, regions in rendered:
+                for y_start, y_end, x_start, x_end in regions:
+                    frame[y_start:y_end, x_start:x_end] = screenshot[y_start:y_end, x_start:x_end]
+                np.testing.assert_array_equal(frame, screenshot)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
 from enum import Enum
 
+SNAKE_GRID_SIZES = list(range(5, 103, 2))
+
 
 class RenderMode(Enum):
     SLOW_RENDER = 1
@@ -46,9 +48,20 @@ def get_sac_config(window):
 def get_snake_env_config(window):
     """Compiles the set Snake environment configs by the user"""
     grid_size_index = window.ui.gridSizeComboBox.currentIndex()
-    grid_size = [5, 7, 9][grid_size_index]
+    grid_size = SNAKE_GRID_SIZES[grid_size_index]
 
     snake_vision_index = window.ui.snakeVisionComboBox.currentIndex()
-    snake_vision = [1, 2, 3, 4][snake_vision_index]
+    snake_vision = snake_vision_index + 1
 
     return grid_size, snake_vision
+
+
+def get_trajectory_path(window):
+    """Returns the path of the file the training steps are recorded to, or None if they are not recorded"""
+    path = window.ui.trajectoryPathLineEdit.text().strip()
+    return path if path else None
+
+
+def get_pixel_observations(window):
+    """Returns whether the agent observes the stacked screenshots of the environment instead of its feature vectors"""
+    return window.ui.pixelObservationsCheckBox.isChecked()
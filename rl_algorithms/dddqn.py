@@ -7,13 +7,18 @@ import torch.nn as nn
 import torch.nn.functional as F
 import torch.optim as optim
 
+from envs.random_stream import RandomStream
 from rl_algorithms.replay_memory.discrete_replay_memory import ReplayBuffer
+from rl_algorithms.replay_memory.prioritized_replay_memory import PrioritizedReplayBuffer
+from rl_algorithms.replay_memory.torch_replay_memory import TorchReplayBuffer
+from .encoder import make_encoder
 from .interface import AlgInterface
 
 
 class DuelingDDQNAgent(AlgInterface):
     def __init__(self, lr, gamma, batch_size, epsilon, eps_dec, eps_min, tau, fc1_dim, fc2_dim, input_dim, output_dim,
-                 mem_size=1_000_000):
+                 mem_size=1_000_000, seed=None, prioritized=False, storage=None, share_observations=False,
+                 torch_memory=False):
         self.gamma = gamma
         self.epsilon = epsilon
         self.lr = lr
@@ -24,7 +29,21 @@ class DuelingDDQNAgent(AlgInterface):
         self.action_space = [i for i in range(output_dim)]
         self.learn_step_counter = 0
 
-        self.memory = ReplayBuffer(mem_size, input_dim)
+        # the exploration and the sampling of the replay memory draw from their own streams of the same seed
+        self.rng, memory_rng = RandomStream(seed).spawn(2)
+        if torch_memory:
+            # the memory consists of tensors on the device of the networks, from which learn() gets its batches directly
+            if storage is not None or share_observations:
+                raise ValueError("torch_memory can not be combined with a storage or share_observations")
+            self.memory = TorchReplayBuffer(mem_size, input_dim, rng=memory_rng.generator)
+        else:
+            self.memory = ReplayBuffer(mem_size, input_dim, rng=memory_rng.generator, storage=storage,
+                                       share_observations=share_observations)
+
+        # prioritized replay samples transitions with large TD errors more often and weights their losses
+        self.prioritized = prioritized
+        if prioritized:
+            self.memory = PrioritizedReplayBuffer(self.memory, rng=memory_rng.generator)
 
         self.q_eval = DuelingDeepQNetwork(self.lr, input_dim, output_dim, fc1_dim, fc2_dim)
         self.q_next = DuelingDeepQNetwork(self.lr, input_dim, output_dim, fc1_dim, fc2_dim)
@@ -32,20 +51,23 @@ class DuelingDDQNAgent(AlgInterface):
         self._update_network_parameters(tau=1)
 
     def choose_action(self, observation):
-        if np.random.random() > self.epsilon:
-            state = np.array([observation], copy=False, dtype=np.float32)
+        if self.rng.random() > self.epsilon:
+            state = np.asarray([observation], dtype=np.float32)
             state_tensor = T.tensor(state).to(self.q_eval.device)
             _, advantages = self.q_eval.forward(state_tensor)
 
             action = T.argmax(advantages).item()
         else:
-            action = np.random.choice(self.action_space)
+            action = self.rng.choice(self.action_space)
 
         return action
 
     def remember(self, state, action, reward, state_, done):
         self.memory.store_transition(state, action, reward, state_, done)
 
+    def remember_batch(self, states, actions, rewards, states_, dones):
+        self.memory.store_transitions(states, actions, rewards, states_, dones)
+
     def learn(self):
         if self.memory.mem_cntr < self.batch_size:
             return
@@ -54,7 +76,7 @@ class DuelingDDQNAgent(AlgInterface):
 
         self._update_network_parameters()
 
-        states, actions, rewards, states_, dones = self._sample_memory()
+        states, actions, rewards, states_, dones, memory_indices, weights = self._sample_memory()
         indices = np.arange(self.batch_size)
 
         v_s, a_s = self.q_eval.forward(states)
@@ -73,7 +95,12 @@ class DuelingDDQNAgent(AlgInterface):
 
         q_target = rewards + self.gamma * q_next[indices, max_actions]
 
-        loss = self.q_eval.loss(q_target, q_pred).to(self.q_eval.device)
+        if self.prioritized:
+            td_errors = q_target - q_pred
+            loss = T.mean(weights * td_errors ** 2)
+            self.memory.update_priorities(memory_indices, td_errors.detach().cpu().numpy())
+        else:
+            loss = self.q_eval.loss(q_target, q_pred).to(self.q_eval.device)
         loss.backward()
         self.q_eval.optimizer.step()
         self.learn_step_counter += 1
@@ -81,15 +108,21 @@ class DuelingDDQNAgent(AlgInterface):
         self._decrement_epsilon()
 
     def _sample_memory(self):
-        state, action, reward, new_state, done = self.memory.sample_buffer(self.batch_size)
+        indices, weights = None, None
+        if self.prioritized:
+            state, action, reward, new_state, done, indices, weights = self.memory.sample_buffer(self.batch_size)
+            weights = T.as_tensor(weights, device=self.q_eval.device)
+        else:
+            state, action, reward, new_state, done = self.memory.sample_buffer(self.batch_size)
 
-        states = T.tensor(state).to(self.q_eval.device)
-        rewards = T.tensor(reward).to(self.q_eval.device)
-        dones = T.tensor(done).to(self.q_eval.device)
-        actions = T.tensor(action).to(self.q_eval.device)
-        states_ = T.tensor(new_state).to(self.q_eval.device)
+        # the batches of a TorchReplayBuffer are already tensors on the device, the ones of a ReplayBuffer are copied
+        states = T.as_tensor(state, device=self.q_eval.device)
+        rewards = T.as_tensor(reward, device=self.q_eval.device)
+        dones = T.as_tensor(done, device=self.q_eval.device)
+        actions = T.as_tensor(action, device=self.q_eval.device)
+        states_ = T.as_tensor(new_state, device=self.q_eval.device)
 
-        return states, actions, rewards, states_, dones
+        return states, actions, rewards, states_, dones, indices, weights
 
     def _update_network_parameters(self, tau=None):
         if tau is None:
@@ -116,7 +149,9 @@ class DuelingDeepQNetwork(nn.Module):
     def __init__(self, lr, input_dim, output_dim, fc1_dim, fc2_dim):
         super(DuelingDeepQNetwork, self).__init__()
 
-        self.fc1 = nn.Linear(input_dim, fc1_dim)
+        self.encoder, feature_dim = make_encoder(input_dim)
+
+        self.fc1 = nn.Linear(feature_dim, fc1_dim)
         self.fc2 = nn.Linear(fc1_dim, fc2_dim)
         self.V = nn.Linear(fc2_dim, 1)
         self.A = nn.Linear(fc2_dim, output_dim)
@@ -127,7 +162,7 @@ class DuelingDeepQNetwork(nn.Module):
         self.to(self.device)
 
     def forward(self, state):
-        flat1 = F.relu(self.fc1(state))
+        flat1 = F.relu(self.fc1(self.encoder(state)))
         flat2 = F.relu(self.fc2(flat1))
         v = self.V(flat2)
         a = self.A(flat2)
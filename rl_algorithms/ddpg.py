@@ -7,22 +7,42 @@ import torch.nn.functional as F
 import torch.nn as nn
 import torch.optim as optim
 
+from envs.random_stream import RandomStream
 from rl_algorithms.replay_memory.continuous_replay_memory import ReplayBuffer
+from rl_algorithms.replay_memory.prioritized_replay_memory import PrioritizedReplayBuffer
+from rl_algorithms.replay_memory.torch_replay_memory import TorchReplayBuffer
+from .encoder import make_encoder
 from .interface import AlgInterface
 
 
 class DDPGAgent(AlgInterface):
     def __init__(self, alpha, beta, gamma, batch_size, tau, fc1_dims, fc2_dims, input_dim, output_dim,
-                 mem_size=1_000_000):
+                 mem_size=1_000_000, seed=None, prioritized=False, storage=None, share_observations=False,
+                 torch_memory=False):
         self.gamma = gamma
         self.tau = tau
         self.batch_size = batch_size
         self.alpha = alpha
         self.beta = beta
 
-        self.memory = ReplayBuffer(mem_size, input_dim, output_dim)
+        # the exploration noise and the sampling of the replay memory draw from their own streams of the same seed
+        self.rng, memory_rng = RandomStream(seed).spawn(2)
 
-        self.noise = OUActionNoise(mu=np.zeros(output_dim))
+        if torch_memory:
+            # the memory consists of float32 tensors on the device of the networks, which learn() uses directly
+            if storage is not None or share_observations:
+                raise ValueError("torch_memory can not be combined with a storage or share_observations")
+            self.memory = TorchReplayBuffer(mem_size, input_dim, output_dim, rng=memory_rng.generator, replace=True)
+        else:
+            self.memory = ReplayBuffer(mem_size, input_dim, output_dim, rng=memory_rng.generator, storage=storage,
+                                       share_observations=share_observations)
+
+        # prioritized replay samples transitions with large TD errors more often and weights their critic losses
+        self.prioritized = prioritized
+        if prioritized:
+            self.memory = PrioritizedReplayBuffer(self.memory, rng=memory_rng.generator)
+
+        self.noise = OUActionNoise(mu=np.zeros(output_dim), rng=self.rng.generator)
 
         self.actor = ActorNetwork(alpha, input_dim, fc1_dims, fc2_dims, output_dim)
         self.critic = CriticNetwork(beta, input_dim, fc1_dims, fc2_dims, output_dim)
@@ -44,16 +64,26 @@ class DDPGAgent(AlgInterface):
     def remember(self, state, action, reward, state_, done):
         self.memory.store_transition(state, action, reward, state_, done)
 
+    def remember_batch(self, states, actions, rewards, states_, dones):
+        self.memory.store_transitions(states, actions, rewards, states_, dones)
+
     def learn(self):
         if self.memory.mem_cntr < self.batch_size:
             return
 
-        states, actions, rewards, states_, done = self.memory.sample_buffer(self.batch_size)
-        states = T.tensor(states, dtype=T.float).to(self.actor.device)
-        states_ = T.tensor(states_, dtype=T.float).to(self.actor.device)
-        actions = T.tensor(actions, dtype=T.float).to(self.actor.device)
-        rewards = T.tensor(rewards, dtype=T.float).to(self.actor.device)
-        done = T.tensor(done).to(self.actor.device)
+        if self.prioritized:
+            states, actions, rewards, states_, done, indices, weights = self.memory.sample_buffer(self.batch_size)
+            weights = T.as_tensor(weights, device=self.actor.device).view(self.batch_size, 1)
+        else:
+            states, actions, rewards, states_, done = self.memory.sample_buffer(self.batch_size)
+
+        # the batches of a TorchReplayBuffer are already float32 tensors on the device, the ones of a ReplayBuffer are
+        # converted from float64
+        states = T.as_tensor(states, dtype=T.float, device=self.actor.device)
+        states_ = T.as_tensor(states_, dtype=T.float, device=self.actor.device)
+        actions = T.as_tensor(actions, dtype=T.float, device=self.actor.device)
+        rewards = T.as_tensor(rewards, dtype=T.float, device=self.actor.device)
+        done = T.as_tensor(done, device=self.actor.device)
 
         target_actions = self.target_actor.forward(states_)
         critic_value_ = self.target_critic.forward(states_, target_actions)
@@ -66,7 +96,12 @@ class DDPGAgent(AlgInterface):
         target = target.view(self.batch_size, 1)
 
         self.critic.optimizer.zero_grad()
-        critic_loss = F.mse_loss(target, critic_value)
+        if self.prioritized:
+            td_errors = target - critic_value
+            critic_loss = T.mean(weights * td_errors ** 2)
+            self.memory.update_priorities(indices, td_errors.detach().cpu().numpy().ravel())
+        else:
+            critic_loss = F.mse_loss(target, critic_value)
         critic_loss.backward()
         self.critic.optimizer.step()
 
@@ -112,7 +147,9 @@ class CriticNetwork(nn.Module):
         self.fc2_dims = fc2_dims
         self.n_actions = output_dims
 
-        self.fc1 = nn.Linear(self.input_dims, self.fc1_dims)
+        self.encoder, feature_dims = make_encoder(self.input_dims)
+
+        self.fc1 = nn.Linear(feature_dims, self.fc1_dims)
         self.fc2 = nn.Linear(self.fc1_dims, self.fc2_dims)
 
         self.action_value = nn.Linear(self.n_actions, self.fc2_dims)
@@ -141,7 +178,7 @@ class CriticNetwork(nn.Module):
         self.to(self.device)
 
     def forward(self, state, action):
-        state_value = F.relu(self.fc1(state))
+        state_value = F.relu(self.fc1(self.encoder(state)))
         state_value = self.fc2(state_value)
         action_value = self.action_value(action)
         state_action_value = F.relu(T.add(state_value, action_value))
@@ -158,7 +195,9 @@ class ActorNetwork(nn.Module):
         self.fc2_dims = fc2_dims
         self.n_actions = n_actions
 
-        self.fc1 = nn.Linear(self.input_dims, fc1_dims)
+        self.encoder, feature_dims = make_encoder(self.input_dims)
+
+        self.fc1 = nn.Linear(feature_dims, fc1_dims)
         self.fc2 = nn.Linear(self.fc1_dims, self.fc2_dims)
 
         self.mu = nn.Linear(self.fc2_dims, self.n_actions)
@@ -181,7 +220,7 @@ class ActorNetwork(nn.Module):
         self.to(self.device)
 
     def forward(self, state):
-        x = F.relu(self.fc1(state))
+        x = F.relu(self.fc1(self.encoder(state)))
         x = F.relu(self.fc2(x))
         x = T.tanh(self.mu(x))
 
@@ -189,8 +228,9 @@ class ActorNetwork(nn.Module):
 
 
 class OUActionNoise:
-    def __init__(self, mu, sigma=0.15, theta=0.2, dt=1e-2, x0=None):
+    def __init__(self, mu, sigma=0.15, theta=0.2, dt=1e-2, x0=None, rng=None):
         self.theta = theta
+        self.rng = np.random.default_rng() if rng is None else rng
         self.mu = mu
         self.sigma = sigma
         self.dt = dt
@@ -201,7 +241,7 @@ class OUActionNoise:
 
     def __call__(self, *args, **kwargs):
         x = self.x_prev + self.theta * (self.mu - self.x_prev) * self.dt + \
-            self.sigma * np.sqrt(self.dt) * np.random.normal(size=self.mu.shape)
+            self.sigma * np.sqrt(self.dt) * self.rng.normal(size=self.mu.shape)
         self.x_prev = x
 
         return x
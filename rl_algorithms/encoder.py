@@ -0,0 +1,42 @@
+import numpy as np
+
+import torch as T
+import torch.nn as nn
+import torch.nn.functional as F
+
+
+class ConvEncoder(nn.Module):
+    """
+    The ConvEncoder class turns stacked frames of shape (channels, height, width) into a flat feature vector. The frames
+    of the environments are only a few cells large, so two small 3x3 convolutions are enough.
+
+    Args:
+        input_shape (tuple): The (channels, height, width) shape of the observations.
+        n_filters (int): The number of filters of the first convolution, the second one has twice as many.
+    """
+
+    def __init__(self, input_shape, n_filters=16):
+        super(ConvEncoder, self).__init__()
+
+        channels, height, width = input_shape
+
+        self.conv1 = nn.Conv2d(channels, n_filters, kernel_size=3, padding=1)
+        self.conv2 = nn.Conv2d(n_filters, 2 * n_filters, kernel_size=3, stride=2, padding=1)
+
+        self.output_dim = 2 * n_filters * ((height + 1) // 2) * ((width + 1) // 2)
+
+    def forward(self, state):
+        x = F.relu(self.conv1(state))
+        x = F.relu(self.conv2(x))
+
+        return T.flatten(x, start_dim=1)
+
+
+def make_encoder(input_dim):
+    """Returns the encoder for observations of the given shape and the number of features it outputs. Observations of
+        shape (channels, height, width) are encoded by a ConvEncoder, feature vectors are passed through unchanged"""
+    if np.ndim(input_dim) == 1:
+        encoder = ConvEncoder(input_dim)
+        return encoder, encoder.output_dim
+
+    return nn.Identity(), input_dim
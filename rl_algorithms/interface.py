@@ -19,6 +19,18 @@ class AlgInterface:
             done (bool): Whether action lead to the failing the environment"""
         pass
 
+    def remember_batch(self, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray, states_: np.ndarray,
+                       dones: np.ndarray) -> None:
+        """Inserts a batch of transitions into the replay memory at once, e.g. the steps of several environments
+
+        Args:
+            states (np.ndarray): The states of the environments before the actions were executed, one row each.
+            actions (np.ndarray): The actions that were executed.
+            rewards (np.ndarray): The rewards given for the executed actions.
+            states_ (np.ndarray): The states of the environments after the actions were executed.
+            dones (np.ndarray): Whether the actions lead to failing the environments"""
+        pass
+
     def learn(self) -> None:
         """Samples a batch of memories from the replay buffer and fits the neural network to it"""
         pass
@@ -2,34 +2,90 @@
 
 import numpy as np
 
+from .memmap_storage import make_array, store_rows
+from .observation_ring import ObservationRing
+
 
 class ReplayBuffer:
-    def __init__(self, max_size, input_shape, n_actions):
+    def __init__(self, max_size, input_shape, n_actions, rng=None, storage=None, share_observations=False):
         self.mem_size = max_size
-        self.mem_cntr = 0
-        self.state_memory = np.zeros((self.mem_size, input_shape))
-        self.new_state_memory = np.zeros((self.mem_size, input_shape))
-        self.action_memory = np.zeros((self.mem_size, n_actions))
-        self.reward_memory = np.zeros(self.mem_size)
-        self.terminal_memory = np.zeros(self.mem_size, dtype=bool)
+        self.rng = np.random.default_rng() if rng is None else rng
+
+        # the arrays are kept in RAM, or in the files of a MemmapStorage, which may already hold transitions
+        self.storage = storage
+        self.mem_cntr = 0 if storage is None else storage.mem_cntr
+
+        # feature vectors have an int shape, stacked frames a (channels, height, width) shape
+        state_shape = (input_shape,) if np.ndim(input_shape) == 0 else tuple(input_shape)
+        self.action_memory = make_array(storage, "action_memory", (self.mem_size, n_actions), np.float64)
+        self.reward_memory = make_array(storage, "reward_memory", self.mem_size, np.float64)
+        self.terminal_memory = make_array(storage, "terminal_memory", self.mem_size, bool)
+
+        # the states and new states share one ring of observations, which halves their memory, see ObservationRing
+        self.observations = None
+        if share_observations:
+            self.observations = ObservationRing(self.mem_size, state_shape, np.float64, self.terminal_memory, storage)
+            self.state_memory = self.new_state_memory = None
+        else:
+            self.state_memory = make_array(storage, "state_memory", (self.mem_size, *state_shape), np.float64)
+            self.new_state_memory = make_array(storage, "new_state_memory", (self.mem_size, *state_shape), np.float64)
 
     def store_transition(self, state, action, reward, state_, done):
         index = self.mem_cntr % self.mem_size
-        self.state_memory[index] = state
+        if self.observations is None:
+            self.state_memory[index] = state
+            self.new_state_memory[index] = state_
+        else:
+            self.observations.store(self.mem_cntr, state, state_)
         self.action_memory[index] = action
         self.reward_memory[index] = reward
-        self.new_state_memory[index] = state_
         self.terminal_memory[index] = done
 
         self.mem_cntr += 1
 
+    def store_transitions(self, states, actions, rewards, states_, dones):
+        """Stores a batch of transitions like consecutive calls of store_transition, but with one slice assignment per
+            array, which wraps around at the end of the memory"""
+        n_transitions = len(dones)
+        if n_transitions > self.mem_size:
+            raise ValueError("a batch can hold at most mem_size transitions")
+        if n_transitions == 0:
+            return
+
+        start = self.mem_cntr % self.mem_size
+        store_rows(self.action_memory, start, np.reshape(actions, (n_transitions, -1)))
+        store_rows(self.reward_memory, start, rewards)
+        store_rows(self.terminal_memory, start, dones)
+        if self.observations is None:
+            store_rows(self.state_memory, start, states)
+            store_rows(self.new_state_memory, start, states_)
+        else:
+            self.observations.store_batch(self.mem_cntr, states, states_)
+
+        self.mem_cntr += n_transitions
+
     def sample_buffer(self, batch_size):
         max_mem = min(self.mem_cntr, self.mem_size)
-        batch = np.random.choice(max_mem, batch_size)
-        states = self.state_memory[batch]
+        batch = self.rng.choice(max_mem, batch_size)
+
+        return self.get_transitions(batch)
+
+    def get_transitions(self, batch):
+        """Returns the states, actions, rewards, new states and dones of the transitions with the indices batch"""
+        if self.observations is None:
+            states, states_ = self.state_memory[batch], self.new_state_memory[batch]
+        else:
+            states, states_ = self.observations.get(batch, self.mem_cntr)
         actions = self.action_memory[batch]
         rewards = self.reward_memory[batch]
-        states_ = self.new_state_memory[batch]
         dones = self.terminal_memory[batch]
 
         return states, actions, rewards, states_, dones
+
+    def flush(self):
+        """Writes the transitions to the files of the storage, so that a new buffer with the storage continues with
+            them. Does nothing for buffers in RAM"""
+        if self.storage is not None:
+            self.storage.flush(self.mem_cntr)
+            if self.observations is not None:
+                self.observations.flush()
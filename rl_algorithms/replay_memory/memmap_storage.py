@@ -0,0 +1,157 @@
+import json
+import os
+
+import numpy as np
+
+
+class MemmapArray:
+    """
+    The MemmapArray class is an array whose rows live in a .npy file that is mapped into memory, so that it can be far
+    larger than the physical memory. Rows that are written one after another, like the transitions of a replay buffer,
+    are first collected in a small in-RAM tail and written to the file together when the tail is full or a row is
+    written out of order. Reads see the rows of the tail as well.
+
+    Args:
+        path (str): The path of the .npy file. An existing file is opened and must have the given shape and dtype.
+        shape (tuple): The shape of the array, the first dimension are the rows, or the number of rows of a 1-D array.
+        dtype (np.dtype): The dtype of the array.
+        tail_size (int): How many consecutive rows are collected in memory before they are written.
+    """
+
+    def __init__(self, path: str, shape: tuple, dtype: np.dtype, tail_size: int = 1024):
+        if tail_size < 1:
+            raise ValueError("tail_size must be greater than or equal to 1")
+
+        self.path = path
+        self.shape = (shape,) if np.ndim(shape) == 0 else tuple(shape)
+        self.dtype = np.dtype(dtype)
+
+        if os.path.exists(path):
+            self._memmap = np.lib.format.open_memmap(path, mode="r+")
+            if self._memmap.shape != self.shape or self._memmap.dtype != self.dtype:
+                raise ValueError(f"{path} holds an array of a different shape or dtype")
+        else:
+            self._memmap = np.lib.format.open_memmap(path, mode="w+", dtype=self.dtype, shape=self.shape)
+
+        # plain array view of the mapped file, indexing it gives arrays instead of memmap objects
+        self._array = self._memmap.view(np.ndarray)
+
+        # the tail holds the rows tail_start to tail_start + n_pending, which are not written to the file yet
+        self._tail = np.zeros((min(tail_size, self.shape[0]), *self.shape[1:]), dtype=self.dtype)
+        self._tail_start = 0
+        self._n_pending = 0
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __setitem__(self, index, value):
+        """Writes a row, index is an int, or consecutive rows, index is a slice with a step of 1"""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("only slices with a step of 1 can be written")
+            n_rows = max(stop - start, 0)
+        else:
+            start, n_rows = range(len(self))[index], 1
+
+        if self._n_pending > 0 and (start != self._tail_start + self._n_pending or
+                                    self._n_pending + n_rows > len(self._tail)):
+            self.flush()
+
+        if n_rows > len(self._tail):
+            self._array[index] = value
+            return
+
+        if self._n_pending == 0:
+            self._tail_start = start
+        self._tail[self._n_pending:self._n_pending + n_rows] = value
+        self._n_pending += n_rows
+
+    def __getitem__(self, index):
+        """Returns a copy of the rows with the index, an int, a slice or an array of indices"""
+        if isinstance(index, slice):
+            self.flush()
+            return self._array[index].copy()
+
+        if np.ndim(index) == 0:
+            offset = range(len(self))[index] - self._tail_start
+            if 0 <= offset < self._n_pending:
+                return self._tail[offset].copy()
+            return self._array[index].copy()
+
+        rows = self._array[index]
+        if self._n_pending > 0:
+            offsets = np.asarray(index) - self._tail_start
+            pending = (offsets >= 0) & (offsets < self._n_pending)
+            rows[pending] = self._tail[offsets[pending]]
+
+        return rows
+
+    def flush(self):
+        """Writes the rows of the tail to the file"""
+        if self._n_pending > 0:
+            self._array[self._tail_start:self._tail_start + self._n_pending] = self._tail[:self._n_pending]
+            self._n_pending = 0
+        self._memmap.flush()
+
+
+class MemmapStorage:
+    """
+    The MemmapStorage class provides the arrays of a replay buffer as MemmapArrays in a directory, one .npy file per
+    array, so that the capacity of the buffer is only limited by the disk. The number of stored transitions is written
+    to replay.json in the directory whenever the buffer is flushed. A buffer that is created with the storage of an
+    existing directory continues with the transitions that were flushed there.
+
+    Args:
+        directory (str): The directory of the files, which is created if it does not exist.
+        tail_size (int): How many transitions each array collects in memory before it writes them to its file.
+    """
+
+    def __init__(self, directory: str, tail_size: int = 1024):
+        os.makedirs(directory, exist_ok=True)
+
+        self.directory = directory
+        self.tail_size = tail_size
+        self.arrays = {}
+
+        self._info_path = os.path.join(directory, "replay.json")
+        self.mem_cntr = 0
+        if os.path.exists(self._info_path):
+            with open(self._info_path) as file:
+                self.mem_cntr = json.load(file)["mem_cntr"]
+
+    def array(self, name: str, shape: tuple, dtype: np.dtype):
+        """Returns the MemmapArray with the name, which is opened or created with the shape and dtype"""
+        array = MemmapArray(os.path.join(self.directory, f"{name}.npy"), shape, dtype, self.tail_size)
+        self.arrays[name] = array
+
+        return array
+
+    def flush(self, mem_cntr: int):
+        """Writes all arrays and the number of stored transitions to disk"""
+        for array in self.arrays.values():
+            array.flush()
+
+        with open(self._info_path, "w") as file:
+            json.dump({"mem_cntr": mem_cntr}, file)
+
+        self.mem_cntr = mem_cntr
+
+
+def make_array(storage: MemmapStorage, name: str, shape: tuple, dtype: np.dtype):
+    """Returns a zeroed in-RAM array if storage is None, else the array with the name from the storage"""
+    if storage is None:
+        return np.zeros(shape, dtype=dtype)
+
+    return storage.array(name, shape, dtype)
+
+
+def store_rows(array, start: int, rows):
+    """Writes the rows to the array from the index start on and wraps around at its end, with at most two slice
+        assignments. The array is an np.ndarray or a MemmapArray and must have at least as many rows"""
+    rows = np.asarray(rows)
+    n_first = min(len(rows), len(array) - start)
+
+    array[start:start + n_first] = rows[:n_first]
+    if n_first < len(rows):
+        array[:len(rows) - n_first] = rows[n_first:]
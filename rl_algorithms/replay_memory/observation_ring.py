@@ -0,0 +1,131 @@
+import os
+
+import numpy as np
+
+from .memmap_storage import MemmapStorage, make_array, store_rows
+
+
+class ObservationRing:
+    """
+    The ObservationRing class stores the states and the new states of the transitions of a replay buffer with a single
+    observation per transition instead of two. Within an episode the new state of a transition is the state of the
+    next one, so the observations are kept in a ring of mem_size + 1 rows: the n-th stored transition (counting from 0)
+    starts at row n % (mem_size + 1) and its new state is the row after it. The extra row keeps the state of the oldest
+    transition from being overwritten by the new state of the newest one.
+
+    A transition whose new state is not the state of the next stored transition, because an episode ended, is flagged
+    in boundary_memory:
+        - Terminal transitions lose their new state to the first state of the next episode. Their new states are
+          returned as zeros, which the agents never use because done masks the value of the new state.
+        - Episodes that ended without done, e.g. because the training was stopped, keep their final observation in
+          a dict, which is small because such episodes are rare. With a storage it is saved when the buffer is
+          flushed.
+
+    Args:
+        mem_size (int): The number of transitions of the replay buffer.
+        state_shape (tuple): The shape of a single observation.
+        dtype (np.dtype): The dtype of the observations.
+        terminal_memory (np.ndarray): The done flags of the replay buffer, which are read when an episode ends.
+        storage (MemmapStorage): Optional storage of the arrays, see MemmapStorage.
+    """
+
+    def __init__(self, mem_size: int, state_shape: tuple, dtype: np.dtype, terminal_memory,
+                 storage: MemmapStorage = None):
+        self.mem_size = mem_size
+        self.storage = storage
+        self.terminal_memory = terminal_memory
+
+        self.observation_memory = make_array(storage, "observation_memory", (mem_size + 1, *state_shape), dtype)
+        self.boundary_memory = make_array(storage, "boundary_memory", mem_size, bool)
+
+        # final observations of the transitions that are boundaries but not terminal, by their index in the buffer
+        self.final_observations = {}
+        if storage is not None and os.path.exists(self._finals_path()):
+            with np.load(self._finals_path()) as finals:
+                self.final_observations = dict(zip(finals["indices"].tolist(), finals["observations"]))
+
+    def store(self, mem_cntr: int, state, state_):
+        """Stores the state and the new state of the transition with the number mem_cntr"""
+        row = mem_cntr % (self.mem_size + 1)
+        index = mem_cntr % self.mem_size
+        state = np.asarray(state, dtype=self.observation_memory.dtype)
+
+        # the previous transition ended its episode if this one does not start with its new state
+        if mem_cntr == 0 or not np.array_equal(self.observation_memory[row], state):
+            if mem_cntr > 0:
+                previous = (mem_cntr - 1) % self.mem_size
+                self.boundary_memory[previous] = True
+                if not self.terminal_memory[previous]:
+                    self.final_observations[previous] = self.observation_memory[row].copy()
+            self.observation_memory[row] = state
+
+        self.observation_memory[(row + 1) % (self.mem_size + 1)] = state_
+        self.boundary_memory[index] = False
+        self.final_observations.pop(index, None)
+
+    def store_batch(self, mem_cntr: int, states, states_):
+        """Stores the states and the new states of consecutive transitions from the number mem_cntr on, at most
+            mem_size of them, like calls of store, with slice assignments. The done flags of the batch must be in
+            terminal_memory already. The ring only saves memory if the batch holds the consecutive steps of episodes,
+            transitions of several interleaved environments keep almost all their new states as final observations"""
+        states = np.asarray(states, dtype=self.observation_memory.dtype)
+        states_ = np.asarray(states_, dtype=self.observation_memory.dtype)
+        n_transitions = len(states)
+        row = mem_cntr % (self.mem_size + 1)
+        index = mem_cntr % self.mem_size
+
+        # each transition continues the previous one if it starts with its new state
+        previous_states_ = np.concatenate([self.observation_memory[row][None], states_[:-1]])
+        ends = ~np.all((states == previous_states_).reshape(n_transitions, -1), axis=1)
+
+        # the transition before the batch is overwritten by the batch if the batch fills the whole memory
+        if mem_cntr > 0 and ends[0] and n_transitions < self.mem_size:
+            previous = (mem_cntr - 1) % self.mem_size
+            self.boundary_memory[previous] = True
+            if not self.terminal_memory[previous]:
+                self.final_observations[previous] = previous_states_[0].copy()
+
+        indices = (index + np.arange(n_transitions)) % self.mem_size
+        if self.final_observations:
+            for overwritten in np.intersect1d(list(self.final_observations), indices):
+                del self.final_observations[int(overwritten)]
+
+        # the last transition of the batch continues in the ring with its new state
+        boundaries = np.append(ends[1:], False)
+        store_rows(self.boundary_memory, index, boundaries)
+        for i in np.flatnonzero(boundaries & ~self.terminal_memory[indices]):
+            self.final_observations[int(indices[i])] = states_[i].copy()
+
+        store_rows(self.observation_memory, row, states)
+        self.observation_memory[(row + n_transitions) % (self.mem_size + 1)] = states_[-1]
+
+    def get(self, batch: np.ndarray, mem_cntr: int):
+        """Returns the states and the new states of the transitions with the indices batch of a buffer that stored
+            mem_cntr transitions"""
+        batch = np.asarray(batch, dtype=np.int64)
+
+        # the number of the last transition that was stored at each index, and its row in the ring
+        numbers = batch + self.mem_size * ((mem_cntr - 1 - batch) // self.mem_size)
+        rows = numbers % (self.mem_size + 1)
+
+        states = self.observation_memory[rows]
+        states_ = self.observation_memory[(rows + 1) % (self.mem_size + 1)]
+
+        for i in np.flatnonzero(self.boundary_memory[batch]):
+            final_observation = self.final_observations.get(int(batch[i]))
+            states_[i] = 0 if final_observation is None else final_observation
+
+        return states, states_
+
+    def flush(self):
+        """Saves the final observations of the episodes that ended without done next to the files of the storage"""
+        if self.storage is None:
+            return
+
+        indices = np.array(list(self.final_observations), dtype=np.int64)
+        observations = np.array(list(self.final_observations.values()), dtype=self.observation_memory.dtype)
+        np.savez(self._finals_path(), indices=indices,
+                 observations=observations.reshape(len(indices), *self.observation_memory.shape[1:]))
+
+    def _finals_path(self):
+        return os.path.join(self.storage.directory, "final_observations.npz")
@@ -0,0 +1,177 @@
+""" Prioritized experience replay as described in https://arxiv.org/abs/1511.05952 """
+
+import numpy as np
+
+
+class SumTree:
+    """
+    The SumTree class stores a priority for each of capacity slots in a binary tree whose inner nodes hold the sum and
+    the minimum of their children. The tree lives in flat arrays: the root is node 1, the children of node i are 2i and
+    2i + 1 and the slots are the leaves from node size on, where size is the smallest power of two >= capacity.
+
+    Updates and searches work on whole batches: every level of the tree is processed with one array operation for all
+    indices of the batch, so both take O(batch size * log capacity) time.
+
+    Args:
+        capacity (int): The number of slots.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be greater than or equal to 1")
+
+        self.capacity = capacity
+        self.depth = max(int(np.ceil(np.log2(capacity))), 0)
+        self.size = 2 ** self.depth
+
+        # empty slots have a priority of 0, which keeps them from being found, and do not count for the minimum
+        self._sums = np.zeros(2 * self.size, dtype=np.float64)
+        self._mins = np.full(2 * self.size, np.inf, dtype=np.float64)
+
+    @property
+    def total(self):
+        """The sum of all priorities"""
+        return self._sums[1]
+
+    @property
+    def min(self):
+        """The smallest priority of the slots that were set"""
+        return self._mins[1]
+
+    def get(self, indices: np.ndarray):
+        """Returns the priorities of the slots with the indices"""
+        return self._sums[np.asarray(indices) + self.size]
+
+    def update(self, indices: np.ndarray, priorities: np.ndarray):
+        """Sets the priorities of the slots with the indices and updates their ancestors level by level. If an index
+            occurs more than once, its last priority is kept"""
+        nodes = np.array(indices, dtype=np.int64) + self.size
+        self._sums[nodes] = priorities
+        self._mins[nodes] = priorities
+
+        # ancestors that several indices share are recomputed once for each of them, which gives the same result
+        for _ in range(self.depth):
+            nodes >>= 1
+            left = 2 * nodes
+            self._sums[nodes] = self._sums[left] + self._sums[left + 1]
+            self._mins[nodes] = np.minimum(self._mins[left], self._mins[left + 1])
+
+    def set(self, index: int, priority: float):
+        """Sets the priority of a single slot like update, without the overhead of array operations"""
+        node = index + self.size
+        self._sums[node] = priority
+        self._mins[node] = priority
+
+        for _ in range(self.depth):
+            node >>= 1
+            left = 2 * node
+            self._sums[node] = self._sums[left] + self._sums[left + 1]
+            self._mins[node] = min(self._mins[left], self._mins[left + 1])
+
+    def find(self, values: np.ndarray):
+        """Returns the indices of the slots in which the prefix sums of the priorities reach the values, which must lie
+            in [0, total). All values descend the tree together"""
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+
+        for _ in range(self.depth):
+            left = 2 * nodes
+            left_sums = self._sums[left]
+
+            # rounding can leave a value above the sum of a subtree, which must not lead into an empty right subtree
+            go_right = (values >= left_sums) & (self._sums[left + 1] > 0)
+            values -= left_sums * go_right
+            nodes = left + go_right
+
+        return nodes - self.size
+
+
+class PrioritizedReplayBuffer:
+    """
+    The PrioritizedReplayBuffer class adds prioritized sampling to a replay buffer of either kind. Transitions are
+    sampled with probabilities proportional to priority^alpha, where the priority of a transition is its last absolute
+    TD error plus epsilon. New transitions get the largest priority so far, so that every transition is sampled at least
+    once soon after it was stored.
+
+    Batches are drawn stratified: the total priority is split into batch_size equal segments and one transition is
+    drawn from each. The importance-sampling weights (1 / (N * P(i)))^beta, normalized by their largest possible value,
+    correct the bias of the prioritized sampling; beta grows by beta_increment with every batch until it reaches 1.
+
+    Args:
+        memory: The replay buffer that stores the transitions, a discrete or a continuous ReplayBuffer.
+        alpha (float): How strongly the priorities are used, 0 samples uniformly.
+        beta (float): The initial exponent of the importance-sampling weights.
+        beta_increment (float): How much beta grows with every sampled batch.
+        epsilon (float): Added to the absolute TD errors, so that no transition gets a priority of 0.
+        rng (np.random.Generator): Optional generator from which the batches are sampled.
+    """
+
+    def __init__(self, memory, alpha: float = 0.6, beta: float = 0.4, beta_increment: float = 1e-4,
+                 epsilon: float = 1e-6, rng: np.random.Generator = None):
+        if alpha < 0:
+            raise ValueError("alpha must be greater than or equal to 0")
+        if not 0 <= beta <= 1:
+            raise ValueError("beta must be between 0 and 1")
+        if epsilon <= 0:
+            raise ValueError("epsilon must be greater than 0")
+
+        self.memory = memory
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = beta_increment
+        self.epsilon = epsilon
+        self.rng = np.random.default_rng() if rng is None else rng
+
+        self.tree = SumTree(memory.mem_size)
+        self.max_priority = 1.0
+
+        # transitions that the memory already holds, e.g. from its storage, start with the same priority as new ones
+        n_stored = min(memory.mem_cntr, memory.mem_size)
+        self.tree.update(np.arange(n_stored), np.full(n_stored, self.max_priority))
+
+    @property
+    def mem_size(self):
+        return self.memory.mem_size
+
+    @property
+    def mem_cntr(self):
+        return self.memory.mem_cntr
+
+    def store_transition(self, state, action, reward, state_, done):
+        index = self.memory.mem_cntr % self.memory.mem_size
+        self.tree.set(index, self.max_priority)
+        self.memory.store_transition(state, action, reward, state_, done)
+
+    def store_transitions(self, states, actions, rewards, states_, dones):
+        """Stores a batch of transitions like memory.store_transitions, all with the largest priority so far"""
+        indices = (self.memory.mem_cntr + np.arange(len(dones))) % self.memory.mem_size
+        self.tree.update(indices, np.full(len(indices), self.max_priority))
+        self.memory.store_transitions(states, actions, rewards, states_, dones)
+
+    def sample_buffer(self, batch_size):
+        """Samples a batch of transitions by priority
+
+        Returns:
+            states, actions, rewards, states_, dones: The sampled transitions like ReplayBuffer.sample_buffer.
+            indices (np.ndarray): The slots of the transitions, which update_priorities expects.
+            weights (np.ndarray): The float32 importance-sampling weights of the transitions.
+        """
+        segment = self.tree.total / batch_size
+        values = (np.arange(batch_size) + self.rng.random(batch_size)) * segment
+        indices = self.tree.find(np.minimum(values, np.nextafter(self.tree.total, 0)))
+
+        # (N * P(i))^-beta divided by the largest weight, the one of the smallest priority
+        weights = (self.tree.get(indices) / self.tree.min) ** -self.beta
+        self.beta = min(self.beta + self.beta_increment, 1.0)
+
+        return (*self.memory.get_transitions(indices), indices, weights.astype(np.float32))
+
+    def flush(self):
+        """Flushes the storage of the memory, the priorities are not stored"""
+        self.memory.flush()
+
+    def update_priorities(self, indices: np.ndarray, td_errors: np.ndarray):
+        """Sets the priorities of the sampled transitions from the absolute values of their new TD errors"""
+        priorities = (np.abs(td_errors) + self.epsilon) ** self.alpha
+        self.tree.update(indices, priorities)
+        self.max_priority = max(self.max_priority, priorities.max())
@@ -0,0 +1,92 @@
+import numpy as np
+import torch as T
+
+
+class TorchReplayBuffer:
+    """
+    The TorchReplayBuffer class is a replay buffer whose memory are preallocated float32 tensors on the device of the
+    networks, for both kinds of actions. Batches are gathered with index_select into output tensors that are reused
+    for every batch of the same size, so learn() gets tensors of the right dtype and device without copies through
+    NumPy. The tensors of a batch are overwritten by the next batch of that size and must not be kept.
+
+    Args:
+        max_size (int): The number of transitions that the memory holds.
+        input_shape: The shape of a state, an int for feature vectors or a tuple for stacked frames.
+        n_actions (int): The size of a continuous action, or None for discrete actions, which are stored as indices.
+        rng (np.random.Generator): Optional generator from which the batches are sampled.
+        replace (bool): Whether a batch may contain a transition more than once.
+        device (T.device): The device of the tensors, the GPU if available like the networks by default.
+    """
+
+    def __init__(self, max_size: int, input_shape, n_actions: int = None, rng: np.random.Generator = None,
+                 replace: bool = False, device: T.device = None):
+        self.mem_size = max_size
+        self.mem_cntr = 0
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.replace = replace
+        self.device = T.device('cuda:0' if T.cuda.is_available() else 'cpu') if device is None else device
+
+        state_shape = (input_shape,) if np.ndim(input_shape) == 0 else tuple(input_shape)
+        self.state_memory = T.zeros((self.mem_size, *state_shape), dtype=T.float32, device=self.device)
+        self.new_state_memory = T.zeros((self.mem_size, *state_shape), dtype=T.float32, device=self.device)
+        if n_actions is None:
+            self.action_memory = T.zeros(self.mem_size, dtype=T.int64, device=self.device)
+        else:
+            self.action_memory = T.zeros((self.mem_size, n_actions), dtype=T.float32, device=self.device)
+        self.reward_memory = T.zeros(self.mem_size, dtype=T.float32, device=self.device)
+        self.terminal_memory = T.zeros(self.mem_size, dtype=T.bool, device=self.device)
+
+        # output tensors of the batches by batch size
+        self._outputs = {}
+
+    @property
+    def _memories(self):
+        return self.state_memory, self.action_memory, self.reward_memory, self.new_state_memory, self.terminal_memory
+
+    def store_transition(self, state, action, reward, state_, done):
+        index = self.mem_cntr % self.mem_size
+        for memory, value in zip(self._memories, (state, action, reward, state_, done)):
+            memory[index] = T.as_tensor(value, dtype=memory.dtype)
+
+        self.mem_cntr += 1
+
+    def store_transitions(self, states, actions, rewards, states_, dones):
+        """Stores a batch of transitions like consecutive calls of store_transition, with one copy per tensor that
+            wraps around at the end of the memory"""
+        n_transitions = len(dones)
+        if n_transitions > self.mem_size:
+            raise ValueError("a batch can hold at most mem_size transitions")
+
+        start = self.mem_cntr % self.mem_size
+        n_first = min(n_transitions, self.mem_size - start)
+        for memory, rows in zip(self._memories, (states, actions, rewards, states_, dones)):
+            rows = T.as_tensor(rows if T.is_tensor(rows) else np.asarray(rows), dtype=memory.dtype, device=self.device)
+            rows = rows.reshape(n_transitions, *memory.shape[1:])
+            memory[start:start + n_first] = rows[:n_first]
+            memory[:n_transitions - n_first] = rows[n_first:]
+
+        self.mem_cntr += n_transitions
+
+    def sample_buffer(self, batch_size):
+        max_mem = min(self.mem_cntr, self.mem_size)
+        batch = self.rng.choice(max_mem, batch_size, replace=self.replace)
+
+        return self.get_transitions(batch)
+
+    def get_transitions(self, batch):
+        """Returns the states, actions, rewards, new states and dones of the transitions with the indices batch as
+            tensors, which are reused by the next batch of the same size"""
+        batch = T.as_tensor(batch, dtype=T.int64, device=self.device)
+
+        outputs = self._outputs.get(len(batch))
+        if outputs is None:
+            outputs = tuple(memory.new_empty((len(batch), *memory.shape[1:])) for memory in self._memories)
+            self._outputs[len(batch)] = outputs
+
+        for memory, output in zip(self._memories, outputs):
+            T.index_select(memory, 0, batch, out=output)
+
+        return outputs
+
+    def flush(self):
+        """Does nothing, the tensors are not stored"""
@@ -6,16 +6,36 @@ import torch.nn.functional as F
 import torch.optim as optim
 from torch.distributions import Normal
 
+from envs.random_stream import RandomStream
 from rl_algorithms.replay_memory.continuous_replay_memory import ReplayBuffer
+from rl_algorithms.replay_memory.prioritized_replay_memory import PrioritizedReplayBuffer
+from rl_algorithms.replay_memory.torch_replay_memory import TorchReplayBuffer
+from .encoder import make_encoder
 from .interface import AlgInterface
 
 
 class SACAgent(AlgInterface):
     def __init__(self, alpha, beta, gamma, batch_size, tau, reward_scale, layer1_size, layer2_size, input_dims,
-                 n_actions, action_space_high=1.0, mem_size=1_000_000):
+                 n_actions, action_space_high=1.0, mem_size=1_000_000, seed=None, prioritized=False, storage=None,
+                 share_observations=False, torch_memory=False):
         self.gamma = gamma
         self.tau = tau
-        self.memory = ReplayBuffer(mem_size, input_dims, n_actions)
+
+        # the sampling of the replay memory draws from a stream of the seed, the actions are sampled by torch
+        memory_rng, = RandomStream(seed).spawn(1)
+        if torch_memory:
+            # the memory consists of float32 tensors on the device of the networks, which learn() uses directly
+            if storage is not None or share_observations:
+                raise ValueError("torch_memory can not be combined with a storage or share_observations")
+            self.memory = TorchReplayBuffer(mem_size, input_dims, n_actions, rng=memory_rng.generator, replace=True)
+        else:
+            self.memory = ReplayBuffer(mem_size, input_dims, n_actions, rng=memory_rng.generator, storage=storage,
+                                       share_observations=share_observations)
+
+        # prioritized replay samples transitions with large TD errors more often and weights their critic losses
+        self.prioritized = prioritized
+        if prioritized:
+            self.memory = PrioritizedReplayBuffer(self.memory, rng=memory_rng.generator)
         self.batch_size = batch_size
         self.n_actions = n_actions
 
@@ -43,19 +63,28 @@ class SACAgent(AlgInterface):
     def remember(self, state, action, reward, state_, done):
         self.memory.store_transition(state, action, reward, state_, done)
 
+    def remember_batch(self, states, actions, rewards, states_, dones):
+        self.memory.store_transitions(states, actions, rewards, states_, dones)
+
     def learn(self):
         self.actor.train()
 
         if self.memory.mem_cntr < self.batch_size:
             return
 
-        states, actions, rewards, states_, done = self.memory.sample_buffer(self.batch_size)
+        if self.prioritized:
+            states, actions, rewards, states_, done, indices, weights = self.memory.sample_buffer(self.batch_size)
+            weights = T.as_tensor(weights, device=self.actor.device)
+        else:
+            states, actions, rewards, states_, done = self.memory.sample_buffer(self.batch_size)
 
-        states = T.tensor(states, dtype=T.float).to(self.actor.device)
-        states_ = T.tensor(states_, dtype=T.float).to(self.actor.device)
-        actions = T.tensor(actions, dtype=T.float).to(self.actor.device)
-        rewards = T.tensor(rewards, dtype=T.float).to(self.actor.device)
-        done = T.tensor(done).to(self.actor.device)
+        # the batches of a TorchReplayBuffer are already float32 tensors on the device, the ones of a ReplayBuffer are
+        # converted from float64
+        states = T.as_tensor(states, dtype=T.float, device=self.actor.device)
+        states_ = T.as_tensor(states_, dtype=T.float, device=self.actor.device)
+        actions = T.as_tensor(actions, dtype=T.float, device=self.actor.device)
+        rewards = T.as_tensor(rewards, dtype=T.float, device=self.actor.device)
+        done = T.as_tensor(done, device=self.actor.device)
 
         value = self.value(states)
         value = value.view(-1)
@@ -103,8 +132,17 @@ class SACAgent(AlgInterface):
         q_hat = self.scale * rewards + self.gamma * value_
         q1_critic_values = self.critic_1.forward(states, actions).view(-1)
         q2_critic_values = self.critic_2.forward(states, actions).view(-1)
-        critic_1_loss = 0.5 * F.mse_loss(q1_critic_values, q_hat)
-        critic_2_loss = 0.5 * F.mse_loss(q2_critic_values, q_hat)
+        if self.prioritized:
+            td_errors_1, td_errors_2 = q_hat - q1_critic_values, q_hat - q2_critic_values
+            critic_1_loss = 0.5 * T.mean(weights * td_errors_1 ** 2)
+            critic_2_loss = 0.5 * T.mean(weights * td_errors_2 ** 2)
+
+            # the priority is the mean TD error of both critics
+            td_errors = (td_errors_1.abs() + td_errors_2.abs()) / 2
+            self.memory.update_priorities(indices, td_errors.detach().cpu().numpy())
+        else:
+            critic_1_loss = 0.5 * F.mse_loss(q1_critic_values, q_hat)
+            critic_2_loss = 0.5 * F.mse_loss(q2_critic_values, q_hat)
 
         self.critic_1.optimizer.zero_grad()
         self.critic_2.optimizer.zero_grad()
@@ -139,7 +177,9 @@ class CriticNetwork(nn.Module):
         self.fc1_dims = fc1_dims
         self.fc2_dims = fc2_dims
 
-        self.fc1 = nn.Linear(self.input_dims + n_actions, self.fc1_dims)
+        self.encoder, feature_dims = make_encoder(self.input_dims)
+
+        self.fc1 = nn.Linear(feature_dims + n_actions, self.fc1_dims)
         self.fc2 = nn.Linear(self.fc1_dims, self.fc2_dims)
 
         self.q1 = nn.Linear(self.fc2_dims, 1)
@@ -150,7 +190,7 @@ class CriticNetwork(nn.Module):
         self.to(self.device)
 
     def forward(self, x, action):
-        x = T.cat([x, action], dim=1)
+        x = T.cat([self.encoder(x), action], dim=1)
 
         x = F.relu(self.fc1(x))
         x = F.relu(self.fc2(x))
@@ -171,7 +211,9 @@ class ActorNetwork(nn.Module):
 
         self.reparam_noise = 1e-6
 
-        self.fc1 = nn.Linear(self.input_dims, self.fc1_dims)
+        self.encoder, feature_dims = make_encoder(self.input_dims)
+
+        self.fc1 = nn.Linear(feature_dims, self.fc1_dims)
         self.fc2 = nn.Linear(self.fc1_dims, self.fc2_dims)
 
         self.mu = nn.Linear(self.fc2_dims, self.n_actions)
@@ -183,7 +225,7 @@ class ActorNetwork(nn.Module):
         self.to(self.device)
 
     def forward(self, x):
-        x = F.relu(self.fc1(x))
+        x = F.relu(self.fc1(self.encoder(x)))
         x = F.relu(self.fc2(x))
 
         mu = self.mu(x)
@@ -220,7 +262,9 @@ class ValueNetwork(nn.Module):
         self.fc1_dims = fc1_dims
         self.fc2_dims = fc2_dims
 
-        self.fc1 = nn.Linear(self.input_dims, self.fc1_dims)
+        self.encoder, feature_dims = make_encoder(self.input_dims)
+
+        self.fc1 = nn.Linear(feature_dims, self.fc1_dims)
         self.fc2 = nn.Linear(self.fc1_dims, self.fc2_dims)
 
         self.v = nn.Linear(self.fc2_dims, 1)
@@ -231,7 +275,7 @@ class ValueNetwork(nn.Module):
         self.to(self.device)
 
     def forward(self, x):
-        x = F.relu(self.fc1(x))
+        x = F.relu(self.fc1(self.encoder(x)))
         x = F.relu(self.fc2(x))
 
         v = self.v(x)
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import numpy as np
+import unittest
+from rl_algorithms.replay_memory.memmap_storage import MemmapArray, MemmapStorage
+from rl_algorithms.replay_memory.discrete_replay_memory import ReplayBuffer as DiscreteReplayBuffer
+from rl_algorithms.replay_memory.continuous_replay_memory import ReplayBuffer as ContinuousReplayBuffer
+
+
+class TestMemmapStorage(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_array(self):
+        path = os.path.join(self.directory.name, "array.npy")
+        self.assertRaises(ValueError, MemmapArray, path, (10, 3), np.float32, 0)
+
+        array = MemmapArray(path, (10, 3), np.float32, tail_size=4)
+        expected = np.zeros((10, 3), dtype=np.float32)
+        rng = np.random.default_rng(0)
+
+        # consecutive rows that wrap around, a slice, rows out of order and a slice larger than the tail
+        writes = [7, 8, 9, 0, 1, 2, slice(3, 6), 1, 5, 6, slice(0, 10)]
+        for index in writes:
+            value = rng.random(expected[index].shape, dtype=np.float32)
+            array[index] = value
+            expected[index] = value
+
+            # reads see the rows of the tail that were not written to the file yet
+            np.testing.assert_array_equal(array[np.arange(10)], expected)
+            np.testing.assert_array_equal(array[index], expected[index])
+            np.testing.assert_array_equal(array[2], expected[2])
+
+        array[4] = 1
+        expected[4] = 1
+        array.flush()
+        np.testing.assert_array_equal(np.load(path), expected)
+
+        self.assertRaises(ValueError, MemmapArray, path, (10, 4), np.float32)
+        self.assertRaises(ValueError, MemmapArray, path, (10, 3), np.float64)
+
+    def test_buffers(self):
+        buffers = [lambda storage: DiscreteReplayBuffer(50, (2, 3), rng=np.random.default_rng(0), storage=storage),
+                   lambda storage: ContinuousReplayBuffer(50, 4, 2, storage=storage)]
+
+        for i, make_buffer in enumerate(buffers):
+            directory = os.path.join(self.directory.name, str(i))
+            memory, ram_memory = make_buffer(MemmapStorage(directory, tail_size=8)), make_buffer(None)
+            state_shape = ram_memory.state_memory.shape[1:]
+
+            for step in range(70):
+                transition = (np.full(state_shape, step), step % 2, step / 2, np.full(state_shape, step + 1), step % 3)
+                memory.store_transition(*transition)
+                ram_memory.store_transition(*transition)
+
+            batch = np.arange(50)
+            for stored, expected in zip(memory.get_transitions(batch), ram_memory.get_transitions(batch)):
+                np.testing.assert_array_equal(stored, expected)
+
+            # a new buffer continues with the transitions that were flushed
+            memory.flush()
+            memory.store_transition(*transition)
+            reopened = make_buffer(MemmapStorage(directory))
+            self.assertEqual(reopened.mem_cntr, 70)
+            for stored, expected in zip(reopened.get_transitions(batch), ram_memory.get_transitions(batch)):
+                np.testing.assert_array_equal(stored, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import numpy as np
+import unittest
+from rl_algorithms.replay_memory.memmap_storage import MemmapStorage
+from rl_algorithms.replay_memory.discrete_replay_memory import ReplayBuffer as DiscreteReplayBuffer
+from rl_algorithms.replay_memory.continuous_replay_memory import ReplayBuffer as ContinuousReplayBuffer
+from rl_algorithms.replay_memory.prioritized_replay_memory import PrioritizedReplayBuffer
+
+
+def episodes(n_steps, rng):
+    """Yields the transitions of episodes that end with done or, like a stopped training, without it"""
+    state = rng.random(3)
+    for step in range(n_steps):
+        state_ = rng.random(3)
+        done = rng.random() < 0.2
+        yield state, step % 2, step, state_, done
+
+        state = state_
+        if done or rng.random() < 0.1:
+            state = rng.random(3)
+
+
+class TestObservationRing(unittest.TestCase):
+    def _assert_same_transitions(self, memory, expected_memory, batch):
+        transitions = memory.get_transitions(batch)
+        expected = expected_memory.get_transitions(batch)
+        for i in [0, 1, 2, 4]:
+            np.testing.assert_array_equal(transitions[i], expected[i])
+
+        # the new states of terminal transitions are either kept in the ring or zeros
+        states_, expected_states_, dones = transitions[3], expected[3], expected[4]
+        np.testing.assert_array_equal(states_[~dones], expected_states_[~dones])
+        for state_, expected_state_ in zip(states_[dones], expected_states_[dones]):
+            self.assertTrue(np.array_equal(state_, expected_state_) or not state_.any())
+
+    def test_buffers(self):
+        buffers = [lambda **kwargs: DiscreteReplayBuffer(20, 3, rng=np.random.default_rng(0), **kwargs),
+                   lambda **kwargs: ContinuousReplayBuffer(20, 3, 1, **kwargs)]
+
+        for make_buffer in buffers:
+            memory, expected_memory = make_buffer(share_observations=True), make_buffer()
+            self.assertIsNone(memory.state_memory)
+            self.assertEqual(len(memory.observations.observation_memory), 21)
+
+            # the first transitions, a full buffer and buffers that wrapped around several times
+            for n_steps in [1, 7, 20, 33, 100]:
+                for transition in episodes(n_steps, np.random.default_rng(n_steps)):
+                    memory.store_transition(*transition)
+                    expected_memory.store_transition(*transition)
+
+                self._assert_same_transitions(memory, expected_memory, np.arange(min(memory.mem_cntr, 20)))
+
+    def test_storage(self):
+        def make_buffer(storage):
+            return DiscreteReplayBuffer(20, 3, storage=storage, share_observations=True)
+
+        with tempfile.TemporaryDirectory() as directory:
+            memory, expected_memory = make_buffer(MemmapStorage(directory, tail_size=4)), make_buffer(None)
+
+            for transition in episodes(50, np.random.default_rng(0)):
+                memory.store_transition(*transition)
+                expected_memory.store_transition(*transition)
+            self._assert_same_transitions(memory, expected_memory, np.arange(20))
+            self.assertTrue(memory.observations.final_observations)
+
+            # the final observations of the episodes that ended without done are stored with the flush
+            memory.flush()
+            self.assertTrue(os.path.exists(os.path.join(directory, "final_observations.npz")))
+            reopened = make_buffer(MemmapStorage(directory))
+            self._assert_same_transitions(reopened, expected_memory, np.arange(20))
+
+    def test_prioritized(self):
+        memory = PrioritizedReplayBuffer(DiscreteReplayBuffer(20, 3, share_observations=True),
+                                         rng=np.random.default_rng(0))
+        expected_memory = DiscreteReplayBuffer(20, 3)
+        for transition in episodes(30, np.random.default_rng(0)):
+            memory.store_transition(*transition)
+            expected_memory.store_transition(*transition)
+
+        states, _, _, _, _, indices, _ = memory.sample_buffer(8)
+        np.testing.assert_array_equal(states, expected_memory.get_transitions(indices)[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
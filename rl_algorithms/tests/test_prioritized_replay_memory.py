@@ -0,0 +1,109 @@
+import numpy as np
+import unittest
+from rl_algorithms.replay_memory.discrete_replay_memory import ReplayBuffer
+from rl_algorithms.replay_memory.prioritized_replay_memory import PrioritizedReplayBuffer, SumTree
+from rl_algorithms.dddqn import DuelingDDQNAgent
+from rl_algorithms.ddpg import DDPGAgent
+from rl_algorithms.sac import SACAgent
+
+
+class TestSumTree(unittest.TestCase):
+    def test_tree_init(self):
+        self.assertRaises(ValueError, SumTree, 0)
+
+    def test_update_and_find(self):
+        rng = np.random.default_rng(0)
+        for capacity in [1, 2, 5, 64, 1000]:
+            tree = SumTree(capacity)
+
+            # integer priorities keep all sums exact, zeros are slots that can never be found
+            priorities = rng.integers(0, 5, size=capacity).astype(np.float64)
+            priorities[0] = 1
+            tree.update(np.arange(capacity), priorities)
+
+            # overwrite some of the slots again, one of them twice in the same batch and one with set
+            indices = np.append(rng.integers(capacity, size=10), 0)
+            new_priorities = rng.integers(0, 5, size=11).astype(np.float64)
+            new_priorities[-1] = 3
+            tree.update(indices, new_priorities)
+            priorities[indices] = new_priorities
+            tree.set(capacity - 1, 2)
+            priorities[capacity - 1] = 2
+
+            self.assertEqual(tree.total, priorities.sum())
+            self.assertEqual(tree.min, priorities.min())
+            np.testing.assert_array_equal(tree.get(np.arange(capacity)), priorities)
+
+            values = np.arange(int(priorities.sum())) + 0.5
+            np.testing.assert_array_equal(tree.find(values), np.searchsorted(np.cumsum(priorities), values, "right"))
+
+
+class TestPrioritizedReplayBuffer(unittest.TestCase):
+    def _make_memory(self, n_transitions, **kwargs):
+        memory = PrioritizedReplayBuffer(ReplayBuffer(100, 2), rng=np.random.default_rng(0), **kwargs)
+        for i in range(n_transitions):
+            memory.store_transition([i, i], i % 4, i, [i + 1, i + 1], False)
+
+        return memory
+
+    def test_buffer_init(self):
+        self.assertRaises(ValueError, PrioritizedReplayBuffer, ReplayBuffer(10, 2), alpha=-1)
+        self.assertRaises(ValueError, PrioritizedReplayBuffer, ReplayBuffer(10, 2), beta=2)
+        self.assertRaises(ValueError, PrioritizedReplayBuffer, ReplayBuffer(10, 2), epsilon=0)
+
+    def test_sampling(self):
+        memory = self._make_memory(10, alpha=1, beta=0.5, beta_increment=0, epsilon=1e-9)
+        td_errors = np.arange(1, 11, dtype=np.float64)
+        memory.update_priorities(np.arange(10), td_errors)
+
+        counts = np.zeros(10)
+        for _ in range(2000):
+            states, actions, rewards, states_, dones, indices, weights = memory.sample_buffer(10)
+
+            # the rows belong to the sampled slots
+            np.testing.assert_array_equal(states[:, 0], indices)
+            np.testing.assert_array_equal(rewards, indices)
+            np.testing.assert_allclose(weights, (td_errors[indices] / td_errors.min()) ** -0.5, rtol=1e-6)
+            counts += np.bincount(indices, minlength=10)
+
+        np.testing.assert_allclose(counts / counts.sum(), td_errors / td_errors.sum(), atol=0.01)
+
+    def test_new_transitions(self):
+        memory = self._make_memory(5, beta=0.4, beta_increment=0.5)
+        memory.update_priorities(np.arange(5), np.full(5, 8.0))
+
+        # a new transition gets the largest priority so far and slots that were not filled yet are never sampled
+        memory.store_transition([5, 5], 1, 5, [6, 6], True)
+        self.assertEqual(memory.tree.get([5])[0], memory.max_priority)
+        self.assertEqual(memory.mem_cntr, 6)
+
+        for _ in range(50):
+            indices = memory.sample_buffer(8)[5]
+            self.assertTrue(np.all(indices < 6))
+        self.assertEqual(memory.beta, 1)
+
+    def test_agents_learn(self):
+        rng = np.random.default_rng(0)
+        agents = [DuelingDDQNAgent(1e-3, 0.99, 8, 1.0, 1e-3, 0.01, 0.01, 16, 16, 4, 3, mem_size=100, seed=0,
+                                   prioritized=True),
+                  DDPGAgent(1e-3, 1e-3, 0.99, 8, 0.01, 16, 16, 4, 1, mem_size=100, prioritized=True),
+                  SACAgent(1e-3, 1e-3, 0.99, 8, 0.01, 2, 16, 16, 4, 1, mem_size=100, prioritized=True)]
+
+        for agent in agents:
+            for _ in range(20):
+                state = rng.random(4, dtype=np.float32)
+                action = agent.choose_action(state)
+                agent.remember(state, action, 1.0, rng.random(4, dtype=np.float32), False)
+
+            sampled = []
+            sample_buffer = agent.memory.sample_buffer
+            agent.memory.sample_buffer = lambda batch_size: sampled.append(sample_buffer(batch_size)) or sampled[-1]
+            agent.learn()
+
+            # the sampled transitions got priorities from their TD errors instead of the initial one
+            changed = np.flatnonzero(agent.memory.tree.get(np.arange(20)) != 1)
+            np.testing.assert_array_equal(changed, np.unique(sampled[0][5]), type(agent).__name__)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import tempfile
+import numpy as np
+import unittest
+from rl_algorithms.replay_memory.memmap_storage import MemmapStorage
+from rl_algorithms.replay_memory.discrete_replay_memory import ReplayBuffer as DiscreteReplayBuffer
+from rl_algorithms.replay_memory.continuous_replay_memory import ReplayBuffer as ContinuousReplayBuffer
+from rl_algorithms.replay_memory.prioritized_replay_memory import PrioritizedReplayBuffer
+from rl_algorithms.tests.test_observation_ring import episodes
+from rl_algorithms.dddqn import DuelingDDQNAgent
+from rl_algorithms.ddpg import DDPGAgent
+from rl_algorithms.sac import SACAgent
+
+
+class TestStoreTransitions(unittest.TestCase):
+    def _assert_same_memory(self, memory, expected_memory):
+        self.assertEqual(memory.mem_cntr, expected_memory.mem_cntr)
+        batch = np.arange(min(memory.mem_cntr, memory.mem_size))
+        for stored, expected in zip(memory.get_transitions(batch), expected_memory.get_transitions(batch)):
+            np.testing.assert_array_equal(stored, expected)
+
+        if memory.observations is not None:
+            np.testing.assert_array_equal(memory.observations.boundary_memory[batch],
+                                          expected_memory.observations.boundary_memory[batch])
+            self.assertEqual(sorted(memory.observations.final_observations),
+                             sorted(expected_memory.observations.final_observations))
+
+    def test_buffers(self):
+        directory = tempfile.TemporaryDirectory()
+        buffers = [lambda storage: DiscreteReplayBuffer(20, 3, storage=storage),
+                   lambda storage: ContinuousReplayBuffer(20, 3, 1, storage=storage),
+                   lambda storage: DiscreteReplayBuffer(20, 3, storage=storage, share_observations=True),
+                   lambda storage: ContinuousReplayBuffer(20, 3, 1, storage=storage, share_observations=True)]
+
+        # each buffer in RAM and with a storage is compared with a buffer that stores the transitions one by one
+        for i, make_buffer in enumerate(buffers * 2):
+            storage = MemmapStorage(f"{directory.name}/{i}", tail_size=4) if i >= len(buffers) else None
+            memory, expected_memory = make_buffer(storage), make_buffer(None)
+            self.assertRaises(ValueError, memory.store_transitions, *[np.zeros((21, 3))] * 2, np.zeros(21),
+                              np.zeros((21, 3)), np.zeros(21, dtype=bool))
+
+            # batches that wrap around, an empty one and one that fills the whole memory
+            transitions = list(episodes(120, np.random.default_rng(i)))
+            start = 0
+            for size in [5, 0, 13, 20, 7, 19, 20, 1, 20, 15]:
+                batch = [np.array(field) for field in zip(*transitions[start:start + size])] or [[]] * 5
+                memory.store_transitions(*batch)
+                for transition in transitions[start:start + size]:
+                    expected_memory.store_transition(*transition)
+                start += size
+
+                self._assert_same_memory(memory, expected_memory)
+
+        directory.cleanup()
+
+    def test_prioritized(self):
+        memory = PrioritizedReplayBuffer(DiscreteReplayBuffer(10, 3))
+        memory.update_priorities(np.arange(10), np.full(10, 3.0))
+        for _ in range(2):
+            memory.store_transitions(*[np.array(field) for field in zip(*episodes(6, np.random.default_rng(0)))])
+
+        self.assertEqual(memory.mem_cntr, 12)
+        np.testing.assert_array_equal(memory.tree.get(np.arange(10)), memory.max_priority)
+
+    def test_agents_remember_batch(self):
+        rng = np.random.default_rng(0)
+        agents = [(DuelingDDQNAgent(1e-3, 0.99, 8, 1.0, 1e-3, 0.01, 0.01, 16, 16, 4, 3, mem_size=100, seed=0),
+                   rng.integers(3, size=16)),
+                  (DDPGAgent(1e-3, 1e-3, 0.99, 8, 0.01, 16, 16, 4, 1, mem_size=100), rng.random((16, 1))),
+                  (SACAgent(1e-3, 1e-3, 0.99, 8, 0.01, 2, 16, 16, 4, 1, mem_size=100), rng.random((16, 1)))]
+
+        for agent, actions in agents:
+            states, states_ = rng.random((16, 4)), rng.random((16, 4))
+            agent.remember_batch(states, actions, np.ones(16), states_, np.zeros(16, dtype=bool))
+            agent.learn()
+
+            self.assertEqual(agent.memory.mem_cntr, 16)
+            np.testing.assert_allclose(agent.memory.get_transitions(np.arange(16))[3], states_, rtol=1e-6)
+
+
+class TestSeeds(unittest.TestCase):
+    def test_continuous_buffer(self):
+        memories = [ContinuousReplayBuffer(20, 3, 1, rng=np.random.default_rng(0)) for _ in range(2)]
+        for memory in memories:
+            for transition in episodes(30, np.random.default_rng(0)):
+                memory.store_transition(*transition)
+
+        np.testing.assert_array_equal(memories[0].sample_buffer(8)[2], memories[1].sample_buffer(8)[2])
+
+    def test_agents(self):
+        def make_agents(seed):
+            return [DDPGAgent(1e-3, 1e-3, 0.99, 8, 0.01, 16, 16, 3, 1, mem_size=100, seed=seed),
+                    DDPGAgent(1e-3, 1e-3, 0.99, 8, 0.01, 16, 16, 3, 1, mem_size=100, seed=seed, prioritized=True),
+                    SACAgent(1e-3, 1e-3, 0.99, 8, 0.01, 2, 16, 16, 3, 1, mem_size=100, seed=seed),
+                    SACAgent(1e-3, 1e-3, 0.99, 8, 0.01, 2, 16, 16, 3, 1, mem_size=100, seed=seed, prioritized=True)]
+
+        # agents of the same seed draw the same noise and sample the same batches
+        for agent, same_agent, other_agent in zip(make_agents(0), make_agents(0), make_agents(1)):
+            for memory_agent in [agent, same_agent, other_agent]:
+                for transition in episodes(50, np.random.default_rng(0)):
+                    memory_agent.remember(*transition)
+
+            rewards = [memory_agent.memory.sample_buffer(8)[2] for memory_agent in [agent, same_agent, other_agent]]
+            np.testing.assert_array_equal(rewards[0], rewards[1])
+            self.assertFalse(np.array_equal(rewards[0], rewards[2]))
+
+            if isinstance(agent, DDPGAgent):
+                np.testing.assert_array_equal([agent.noise() for _ in range(5)], [same_agent.noise() for _ in range(5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
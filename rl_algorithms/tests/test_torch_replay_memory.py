@@ -0,0 +1,91 @@
+import tempfile
+import numpy as np
+import torch as T
+import unittest
+from rl_algorithms.replay_memory.memmap_storage import MemmapStorage
+from rl_algorithms.replay_memory.discrete_replay_memory import ReplayBuffer as DiscreteReplayBuffer
+from rl_algorithms.replay_memory.continuous_replay_memory import ReplayBuffer as ContinuousReplayBuffer
+from rl_algorithms.replay_memory.torch_replay_memory import TorchReplayBuffer
+from rl_algorithms.tests.test_observation_ring import episodes
+from rl_algorithms.dddqn import DuelingDDQNAgent
+from rl_algorithms.ddpg import DDPGAgent
+from rl_algorithms.sac import SACAgent
+
+
+class TestTorchReplayBuffer(unittest.TestCase):
+    def test_buffers(self):
+        buffers = [(TorchReplayBuffer(20, 3, rng=np.random.default_rng(0)),
+                    DiscreteReplayBuffer(20, 3, rng=np.random.default_rng(0))),
+                   (TorchReplayBuffer(20, 3, 1), ContinuousReplayBuffer(20, 3, 1))]
+
+        for memory, expected_memory in buffers:
+            transitions = list(episodes(70, np.random.default_rng(0)))
+            for transition in transitions[:13]:
+                memory.store_transition(*transition)
+                expected_memory.store_transition(*transition)
+
+            # batches that wrap around and one that fills the whole memory
+            start = 13
+            for size in [15, 20, 7, 15]:
+                memory.store_transitions(*[np.array(field) for field in zip(*transitions[start:start + size])])
+                for transition in transitions[start:start + size]:
+                    expected_memory.store_transition(*transition)
+                start += size
+
+                batch = np.arange(20)
+                for stored, expected in zip(memory.get_transitions(batch), expected_memory.get_transitions(batch)):
+                    self.assertEqual(stored.dtype, T.int64 if expected.dtype == np.int64 else
+                                     T.bool if expected.dtype == bool else T.float32)
+                    np.testing.assert_allclose(stored.cpu().numpy(), expected, rtol=1e-6)
+
+        # the discrete buffers sample the same transitions from the same seed
+        memory, expected_memory = buffers[0]
+        np.testing.assert_array_equal(memory.sample_buffer(8)[2].cpu().numpy(), expected_memory.sample_buffer(8)[2])
+
+    def test_output_reuse(self):
+        memory = TorchReplayBuffer(10, 3, rng=np.random.default_rng(0))
+        for transition in episodes(10, np.random.default_rng(0)):
+            memory.store_transition(*transition)
+
+        batch = memory.sample_buffer(4)
+        rewards = batch[2].clone()
+        next_batch = memory.sample_buffer(4)
+
+        # the next batch of the same size is written into the same tensors, other sizes get their own
+        for output, next_output in zip(batch, next_batch):
+            self.assertIs(output, next_output)
+        self.assertFalse(T.equal(rewards, next_batch[2]))
+        self.assertIsNot(memory.sample_buffer(5)[0], batch[0])
+
+    def test_agents(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertRaises(ValueError, DDPGAgent, 1e-3, 1e-3, 0.99, 8, 0.01, 16, 16, 4, 1, mem_size=100,
+                              storage=MemmapStorage(directory), torch_memory=True)
+        self.assertRaises(ValueError, SACAgent, 1e-3, 1e-3, 0.99, 8, 0.01, 2, 16, 16, 4, 1, mem_size=100,
+                          share_observations=True, torch_memory=True)
+
+        rng = np.random.default_rng(0)
+        agents = [DuelingDDQNAgent(1e-3, 0.99, 8, 1.0, 1e-3, 0.01, 0.01, 16, 16, 4, 3, mem_size=100, seed=0,
+                                   torch_memory=True),
+                  DuelingDDQNAgent(1e-3, 0.99, 8, 1.0, 1e-3, 0.01, 0.01, 16, 16, 4, 3, mem_size=100, seed=0,
+                                   prioritized=True, torch_memory=True),
+                  DDPGAgent(1e-3, 1e-3, 0.99, 8, 0.01, 16, 16, 4, 1, mem_size=100, torch_memory=True),
+                  SACAgent(1e-3, 1e-3, 0.99, 8, 0.01, 2, 16, 16, 4, 1, mem_size=100, prioritized=True,
+                           torch_memory=True)]
+
+        for agent, network in zip(agents, ["q_eval", "q_eval", "critic", "critic_1"]):
+            for _ in range(20):
+                state = rng.random(4, dtype=np.float32)
+                action = agent.choose_action(state)
+                agent.remember(state, action, 1.0, rng.random(4, dtype=np.float32), False)
+
+            # the networks are fitted to the batches of the tensor memory
+            parameters = [parameter.clone() for parameter in getattr(agent, network).parameters()]
+            agent.learn()
+            agent.learn()
+            for parameter, new_parameter in zip(parameters, getattr(agent, network).parameters()):
+                self.assertFalse(T.equal(parameter, new_parameter), type(agent).__name__)
+
+
+if __name__ == "__main__":
+    unittest.main()
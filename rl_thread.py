@@ -4,10 +4,9 @@ import numpy as np
 from PyQt5.QtCore import pyqtSignal, QRunnable, QObject, QTimer
 from PyQt5.QtWidgets import QApplication
 
-from envs.action import Action
-from envs.snake_env import SNAKE_ACTION_POOL
-from envs.pong_env import PONG_ACTION_POOL
-from envs.breakout_env import BREAKOUT_ACTION_POOL
+from envs.action import action_bin_edges
+from envs.pixel_observation import PixelObservationWrapper
+from envs.trajectory_recorder import TrajectoryRecorder
 
 from gui.utils import RenderMode
 
@@ -19,13 +18,17 @@ ALG_NAME_TO_OBJECT = {"DDDQN": DuelingDDQNAgent, "DDPG": DDPGAgent, "SAC": SACAg
 
 
 class RLThread(QRunnable):
-    """The RLThread class represents the separate thread in which the agent learning takes place"""
+    """The RLThread class represents the separate thread in which the agent learning takes place. If trajectory_path is
+    given, every step of the training is appended to a TrajectoryRecorder at that path. If pixel_observations is True,
+    the agent observes the stacked screenshots of a PixelObservationWrapper instead of the feature vectors"""
 
-    def __init__(self, window, alg_name, alg_config):
+    def __init__(self, window, alg_name, alg_config, trajectory_path: str = None, pixel_observations: bool = False):
         super(QRunnable, self).__init__()
         self.window = window
         self.alg = alg_name
         self.alg_config = alg_config
+        self.trajectory_path = trajectory_path
+        self.pixel_observations = pixel_observations
 
         self.pause = False
         self.stop = False
@@ -42,16 +45,39 @@ class RLThread(QRunnable):
 
     def run(self):
         """Performs the learning of the RL agent and sends signals back to the main thread"""
-        input_dim = len(self.window.env.get_state())
+        env = PixelObservationWrapper(self.window.env) if self.pixel_observations else self.window.env
 
-        env_name = self.window.ui.envComboBox.currentText()
+        # feature vectors give an int input dimension, stacked frames a (channels, height, width) input shape
+        state_shape = np.shape(env.get_state())
+        input_dim = state_shape[0] if len(state_shape) == 1 else state_shape
+
+        # the environment writes its states into these two buffers in turns, the replay memory copies them
+        state = np.empty(state_shape, dtype=np.float32)
+        state_ = np.empty(state_shape, dtype=np.float32)
 
         # For algorithms with continuous action spaces, only one output is required, which is then later converted into
-        # a discrete action
+        # a discrete action by binning it
         output_dim = self.window.env.output_dim if self.alg == "DDDQN" else 1
-
-        rl_agent = ALG_NAME_TO_OBJECT[self.alg](*self.alg_config, input_dim, output_dim)
-
+        bin_edges = None if self.alg == "DDDQN" else action_bin_edges(self.window.env.output_dim)
+
+        # stacked frames are large, the states and new states of the replay memory share them
+        rl_agent = ALG_NAME_TO_OBJECT[self.alg](*self.alg_config, input_dim, output_dim,
+                                                share_observations=self.pixel_observations)
+
+        recorder = None
+        if self.trajectory_path is not None:
+            recorder = TrajectoryRecorder(self.trajectory_path, self.window.env)
+
+        try:
+            self._train(env, rl_agent, bin_edges, state, state_, recorder)
+        finally:
+            if recorder is not None:
+                recorder.close()
+
+    def _train(self, env, rl_agent, bin_edges, state, state_, recorder):
+        """Plays and learns episodes in env, the environment of the window or its pixel observation wrapper, until the
+            training is stopped. Continuous actions are mapped to the index of their bin_edges bin, discrete actions are
+            used as they are if bin_edges is None"""
         episode = 0
 
         while True:
@@ -63,7 +89,10 @@ class RLThread(QRunnable):
             if self.alg == "DDPG":
                 rl_agent.noise.reset()
 
-            state = self.window.env.reset()
+            env.reset()
+            env.get_state_into(state)
+            if recorder is not None:
+                recorder.start_episode(self.window.env)
             while not done:
                 if self.stop:
                     break
@@ -72,35 +101,29 @@ class RLThread(QRunnable):
                 else:
                     action = rl_agent.choose_action(state)
 
-                    if self.alg == "DDDQN":
+                    # the environments take the index of the action in their action pool
+                    if bin_edges is None:
                         action_index = action
-                    elif self.alg == "DDPG" or self.alg == "SAC":
-
-                        # convert continuous output to discrete action
-                        for i in range(self.window.env.output_dim):
-                            if action[0] <= -1 + (i + 1) * (2 / self.window.env.output_dim):
-                                action_index = i
-                                break
-
-                    # translate index output of network to Action object
-                    if env_name == "Snake":
-                        converted_action = SNAKE_ACTION_POOL[action_index]
-                    elif env_name == "Breakout":
-                        converted_action = BREAKOUT_ACTION_POOL[action_index]
-                    elif env_name == "Pong":
-                        converted_action = PONG_ACTION_POOL[action_index]
-
-                    state_, reward, done, _ = self.window.env.step(converted_action)
+                    else:
+                        action_index = int(np.digitize(action[0], bin_edges, right=True))
+
+                    if recorder is not None:
+                        encoding = self.window.env.get_encoding()
+
+                    reward, done, _ = env.step_into(action_index, state_)
                     score += reward
 
+                    if recorder is not None:
+                        recorder.record(encoding, action_index, reward, done)
+
                     # store observation in replay memory
                     rl_agent.remember(state, action, reward, state_, done)
                     rl_agent.learn()
 
-                    state = state_
+                    state, state_ = state_, state
 
                     if self.window.render_mode != RenderMode.NO_RENDER:
-                        self.signals.update_env.emit()
+                        self.signals.update_env.emit(self._render())
 
                     # wait a certain amount of time between each episode depending on setting in UI
                     if self.window.render_mode == RenderMode.SLOW_RENDER:
@@ -118,6 +141,19 @@ class RLThread(QRunnable):
             if self.stop:
                 break
 
+    def _render(self):
+        """Renders the environment in this thread, which steps it, and returns a copy of the screenshot and the regions
+            that changed since the last render, from which the main thread repaints its display"""
+        screenshot = self.window.env.screenshot()
+
+        # the pixel observations already rendered the step, which leaves no changed regions to the display
+        if self.pixel_observations:
+            regions = [(0, screenshot.shape[0], 0, screenshot.shape[1])]
+        else:
+            regions = self.window.env.get_changed_regions()
+
+        return screenshot.copy(), regions
+
     def update_learning_curve(self):
         """Signals the main thread to update the learning graph"""
         self.signals.update_learning_graph.emit((self.score_history, self.x))
@@ -125,5 +161,5 @@ class RLThread(QRunnable):
 
 class RLThreadSignals(QObject):
     """The RLThreadSignal class defines the signals that are used for communication between main thread and RL thread"""
-    update_env = pyqtSignal()
+    update_env = pyqtSignal(tuple)
     update_learning_graph = pyqtSignal(tuple)